@@ -0,0 +1,135 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from src.core.database_manager import DatabaseManager
+
+
+class AsyncDatabaseManager:
+    """Variante asyncio do DatabaseManager, para scripts e ferramentas fora da interface Qt.
+
+    Os métodos públicos do DatabaseManager ficam disponíveis como corrotinas com o mesmo
+    nome e assinatura (ex.: await db.add_tasks_bulk(tasks), await db.search_questions("x")).
+    O trabalho com o SQLite roda em executores próprios, sem expor threads ao chamador:
+
+    - um único escritor (uma thread, uma conexão) executa, em ordem, tudo que altera o banco;
+    - até max_readers leitores, cada um com sua conexão, atendem às consultas em paralelo.
+
+    Com o banco em WAL, os leitores enxergam o que o escritor já confirmou e não o bloqueiam.
+    """
+
+    # Consultas atendidas pelos leitores
+    READ_METHODS = frozenset({
+        'get_event_by_id', 'get_task_by_id', 'get_all_tasks',
+        'get_question_by_id', 'get_questions_by_ids', 'get_all_questions', 'get_questions_page',
+        'search_questions', 'get_quiz_config_by_id', 'get_all_quiz_configs',
+        'get_quiz_configs_for_question', 'get_entity_by_id', 'get_all_entities',
+        'get_entities_for_event', 'get_quiz_attempt_by_id', 'get_attempts_for_quiz_config',
+        'get_question_answer_stats', 'get_setting',
+        'get_events_in_range', 'get_events_by_date', 'get_events_with_entities_in_range',
+        'get_event_counts_by_day', 'get_events_for_entity',
+    })
+    # Métodos que podem escrever
+    WRITE_METHODS = frozenset({
+        'add_event', 'add_events_bulk', 'update_event', 'delete_event',
+        'add_task', 'add_tasks_bulk', 'update_task', 'delete_task',
+        'add_question', 'add_questions_bulk', 'update_question', 'delete_question',
+        'add_quiz_config', 'add_quiz_attempt', 'add_quiz_attempts_bulk',
+        'add_entity', 'add_entities_bulk', 'update_entity', 'delete_entity',
+        'link_entity_to_event', 'link_entities_to_events_bulk', 'unlink_entity_from_event',
+        'set_event_entities',
+        'add_sample_data', 'set_setting',
+    })
+
+    def __init__(self, db_path: str = 'data/agenda.db', max_readers: int = 4):
+        self.db_path = db_path
+        self.max_readers = max(1, max_readers)
+        self._writer_executor: Optional[ThreadPoolExecutor] = None
+        self._reader_executor: Optional[ThreadPoolExecutor] = None
+        self._writer: Optional[DatabaseManager] = None
+        self._reader_state = threading.local()
+        self._open_lock: Optional[asyncio.Lock] = None
+
+    async def open(self):
+        """Abre a conexão do escritor (aplicando as migrações) e prepara os leitores.
+
+        Chamado automaticamente na primeira operação; também usado por `async with`.
+        """
+        if self._open_lock is None:
+            self._open_lock = asyncio.Lock()
+        async with self._open_lock:
+            if self._writer_executor is not None:
+                return
+            writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='agenda-db-writer')
+            loop = asyncio.get_running_loop()
+            # O escritor é criado na sua própria thread: conexões sqlite3 ficam presas à thread que as abriu
+            writer = await loop.run_in_executor(writer_executor, partial(DatabaseManager, db_path=self.db_path))
+            if not writer.conn:
+                writer_executor.shutdown(wait=True)
+                raise ConnectionError(f"Não foi possível abrir o banco de dados: {self.db_path}")
+            self._writer = writer
+            self._writer_executor = writer_executor
+            # Os leitores só são criados depois das migrações do escritor
+            self._reader_executor = ThreadPoolExecutor(max_workers=self.max_readers,
+                                                       thread_name_prefix='agenda-db-reader')
+
+    async def close(self):
+        """Espera as operações pendentes e fecha todas as conexões."""
+        if self._writer_executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        writer_executor, reader_executor = self._writer_executor, self._reader_executor
+        self._writer_executor = self._reader_executor = None
+        await loop.run_in_executor(writer_executor, self._writer.close)
+        self._writer = None
+        # Encerrar as threads libera as conexões dos leitores, guardadas em threading.local
+        await loop.run_in_executor(None, writer_executor.shutdown, True)
+        await loop.run_in_executor(None, reader_executor.shutdown, True)
+
+    async def __aenter__(self) -> 'AsyncDatabaseManager':
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _reader_manager(self) -> DatabaseManager:
+        """DatabaseManager da thread leitora atual, criado na primeira consulta dela."""
+        db_manager = getattr(self._reader_state, 'db_manager', None)
+        if db_manager is None or not db_manager.conn:
+            # Sem cache de objetos: as escritas do escritor não invalidariam os caches dos leitores.
+            # Somente leitura: migrações e janela de ocorrências rodam apenas no escritor
+            db_manager = DatabaseManager(db_path=self.db_path, cache_size=0, read_only=True)
+            self._reader_state.db_manager = db_manager
+        return db_manager
+
+    async def run_read(self, task: Callable[[DatabaseManager], Any]) -> Any:
+        """Executa task(db_manager) em um leitor. task não deve alterar o banco."""
+        await self.open()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._reader_executor, lambda: task(self._reader_manager()))
+
+    async def run_write(self, task: Callable[[DatabaseManager], Any]) -> Any:
+        """Executa task(db_manager) no escritor, em ordem com as demais escritas.
+
+        Útil para operações de vários passos que precisam ver as próprias escritas.
+        """
+        await self.open()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._writer_executor, lambda: task(self._writer))
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name in AsyncDatabaseManager.READ_METHODS:
+            run = self.run_read
+        elif name in AsyncDatabaseManager.WRITE_METHODS:
+            run = self.run_write
+        else:
+            raise AttributeError(f"'{type(self).__name__}' não tem o atributo '{name}'")
+
+        async def method(*args, **kwargs):
+            return await run(lambda db_manager: getattr(db_manager, name)(*args, **kwargs))
+        method.__name__ = name
+        method.__doc__ = getattr(DatabaseManager, name).__doc__
+        return method
@@ -1,206 +1,545 @@
 import sqlite3
 import json
 import os
-from datetime import datetime, date
-from typing import List, Optional, Any, Dict
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from datetime import datetime, date, timedelta
+from typing import List, Optional, Any, Dict, Iterator, Iterable, Callable, Tuple
 from src.core.models import Event, Task, Question, QuizConfig, QuizAttempt, Entity # Adicionadas
+from src.core.recurrence import RecurrenceRule
+from src.core.object_cache import ObjectCache
+from src.core.db_instrumentation import logger, connection_factory
 
 class DatabaseManager:
-    def __init__(self, db_path='data/agenda.db'):
+    # Janela das ocorrências materializadas (chaves em Settings e extensão antes/depois
+    # do mês atual); fora dela as ocorrências são expandidas em memória
+    OCCURRENCE_HORIZON_START_KEY = 'occurrences_horizon_start'
+    OCCURRENCE_HORIZON_END_KEY = 'occurrences_horizon_end'
+    OCCURRENCE_WINDOW_PAST = timedelta(days=365)
+    OCCURRENCE_WINDOW_FUTURE = timedelta(days=365)
+    OCCURRENCE_BATCH_SIZE = 5000
+    # Tamanho dos blocos de executemany nas inserções em lote (add_*_bulk)
+    BULK_CHUNK_SIZE = 1000
+    # Máximo de parâmetros por cláusula IN (...) nas buscas em lote por ID
+    IN_CLAUSE_CHUNK_SIZE = 500
+    # Versão do esquema gravada em PRAGMA user_version; cada migração em
+    # _schema_migrations leva o banco da versão anterior para a sua
+    SCHEMA_VERSION = 7
+
+    # Eventos com início em [?, ?) e ocorrências de recorrentes em [?, ?), nas colunas de
+    # Events; os predicados comparam as colunas indexadas diretamente
+    EVENTS_IN_RANGE_QUERY = """
+    SELECT id, title, description, start_time, end_time, event_type, location, recurrence_rule, created_at, updated_at
+    FROM Events
+    WHERE start_time >= ? AND start_time < ? AND recurrence_rule IS NULL
+    UNION ALL
+    SELECT E.id, E.title, E.description, O.occurrence_start, O.occurrence_end, E.event_type, E.location,
+           E.recurrence_rule, E.created_at, E.updated_at
+    FROM EventOccurrences O
+    JOIN Events E ON E.id = O.event_id
+    WHERE O.occurrence_start >= ? AND O.occurrence_start < ?
+    """
+
+    # Tabelas com cache de objetos por ID (mapa de identidade) em get_*_by_id
+    CACHED_TABLES = ('events', 'tasks', 'questions', 'entities')
+
+    def __init__(self, db_path='data/agenda.db', cache_size: int = 256, check_same_thread: bool = True,
+                 run_startup: bool = True, read_only: bool = False):
+        """cache_size é o número máximo de objetos mantidos por tabela; 0 desativa o cache.
+
+        Com check_same_thread=False a conexão pode ser fechada por outra thread (ex.: as
+        conexões das threads de trabalho da interface, fechadas no encerramento).
+
+        Com run_startup=False as migrações e a atualização da janela de ocorrências não
+        rodam: é o modo das conexões secundárias (threads de trabalho), que não devem
+        escrever ao abrir enquanto a conexão principal faz esse trabalho.
+
+        read_only=True abre o arquivo em modo somente leitura (mode=ro), sem rotinas de
+        inicialização; o banco precisa já existir, criado por uma conexão principal.
+        """
         self.db_path = db_path
+        self.check_same_thread = check_same_thread
+        self.read_only = read_only
         self.conn = None
+        self.fts_enabled = False # True quando a busca textual FTS5 está disponível
+        self._caches: Dict[str, ObjectCache] = {table: ObjectCache(cache_size) for table in self.CACHED_TABLES}
+        # Um item por nível de transaction() aberto; 'failed' marca falhas de métodos dentro dele
+        self._transaction_stack: List[Dict[str, bool]] = []
         self._connect()
-        self._create_tables()
+        if run_startup and not read_only:
+            self._create_tables()
+            self._refresh_occurrence_window()
+        elif self.conn:
+            self.fts_enabled = self._questions_fts_available()
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Tamanho, acertos e falhas do cache de cada tabela, para ajuste de cache_size."""
+        return {table: cache.stats() for table, cache in self._caches.items()}
+
+    def clear_caches(self):
+        """Descarta todos os objetos em cache (ex.: após alterações feitas fora deste DatabaseManager)."""
+        for cache in self._caches.values():
+            cache.clear()
+
+    @contextmanager
+    def transaction(self) -> Iterator['DatabaseManager']:
+        """Unidade de trabalho: agrupa as escritas do bloco numa única transação.
+
+            with db.transaction():
+                db.update_event(event)
+                db.add_tasks_bulk(tasks)
+
+        Dentro do bloco os métodos não fazem commit; ele acontece uma vez, na saída.
+        Uma exceção no bloco desfaz tudo e é propagada. Se um método falhar (e, como de
+        costume, devolver False/None em vez de lançar), o bloco é desfeito na saída e
+        sqlite3.DatabaseError é lançada, para não confirmar um trabalho pela metade.
+        Blocos aninhados usam savepoints: desfazer um interno não desfaz o externo.
+        """
+        if not self.conn:
+            raise sqlite3.OperationalError("Conexão com o banco de dados não estabelecida.")
+
+        depth = len(self._transaction_stack)
+        savepoint = f"unit_of_work_{depth}"
+        if depth == 0:
+            if self.conn.in_transaction:
+                self.conn.commit() # Nada pendente deveria haver; garante um BEGIN limpo
+            self.conn.execute("BEGIN")
+        else:
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+        frame = {'failed': False}
+        self._transaction_stack.append(frame)
+        try:
+            yield self
+        except BaseException:
+            self._transaction_stack.pop()
+            self._undo_transaction(depth, savepoint)
+            raise
+        self._transaction_stack.pop()
+
+        if frame['failed']:
+            self._undo_transaction(depth, savepoint)
+            raise sqlite3.DatabaseError("Uma operação falhou dentro da transação; as alterações foram desfeitas.")
+        if depth == 0:
+            self.conn.commit()
+        else:
+            self.conn.execute(f"RELEASE {savepoint}")
+
+    def _undo_transaction(self, depth: int, savepoint: str):
+        """Desfaz o nível de transaction() informado e descarta os caches, que podem refletir o que foi desfeito."""
+        self.clear_caches()
+        if not self.conn.in_transaction:
+            return # O SQLite já desfez a transação inteira (ex.: erro de disco cheio)
+        if depth == 0:
+            self.conn.rollback()
+        else:
+            self.conn.execute(f"ROLLBACK TO {savepoint}")
+            self.conn.execute(f"RELEASE {savepoint}")
+
+    def _commit(self):
+        """Commit de um método de escrita; dentro de transaction() fica para o fim do bloco."""
+        if not self._transaction_stack:
+            self.conn.commit()
+
+    def _rollback(self):
+        """Rollback de um método que falhou; dentro de transaction() marca o bloco para ser desfeito."""
+        if self._transaction_stack:
+            self._transaction_stack[-1]['failed'] = True
+            return
+        self.conn.rollback()
+        self.clear_caches()
 
     def _connect(self):
         """Estabelece a conexão com o banco de dados SQLite."""
         try:
-            # Garante que o diretório do banco de dados exista
-            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-            self.conn = sqlite3.connect(self.db_path)
+            # Com AGENDA_DB_LOG (ou DEBUG ligado no logger "agenda.db"), a conexão mede
+            # cada instrução; sem isso é a conexão padrão, sem custo extra
+            factory = connection_factory()
+            options = {'check_same_thread': self.check_same_thread}
+            if factory:
+                options['factory'] = factory
+            if self.read_only:
+                # mode=ro: qualquer escrita falha com "attempt to write a readonly database"
+                database = Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+                self.conn = sqlite3.connect(database, uri=True, **options)
+            else:
+                # Garante que o diretório do banco de dados exista
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                self.conn = sqlite3.connect(self.db_path, **options)
             self.conn.row_factory = sqlite3.Row # Permite acesso aos campos por nome
             self.conn.execute("PRAGMA foreign_keys = ON;") # Habilita chaves estrangeiras
+            if not self.read_only:
+                # WAL: leitores (ex.: conexões das threads de trabalho da interface) não bloqueiam
+                # o escritor e vice-versa. O modo fica gravado no arquivo
+                self.conn.execute("PRAGMA journal_mode = WAL;")
         except sqlite3.Error as e:
-            print(f"Erro ao conectar ao banco de dados: {e}")
+            logger.error(f"Erro ao conectar ao banco de dados: {e}")
             # Considerar levantar uma exceção personalizada aqui ou tratar de forma mais robusta
 
+    def _schema_migrations(self) -> List[Tuple[int, Callable[[sqlite3.Cursor], None]]]:
+        """Migrações do esquema, em ordem de versão. Novas migrações entram sempre no final."""
+        return [
+            (1, self._migration_base_schema),
+            (2, self._migration_event_range_indexes),
+            (3, self._migration_questions_fts),
+            (4, self._migration_quiz_config_questions),
+            (5, self._migration_attempt_answers),
+            (6, self._migration_questions_subject_index),
+            (7, self._migration_event_entities_entity_index),
+        ]
+
     def _create_tables(self):
-        """Cria as tabelas do banco de dados se elas não existirem."""
+        """Cria ou atualiza o esquema do banco aplicando as migrações pendentes.
+
+        Um banco já na versão SCHEMA_VERSION não executa nenhum DDL na inicialização.
+        Cada migração roda em uma transação própria junto com a atualização de
+        user_version; se falhar, o banco permanece na última versão completa.
+        """
         if not self.conn:
-            print("Conexão com o banco de dados não estabelecida. Tabelas não criadas.")
+            logger.error("Conexão com o banco de dados não estabelecida. Tabelas não criadas.")
             return
 
         try:
             cursor = self.conn.cursor()
+            cursor.execute("PRAGMA user_version")
+            current_version = cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao ler a versão do esquema do banco de dados: {e}")
+            return
 
-            # Tabela Entities
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Entities (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                details_json TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-
-            # Tabela Events
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP,
-                event_type TEXT NOT NULL,
-                location TEXT,
-                recurrence_rule TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
+        if current_version > self.SCHEMA_VERSION:
+            logger.warning(f"Aviso: o banco de dados está na versão {current_version}, mais nova que a suportada ({self.SCHEMA_VERSION}).")
 
-            # Tabela Event_Entities (Tabela de Associação)
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Event_Entities (
-                event_id INTEGER NOT NULL,
-                entity_id INTEGER NOT NULL,
-                role TEXT,
-                PRIMARY KEY (event_id, entity_id),
-                FOREIGN KEY (event_id) REFERENCES Events(id) ON DELETE CASCADE,
-                FOREIGN KEY (entity_id) REFERENCES Entities(id) ON DELETE CASCADE
-            )
-            """)
+        for version, migration in self._schema_migrations():
+            if version <= current_version:
+                continue
+            try:
+                cursor.execute("BEGIN")
+                migration(cursor)
+                cursor.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+                current_version = version
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao aplicar a migração {version} do banco de dados: {e}")
+                if self.conn:
+                    self.conn.rollback() # Desfaz a migração incompleta
+                break
+
+        self.fts_enabled = self._questions_fts_available()
+        if not self.fts_enabled and current_version >= 3 and self._sqlite_has_fts5():
+            # A migração 3 pode ter rodado num SQLite sem FTS5; o índice é criado assim
+            # que o SQLite em uso tiver o módulo. Sem o módulo, nenhum DDL é tentado
+            try:
+                cursor.execute("BEGIN")
+                self._migration_questions_fts(cursor)
+                self.conn.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao criar o índice de busca textual: {e}")
+                if self.conn:
+                    self.conn.rollback()
+            self.fts_enabled = self._questions_fts_available()
+
+    # As migrações usam IF NOT EXISTS porque bancos criados antes do versionamento
+    # (user_version 0) já podem ter parte das tabelas.
+    def _migration_base_schema(self, cursor: sqlite3.Cursor):
+        """Versão 1: tabelas e triggers originais da aplicação."""
+        # Tabela Entities
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Entities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            details_json TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+        # Tabela Events
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            event_type TEXT NOT NULL,
+            location TEXT,
+            recurrence_rule TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+        # Tabela Event_Entities (Tabela de Associação)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Event_Entities (
+            event_id INTEGER NOT NULL,
+            entity_id INTEGER NOT NULL,
+            role TEXT,
+            PRIMARY KEY (event_id, entity_id),
+            FOREIGN KEY (event_id) REFERENCES Events(id) ON DELETE CASCADE,
+            FOREIGN KEY (entity_id) REFERENCES Entities(id) ON DELETE CASCADE
+        )
+        """)
+
+        # Tabela Tasks
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            priority TEXT DEFAULT 'Medium',
+            due_date TIMESTAMP,
+            status TEXT DEFAULT 'Open',
+            parent_event_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (parent_event_id) REFERENCES Events(id) ON DELETE SET NULL
+        )
+        """)
 
-            # Tabela Tasks
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                priority TEXT DEFAULT 'Medium',
-                due_date TIMESTAMP,
-                status TEXT DEFAULT 'Open',
-                parent_event_id INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (parent_event_id) REFERENCES Events(id) ON DELETE SET NULL
-            )
-            """)
+        # Tabela Settings
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """)
+
+        # Tabela Questions
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            subject TEXT,
+            difficulty TEXT,
+            options TEXT, -- JSON array de strings
+            answer TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+        # Triggers para atualizar 'updated_at'
+
+        # Trigger para Entities
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS update_entities_updated_at
+        AFTER UPDATE ON Entities
+        FOR EACH ROW
+        BEGIN
+            UPDATE Entities SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+        END;
+        """)
+
+        # Trigger para Events
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS update_events_updated_at
+        AFTER UPDATE ON Events
+        FOR EACH ROW
+        BEGIN
+            UPDATE Events SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+        END;
+        """)
+
+        # Trigger para Tasks
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS update_tasks_updated_at
+        AFTER UPDATE ON Tasks
+        FOR EACH ROW
+        BEGIN
+            UPDATE Tasks SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+        END;
+        """)
+
+        # Trigger para Questions
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS update_questions_updated_at
+        AFTER UPDATE ON Questions
+        FOR EACH ROW
+        BEGIN
+            UPDATE Questions SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+        END;
+        """)
+
+        # Tabela QuizConfigs
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS QuizConfigs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            question_ids TEXT NOT NULL, -- JSON list de ints (legado; a fonte é QuizConfig_Questions)
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP 
+        )
+        """)
+        # Trigger para QuizConfigs updated_at
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS update_quiz_configs_updated_at
+        AFTER UPDATE ON QuizConfigs
+        FOR EACH ROW
+        BEGIN
+            UPDATE QuizConfigs SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+        END;
+        """)
+
+        # Tabela QuizAttempts
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS QuizAttempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quiz_config_id INTEGER NOT NULL,
+            user_answers TEXT NOT NULL, -- JSON Dict[int, str]
+            score INTEGER NOT NULL,
+            total_questions INTEGER NOT NULL,
+            attempted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- Embora possa não ser muito usado
+            FOREIGN KEY (quiz_config_id) REFERENCES QuizConfigs(id) ON DELETE CASCADE
+        )
+        """)
+        # Trigger para QuizAttempts updated_at
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS update_quiz_attempts_updated_at
+        AFTER UPDATE ON QuizAttempts
+        FOR EACH ROW
+        BEGIN
+            UPDATE QuizAttempts SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+        END;
+        """)
+
+    def _migration_event_range_indexes(self, cursor: sqlite3.Cursor):
+        """Versão 2: índices de intervalo de datas e ocorrências materializadas de eventos recorrentes."""
+        # Índice para consultas por intervalo de datas (get_events_in_range)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_start_time ON Events(start_time)")
+        # Índice parcial só com os eventos recorrentes (expandidos em get_events_in_range)
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_events_recurring
+        ON Events(start_time) WHERE recurrence_rule IS NOT NULL
+        """)
+
+        # Tabela EventOccurrences (cache materializado das ocorrências de eventos recorrentes)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS EventOccurrences (
+            event_id INTEGER NOT NULL,
+            occurrence_start TIMESTAMP NOT NULL,
+            occurrence_end TIMESTAMP,
+            PRIMARY KEY (event_id, occurrence_start),
+            FOREIGN KEY (event_id) REFERENCES Events(id) ON DELETE CASCADE
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_event_occurrences_start ON EventOccurrences(occurrence_start)")
 
-            # Tabela Settings
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Settings (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-            """)
+    def _migration_questions_fts(self, cursor: sqlite3.Cursor):
+        """Versão 3: índice FTS5 das perguntas (texto, resposta e opções) e triggers de sincronização.
 
-            # Tabela Questions
+        O SQLite pode ter sido compilado sem FTS5; nesse caso a migração não cria nada
+        e search_questions recorre a LIKE. _create_tables volta a chamá-la na abertura
+        quando QuestionsFTS não existir e o SQLite em uso passar a ter o FTS5.
+        """
+        cursor.execute("SAVEPOINT questions_fts")
+        try:
+            # Tabela de conteúdo externo: o texto fica apenas em Questions
             cursor.execute("""
-            CREATE TABLE IF NOT EXISTS Questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                text TEXT NOT NULL,
-                subject TEXT,
-                difficulty TEXT,
-                options TEXT, -- JSON array de strings
-                answer TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            CREATE VIRTUAL TABLE IF NOT EXISTS QuestionsFTS USING fts5(
+                text, answer, options,
+                content='Questions', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3 4'
             )
             """)
-
-            # Triggers para atualizar 'updated_at'
-
-            # Trigger para Entities
-            cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_entities_updated_at
-            AFTER UPDATE ON Entities
-            FOR EACH ROW
-            BEGIN
-                UPDATE Entities SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
-            END;
-            """)
-
-            # Trigger para Events
-            cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_events_updated_at
-            AFTER UPDATE ON Events
-            FOR EACH ROW
-            BEGIN
-                UPDATE Events SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
-            END;
-            """)
-
-            # Trigger para Tasks
-            cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_tasks_updated_at
-            AFTER UPDATE ON Tasks
-            FOR EACH ROW
-            BEGIN
-                UPDATE Tasks SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
-            END;
-            """)
-
-            # Trigger para Questions
             cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_questions_updated_at
-            AFTER UPDATE ON Questions
-            FOR EACH ROW
+            CREATE TRIGGER IF NOT EXISTS questions_fts_insert
+            AFTER INSERT ON Questions
             BEGIN
-                UPDATE Questions SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+                INSERT INTO QuestionsFTS(rowid, text, answer, options)
+                VALUES (NEW.id, NEW.text, NEW.answer, NEW.options);
             END;
             """)
-
-            # Tabela QuizConfigs
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS QuizConfigs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                question_ids TEXT NOT NULL, -- JSON list de ints
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP 
-            )
-            """)
-            # Trigger para QuizConfigs updated_at
             cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_quiz_configs_updated_at
-            AFTER UPDATE ON QuizConfigs
-            FOR EACH ROW
+            CREATE TRIGGER IF NOT EXISTS questions_fts_delete
+            AFTER DELETE ON Questions
             BEGIN
-                UPDATE QuizConfigs SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+                INSERT INTO QuestionsFTS(QuestionsFTS, rowid, text, answer, options)
+                VALUES ('delete', OLD.id, OLD.text, OLD.answer, OLD.options);
             END;
             """)
-
-            # Tabela QuizAttempts
             cursor.execute("""
-            CREATE TABLE IF NOT EXISTS QuizAttempts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                quiz_config_id INTEGER NOT NULL,
-                user_answers TEXT NOT NULL, -- JSON Dict[int, str]
-                score INTEGER NOT NULL,
-                total_questions INTEGER NOT NULL,
-                attempted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, -- Embora possa não ser muito usado
-                FOREIGN KEY (quiz_config_id) REFERENCES QuizConfigs(id) ON DELETE CASCADE
-            )
-            """)
-            # Trigger para QuizAttempts updated_at
-            cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_quiz_attempts_updated_at
-            AFTER UPDATE ON QuizAttempts
-            FOR EACH ROW
+            CREATE TRIGGER IF NOT EXISTS questions_fts_update
+            AFTER UPDATE OF text, answer, options ON Questions
             BEGIN
-                UPDATE QuizAttempts SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
+                INSERT INTO QuestionsFTS(QuestionsFTS, rowid, text, answer, options)
+                VALUES ('delete', OLD.id, OLD.text, OLD.answer, OLD.options);
+                INSERT INTO QuestionsFTS(rowid, text, answer, options)
+                VALUES (NEW.id, NEW.text, NEW.answer, NEW.options);
             END;
             """)
-
-            self.conn.commit()
+            # Indexa as perguntas que já existiam antes da criação do índice
+            cursor.execute("INSERT INTO QuestionsFTS(QuestionsFTS) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Aviso: busca textual FTS5 indisponível, usando LIKE: {e}")
+            cursor.execute("ROLLBACK TO questions_fts")
+        cursor.execute("RELEASE questions_fts")
+
+    def _migration_quiz_config_questions(self, cursor: sqlite3.Cursor):
+        """Versão 4: QuizConfig_Questions (perguntas de cada quiz, na ordem definida)."""
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS QuizConfig_Questions (
+            quiz_config_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            PRIMARY KEY (quiz_config_id, position),
+            FOREIGN KEY (quiz_config_id) REFERENCES QuizConfigs(id) ON DELETE CASCADE,
+            FOREIGN KEY (question_id) REFERENCES Questions(id) ON DELETE CASCADE
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_quiz_config_questions_question ON QuizConfig_Questions(question_id)")
+        self._migrate_quiz_config_question_ids(cursor)
+
+    def _migration_attempt_answers(self, cursor: sqlite3.Cursor):
+        """Versão 5: AttemptAnswers (uma linha por resposta, para estatísticas em SQL)."""
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS AttemptAnswers (
+            attempt_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL, -- Sem FK: o histórico sobrevive à exclusão da pergunta
+            answer TEXT,
+            is_correct INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (attempt_id, question_id),
+            FOREIGN KEY (attempt_id) REFERENCES QuizAttempts(id) ON DELETE CASCADE
+        )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attempt_answers_question ON AttemptAnswers(question_id, is_correct)")
+        self._migrate_attempt_answers(cursor)
+
+    def _migration_questions_subject_index(self, cursor: sqlite3.Cursor):
+        """Versão 6: índice na ordem de listagem do banco de perguntas (subject, id)."""
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_questions_subject ON Questions(subject)")
+
+    def _migration_event_entities_entity_index(self, cursor: sqlite3.Cursor):
+        """Versão 7: índice reverso de Event_Entities (eventos de uma entidade).
+
+        A chave primária (event_id, entity_id) só atende buscas por evento; este índice
+        (com o papel, para cobrir a consulta) atende get_events_for_entity.
+        """
+        cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_event_entities_entity
+        ON Event_Entities(entity_id, event_id, role)
+        """)
+
+    def _sqlite_has_fts5(self) -> bool:
+        """True se o SQLite em uso foi compilado com FTS5 (consulta sem DDL)."""
+        try:
+            row = self.conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()
+            return bool(row[0])
         except sqlite3.Error as e:
-            print(f"Erro ao criar tabelas ou triggers: {e}")
-            if self.conn:
-                self.conn.rollback() # Desfaz alterações em caso de erro
+            logger.error(f"Erro ao verificar o suporte a FTS5: {e}")
+            return False
+
+    def _questions_fts_available(self) -> bool:
+        """True se QuestionsFTS existe e o SQLite em uso tem o módulo FTS5."""
+        try:
+            self.conn.execute("SELECT 1 FROM QuestionsFTS LIMIT 0")
+            return True
+        except sqlite3.Error:
+            return False
 
     def _datetime_from_str(self, timestamp_str: Optional[str]) -> Optional[datetime]:
         """Converte string ISO 8601 para objeto datetime."""
@@ -213,7 +552,7 @@ class DatabaseManager:
                     return datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
                 except ValueError:
                     # Adicione mais formatos se necessário ou logue um aviso
-                    print(f"Aviso: Formato de data/hora inesperado '{timestamp_str}'")
+                    logger.warning(f"Aviso: Formato de data/hora inesperado '{timestamp_str}'")
                     return None
         return None
 
@@ -223,51 +562,369 @@ class DatabaseManager:
             return dt_obj.isoformat(sep=' ', timespec='seconds') # YYYY-MM-DD HH:MM:SS
         return None
 
-    def get_events_by_date(self, date_obj: date) -> List[Event]:
-        """Busca eventos pela data (ignorando a hora) de start_time."""
-        events = []
+    def _insert_many(self, query: str, models: Iterable[Any], to_params: Callable[[Any], tuple],
+                     on_chunk: Optional[Callable[[sqlite3.Cursor, List[Any]], None]] = None) -> List[int]:
+        """Insere modelos em lote numa única transação e retorna os ids atribuídos.
+
+        As linhas são enviadas com executemany em blocos de BULK_CHUNK_SIZE para limitar
+        a memória. Os ids vêm de last_insert_rowid(): dentro da transação (que detém o
+        lock de escrita) os ids AUTOINCREMENT de um mesmo executemany são contíguos.
+        Cada modelo recebe seu id; on_chunk, se fornecido, é chamado após cada bloco.
+        """
+        ids: List[int] = []
+        cursor = self.conn.cursor()
+        chunk: List[Any] = []
+
+        def flush():
+            cursor.executemany(query, [to_params(model) for model in chunk])
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(chunk) + 1
+            for offset, model in enumerate(chunk):
+                model.id = first_id + offset
+            ids.extend(range(first_id, last_id + 1))
+            if on_chunk:
+                on_chunk(cursor, chunk)
+            chunk.clear()
+
+        for model in models:
+            chunk.append(model)
+            if len(chunk) >= self.BULK_CHUNK_SIZE:
+                flush()
+        if chunk:
+            flush()
+        return ids
+
+    def _event_from_row(self, row: sqlite3.Row) -> Optional[Event]:
+        """Cria um objeto Event a partir de uma linha do banco de dados."""
+        if not row:
+            return None
+        return Event(
+            id=row['id'],
+            title=row['title'],
+            description=row['description'],
+            start_time=self._datetime_from_str(row['start_time']),
+            end_time=self._datetime_from_str(row['end_time']),
+            event_type=row['event_type'],
+            location=row['location'],
+            recurrence_rule=row['recurrence_rule'],
+            created_at=self._datetime_from_str(row['created_at']),
+            updated_at=self._datetime_from_str(row['updated_at'])
+        )
+
+    def _expand_recurring_event(self, event: Event, start: datetime, end: datetime) -> Iterator[Event]:
+        """Gera as ocorrências de um evento recorrente que caem em [start, end).
+
+        Cada ocorrência é uma cópia do evento base (mesmo id) com start_time/end_time
+        deslocados. Regras vazias ou inválidas tratam o evento como não recorrente.
+        """
+        if not event.start_time:
+            return
+        rule = None
+        if event.recurrence_rule and event.recurrence_rule.strip():
+            try:
+                rule = RecurrenceRule.parse(event.recurrence_rule)
+            except ValueError as e:
+                logger.warning(f"Aviso: regra de recorrência inválida para Event ID {event.id}: {e}")
+        if rule is None:
+            if start <= event.start_time < end:
+                yield event
+            return
+
+        duration = event.end_time - event.start_time if event.end_time else None
+        for occurrence_start in rule.occurrences(event.start_time, start, end):
+            yield Event(
+                id=event.id,
+                title=event.title,
+                description=event.description,
+                start_time=occurrence_start,
+                end_time=occurrence_start + duration if duration is not None else None,
+                event_type=event.event_type,
+                location=event.location,
+                recurrence_rule=event.recurrence_rule,
+                created_at=event.created_at,
+                updated_at=event.updated_at
+            )
+
+    # --- Ocorrências materializadas de eventos recorrentes ---
+    def _get_occurrence_horizon(self, cursor: sqlite3.Cursor) -> Optional[tuple[datetime, datetime]]:
+        """Lê da tabela Settings o intervalo [início, fim) já materializado em EventOccurrences."""
+        cursor.execute("SELECT key, value FROM Settings WHERE key IN (?, ?)",
+                       (self.OCCURRENCE_HORIZON_START_KEY, self.OCCURRENCE_HORIZON_END_KEY))
+        values = {row['key']: self._datetime_from_str(row['value']) for row in cursor.fetchall()}
+        horizon_start = values.get(self.OCCURRENCE_HORIZON_START_KEY)
+        horizon_end = values.get(self.OCCURRENCE_HORIZON_END_KEY)
+        if horizon_start and horizon_end:
+            return horizon_start, horizon_end
+        return None
+
+    def _set_occurrence_horizon(self, cursor: sqlite3.Cursor, start: datetime, end: datetime):
+        cursor.executemany("INSERT OR REPLACE INTO Settings (key, value) VALUES (?, ?)", [
+            (self.OCCURRENCE_HORIZON_START_KEY, self._datetime_to_str(start)),
+            (self.OCCURRENCE_HORIZON_END_KEY, self._datetime_to_str(end)),
+        ])
+
+    def _materialize_occurrences(self, cursor: sqlite3.Cursor, events: List[Event], start: datetime, end: datetime):
+        """Expande os eventos em [start, end) e grava as ocorrências em EventOccurrences."""
+        query = """
+        INSERT OR IGNORE INTO EventOccurrences (event_id, occurrence_start, occurrence_end)
+        VALUES (?, ?, ?)
+        """
+        batch: List[tuple] = []
+        for event in events:
+            for occurrence in self._expand_recurring_event(event, start, end):
+                batch.append((occurrence.id,
+                              self._datetime_to_str(occurrence.start_time),
+                              self._datetime_to_str(occurrence.end_time)))
+                if len(batch) >= self.OCCURRENCE_BATCH_SIZE:
+                    cursor.executemany(query, batch)
+                    batch.clear()
+        if batch:
+            cursor.executemany(query, batch)
+
+    def _materialize_all_recurring(self, cursor: sqlite3.Cursor, start: datetime, end: datetime):
+        """Materializa todos os eventos recorrentes que podem ter ocorrências em [start, end)."""
+        cursor.execute("""
+        SELECT id, title, description, start_time, end_time, event_type, location, recurrence_rule, created_at, updated_at
+        FROM Events
+        WHERE recurrence_rule IS NOT NULL AND start_time < ?
+        """, (self._datetime_to_str(end),))
+        events = [event for event in (self._event_from_row(row) for row in cursor.fetchall()) if event]
+        self._materialize_occurrences(cursor, events, start, end)
+
+    def _refresh_event_occurrences(self, cursor: sqlite3.Cursor, event: Event):
+        """Recalcula as ocorrências materializadas de um único evento dentro da janela atual."""
+        cursor.execute("DELETE FROM EventOccurrences WHERE event_id = ?", (event.id,))
+        if not event.recurrence_rule:
+            return
+        horizon = self._get_occurrence_horizon(cursor)
+        if horizon:
+            self._materialize_occurrences(cursor, [event], horizon[0], horizon[1])
+
+    def _current_occurrence_window(self) -> Tuple[datetime, datetime]:
+        """Janela [início, fim) que deve estar materializada, ancorada no primeiro dia do mês atual."""
+        today = date.today()
+        anchor = datetime(today.year, today.month, 1)
+        return anchor - self.OCCURRENCE_WINDOW_PAST, anchor + self.OCCURRENCE_WINDOW_FUTURE
+
+    def _refresh_occurrence_window(self):
+        """Move a janela de EventOccurrences para perto da data atual (chamado na abertura).
+
+        Remove as ocorrências que saíram da janela e materializa só as partes novas; como
+        a âncora é o mês atual, isso grava no máximo uma vez por mês. As consultas nunca
+        gravam: fora da janela, as ocorrências são expandidas em memória.
+        """
+        if not self.conn:
+            return
+        new_start, new_end = self._current_occurrence_window()
+        try:
+            cursor = self.conn.cursor()
+            window = self._get_occurrence_horizon(cursor)
+            if window == (new_start, new_end):
+                return
+            if window is None or window[1] <= new_start or new_end <= window[0]:
+                cursor.execute("DELETE FROM EventOccurrences")
+                self._materialize_all_recurring(cursor, new_start, new_end)
+            else:
+                cursor.execute("DELETE FROM EventOccurrences WHERE occurrence_start < ?",
+                               (self._datetime_to_str(new_start),))
+                cursor.execute("DELETE FROM EventOccurrences WHERE occurrence_start >= ?",
+                               (self._datetime_to_str(new_end),))
+                if new_start < window[0]:
+                    self._materialize_all_recurring(cursor, new_start, window[0])
+                if window[1] < new_end:
+                    self._materialize_all_recurring(cursor, window[1], new_end)
+            self._set_occurrence_horizon(cursor, new_start, new_end)
+            self._commit()
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao atualizar a janela de ocorrências materializadas: {e}")
+            if self.conn: self._rollback()
+
+    def _occurrences_outside_window(self, cursor: sqlite3.Cursor, start: datetime, end: datetime,
+                                    entity_id: Optional[int] = None) -> List[Tuple[Event, Optional[str]]]:
+        """Ocorrências em [start, end) fora da janela materializada, expandidas em memória.
+
+        Devolve pares (ocorrência, papel); o papel só vem preenchido com entity_id, que
+        restringe aos eventos vinculados àquela entidade. Sem janela gravada, expande tudo.
+        """
+        window = self._get_occurrence_horizon(cursor)
+        if window is None:
+            parts = [(start, end)]
+        else:
+            parts = [(start, min(end, window[0])), (max(start, window[1]), end)]
+        parts = [(part_start, part_end) for part_start, part_end in parts if part_start < part_end]
+        if not parts:
+            return []
+
+        columns = "E.id, E.title, E.description, E.start_time, E.end_time, E.event_type, E.location, E.recurrence_rule, E.created_at, E.updated_at"
+        if entity_id is None:
+            cursor.execute(f"""
+            SELECT {columns}, NULL AS role FROM Events E
+            WHERE E.recurrence_rule IS NOT NULL AND E.start_time < ?
+            """, (self._datetime_to_str(end),))
+        else:
+            cursor.execute(f"""
+            SELECT {columns}, EE.role FROM Event_Entities EE
+            JOIN Events E ON E.id = EE.event_id
+            WHERE EE.entity_id = ? AND E.recurrence_rule IS NOT NULL AND E.start_time < ?
+            """, (entity_id, self._datetime_to_str(end)))
+
+        occurrences: List[Tuple[Event, Optional[str]]] = []
+        for row in cursor.fetchall():
+            event = self._event_from_row(row)
+            if not event:
+                continue
+            for part_start, part_end in parts:
+                occurrences.extend((occurrence, row['role'])
+                                   for occurrence in self._expand_recurring_event(event, part_start, part_end))
+        return occurrences
+
+    def get_events_in_range(self, start: datetime, end: datetime) -> List[Event]:
+        """Busca eventos cujo start_time está no intervalo semiaberto [start, end).
+
+        O predicado compara a coluna diretamente (sem funções sobre ela), então a
+        consulta usa o índice idx_events_start_time em vez de varrer a tabela.
+        Eventos recorrentes vêm de EventOccurrences (também indexada por início) dentro
+        da janela materializada, e são expandidos em memória fora dela.
+        """
+        events: List[Event] = []
         if not self.conn:
-            print("Conexão com o banco de dados não estabelecida.")
+            logger.error("Conexão com o banco de dados não estabelecida.")
             return events
-        
+
         try:
             cursor = self.conn.cursor()
-            # Busca eventos onde a data de start_time corresponde à date_obj
-            # Usamos strftime para comparar apenas a parte da data
-            query = """
-            SELECT id, title, description, start_time, end_time, event_type, location, recurrence_rule, created_at, updated_at
-            FROM Events
-            WHERE date(start_time) = ?
-            ORDER BY start_time
-            """
-            cursor.execute(query, (date_obj.isoformat(),))
-            
+            query = self.EVENTS_IN_RANGE_QUERY + " ORDER BY start_time"
+            start_str, end_str = self._datetime_to_str(start), self._datetime_to_str(end)
+            cursor.execute(query, (start_str, end_str, start_str, end_str))
             for row in cursor.fetchall():
-                event = Event(
-                    id=row['id'],
-                    title=row['title'],
-                    description=row['description'],
-                    start_time=self._datetime_from_str(row['start_time']),
-                    end_time=self._datetime_from_str(row['end_time']),
-                    event_type=row['event_type'],
-                    location=row['location'],
-                    recurrence_rule=row['recurrence_rule'],
-                    created_at=self._datetime_from_str(row['created_at']),
-                    updated_at=self._datetime_from_str(row['updated_at'])
-                )
+                event = self._event_from_row(row)
                 # Filtrar eventos onde start_time não pôde ser parseado (embora não devesse acontecer com dados válidos)
-                if event.start_time:
+                if event and event.start_time:
                     events.append(event)
+            outside = self._occurrences_outside_window(cursor, start, end)
+            if outside:
+                events.extend(occurrence for occurrence, _ in outside)
+                events.sort(key=lambda event: event.start_time)
         except sqlite3.Error as e:
-            print(f"Erro ao buscar eventos por data: {e}")
+            logger.error(f"Erro ao buscar eventos por intervalo: {e}")
+            if self.conn: self._rollback()
         return events
 
+    def get_events_by_date(self, date_obj: date) -> List[Event]:
+        """Busca eventos pela data (ignorando a hora) de start_time."""
+        day_start = datetime.combine(date_obj, datetime.min.time())
+        return self.get_events_in_range(day_start, day_start + timedelta(days=1))
+
+    def get_events_with_entities_in_range(self, start: datetime, end: datetime) -> List[Tuple[Event, List[Tuple[Entity, str]]]]:
+        """Como get_events_in_range, mas devolve cada evento junto das entidades vinculadas e seus papéis.
+
+        Eventos e vínculos vêm de uma única consulta (LEFT JOIN com Event_Entities e
+        Entities), em vez de um get_entities_for_event por evento. Uma mesma entidade
+        ligada a vários eventos do intervalo é representada por um único objeto.
+        """
+        results: List[Tuple[Event, List[Tuple[Entity, str]]]] = []
+        if not self.conn:
+            logger.error("Conexão com o banco de dados não estabelecida.")
+            return results
+
+        try:
+            cursor = self.conn.cursor()
+            query = f"""
+            SELECT R.*, EE.role, EN.id AS entity_id, EN.name AS entity_name, EN.type AS entity_type,
+                   EN.details_json AS entity_details_json, EN.created_at AS entity_created_at,
+                   EN.updated_at AS entity_updated_at
+            FROM ({self.EVENTS_IN_RANGE_QUERY}) R
+            LEFT JOIN Event_Entities EE ON EE.event_id = R.id
+            LEFT JOIN Entities EN ON EN.id = EE.entity_id
+            ORDER BY R.start_time, R.id
+            """
+            start_str, end_str = self._datetime_to_str(start), self._datetime_to_str(end)
+            cursor.execute(query, (start_str, end_str, start_str, end_str))
+
+            entities_by_id: Dict[int, Entity] = {}
+            current_key = None
+            for row in cursor.fetchall():
+                # Linhas consecutivas com o mesmo (id, início) são o mesmo evento (ou ocorrência)
+                key = (row['id'], row['start_time'])
+                if key != current_key:
+                    current_key = key
+                    event = self._event_from_row(row)
+                    if not event or not event.start_time:
+                        current_key = None
+                        continue
+                    results.append((event, []))
+                if row['entity_id'] is None:
+                    continue
+                entity = entities_by_id.get(row['entity_id'])
+                if entity is None:
+                    entity = self._entity_from_row({
+                        'id': row['entity_id'], 'name': row['entity_name'], 'type': row['entity_type'],
+                        'details_json': row['entity_details_json'],
+                        'created_at': row['entity_created_at'], 'updated_at': row['entity_updated_at'],
+                    })
+                    entities_by_id[row['entity_id']] = entity
+                results[-1][1].append((entity, row['role']))
+
+            outside = self._occurrences_outside_window(cursor, start, end)
+            if outside:
+                links = self._get_entity_links(cursor, {occurrence.id for occurrence, _ in outside}, entities_by_id)
+                results.extend((occurrence, list(links.get(occurrence.id, []))) for occurrence, _ in outside)
+                results.sort(key=lambda result: (result[0].start_time, result[0].id))
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar eventos com entidades por intervalo: {e}")
+            if self.conn: self._rollback()
+        return results
+
+    def get_event_counts_by_day(self, start: datetime, end: datetime) -> Dict[date, int]:
+        """Conta os eventos de cada dia no intervalo semiaberto [start, end), com uma única consulta.
+
+        Usa os mesmos predicados indexados de get_events_in_range (ocorrências recorrentes
+        incluídas) e agrupa pelo prefixo de data de start_time. Ocorrências fora da janela
+        materializada são contadas em memória. Dias sem eventos não aparecem.
+        """
+        counts: Dict[date, int] = {}
+        if not self.conn:
+            logger.error("Conexão com o banco de dados não estabelecida.")
+            return counts
+
+        try:
+            cursor = self.conn.cursor()
+            query = """
+            SELECT day, COUNT(*) AS event_count FROM (
+                SELECT substr(start_time, 1, 10) AS day
+                FROM Events
+                WHERE start_time >= ? AND start_time < ? AND recurrence_rule IS NULL
+                UNION ALL
+                SELECT substr(occurrence_start, 1, 10)
+                FROM EventOccurrences
+                WHERE occurrence_start >= ? AND occurrence_start < ?
+            )
+            GROUP BY day
+            """
+            start_str, end_str = self._datetime_to_str(start), self._datetime_to_str(end)
+            cursor.execute(query, (start_str, end_str, start_str, end_str))
+            for row in cursor.fetchall():
+                try:
+                    counts[date.fromisoformat(row['day'])] = row['event_count']
+                except (TypeError, ValueError):
+                    logger.warning(f"Aviso: data de evento inválida ignorada na contagem por dia: {row['day']}")
+            for occurrence, _ in self._occurrences_outside_window(cursor, start, end):
+                day = occurrence.start_time.date()
+                counts[day] = counts.get(day, 0) + 1
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao contar eventos por dia: {e}")
+            if self.conn: self._rollback()
+        return counts
+
     def get_event_by_id(self, event_id: int) -> Optional[Event]:
         """Busca um evento específico pelo seu ID."""
         if not self.conn:
-            print("Conexão com o banco de dados não estabelecida.")
+            logger.error("Conexão com o banco de dados não estabelecida.")
             return None
-            
+
+        cached = self._caches['events'].get(event_id)
+        if cached is not None:
+            return cached
         try:
             cursor = self.conn.cursor()
             query = """
@@ -277,30 +934,20 @@ class DatabaseManager:
             """
             cursor.execute(query, (event_id,))
             row = cursor.fetchone()
-            
-            if row:
-                event = Event(
-                    id=row['id'],
-                    title=row['title'],
-                    description=row['description'],
-                    start_time=self._datetime_from_str(row['start_time']),
-                    end_time=self._datetime_from_str(row['end_time']),
-                    event_type=row['event_type'],
-                    location=row['location'],
-                    recurrence_rule=row['recurrence_rule'],
-                    created_at=self._datetime_from_str(row['created_at']),
-                    updated_at=self._datetime_from_str(row['updated_at'])
-                )
-                return event
+            event = self._event_from_row(row)
+            self._caches['events'].put(event_id, event)
+            return event
         except sqlite3.Error as e:
-            print(f"Erro ao buscar evento por ID: {e}")
+            logger.error(f"Erro ao buscar evento por ID: {e}")
         return None
 
-    def add_event(self, event: Event) -> Optional[Event]:
-        print(f"[DBManager] add_event called with event: {event.__dict__}")
-        """Adiciona um novo evento ao banco de dados."""
+    def add_event(self, event: Event, entity_roles: Optional[Dict[int, str]] = None) -> Optional[Event]:
+        """Adiciona um novo evento ao banco de dados.
+
+        entity_roles ({entity_id: papel}), se informado, vincula as entidades na mesma transação.
+        """
         if not self.conn:
-            print("Conexão com o banco de dados não estabelecida.")
+            logger.error("Conexão com o banco de dados não estabelecida.")
             return None
         
         try:
@@ -309,7 +956,6 @@ class DatabaseManager:
             INSERT INTO Events (title, description, start_time, end_time, event_type, location, recurrence_rule)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             """
-            print(f"[DBManager] add_event: Executing query: {query}")
             params = (
                 event.title,
                 event.description,
@@ -317,81 +963,135 @@ class DatabaseManager:
                 self._datetime_to_str(event.end_time),
                 event.event_type,
                 event.location,
-                event.recurrence_rule
+                event.recurrence_rule or None # Regra vazia equivale a evento não recorrente
             )
-            print(f"[DBManager] add_event: With params: {params}")
             cursor.execute(query, params)
-            self.conn.commit()
             event.id = cursor.lastrowid
-            print(f"[DBManager] add_event: Event ID after insert: {event.id}")
+            if event.recurrence_rule:
+                self._refresh_event_occurrences(cursor, event)
+            if entity_roles:
+                self._apply_event_entities(cursor, event.id, entity_roles)
+            self._commit()
             
             if event.id is not None:
-                retrieved_event = self.get_event_by_id(event.id) # Fetch to get all fields
-                print(f"[DBManager] add_event: Returning event: {retrieved_event.__dict__ if retrieved_event else None}")
-                return retrieved_event
-            print("[DBManager] add_event: event.id was None after insert.")
+                return self.get_event_by_id(event.id) # Fetch to get all fields
+            logger.error("Erro ao adicionar evento: ID não atribuído após a inserção.")
             return None
             
         except sqlite3.Error as e:
-            print(f"[DBManager] add_event: SQLite error: {e}") # Log the error
+            logger.error(f"Erro ao adicionar evento: {e}")
             if self.conn:
-                self.conn.rollback()
+                self._rollback()
             return None
 
-    def update_event(self, event: Event) -> bool:
-        """Atualiza um evento existente no banco de dados."""
+    def add_events_bulk(self, events: Iterable[Event]) -> List[int]:
+        """Adiciona vários eventos numa única transação. Retorna os ids na ordem de entrada."""
+        if not self.conn: return []
+        query = """
+        INSERT INTO Events (title, description, start_time, end_time, event_type, location, recurrence_rule)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+
+        def materialize_recurring(cursor: sqlite3.Cursor, chunk: List[Event]):
+            recurring = [event for event in chunk if event.recurrence_rule]
+            if recurring:
+                horizon = self._get_occurrence_horizon(cursor)
+                if horizon:
+                    self._materialize_occurrences(cursor, recurring, horizon[0], horizon[1])
+
+        try:
+            ids = self._insert_many(query, events, lambda event: (
+                event.title,
+                event.description,
+                self._datetime_to_str(event.start_time),
+                self._datetime_to_str(event.end_time),
+                event.event_type,
+                event.location,
+                event.recurrence_rule or None
+            ), on_chunk=materialize_recurring)
+            self._commit()
+            return ids
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao adicionar eventos em lote: {e}")
+            if self.conn: self._rollback()
+            return []
+
+    def update_event(self, event: Event, entity_roles: Optional[Dict[int, str]] = None) -> bool:
+        """Atualiza um evento existente no banco de dados.
+
+        As ocorrências materializadas só são recalculadas quando a regra de
+        recorrência ou os horários (início/duração) do evento mudam. Com entity_roles
+        ({entity_id: papel}), os vínculos com entidades passam a ser exatamente esses,
+        na mesma transação da atualização (ver set_event_entities).
+        """
         if not self.conn or event.id is None:
-            print("Conexão não estabelecida ou ID do evento não fornecido para atualização.")
+            logger.error("Conexão não estabelecida ou ID do evento não fornecido para atualização.")
             return False
         
+        self._caches['events'].invalidate(event.id)
         try:
             cursor = self.conn.cursor()
+            cursor.execute("SELECT start_time, end_time, recurrence_rule FROM Events WHERE id = ?", (event.id,))
+            previous = cursor.fetchone()
             query = """
             UPDATE Events
             SET title = ?, description = ?, start_time = ?, end_time = ?, 
                 event_type = ?, location = ?, recurrence_rule = ?
             WHERE id = ?
             """
+            start_str = self._datetime_to_str(event.start_time)
+            end_str = self._datetime_to_str(event.end_time)
+            recurrence_rule = event.recurrence_rule or None
             # updated_at será atualizado pelo trigger
             cursor.execute(query, (
                 event.title,
                 event.description,
-                self._datetime_to_str(event.start_time),
-                self._datetime_to_str(event.end_time),
+                start_str,
+                end_str,
                 event.event_type,
                 event.location,
-                event.recurrence_rule,
+                recurrence_rule,
                 event.id
             ))
-            self.conn.commit()
-            return cursor.rowcount > 0 # Retorna True se alguma linha foi afetada
+            updated = cursor.rowcount > 0
+            if updated and previous and (previous['recurrence_rule'] or recurrence_rule):
+                if (previous['start_time'], previous['end_time'], previous['recurrence_rule']) != (start_str, end_str, recurrence_rule):
+                    self._refresh_event_occurrences(cursor, event)
+            if updated and entity_roles is not None:
+                self._apply_event_entities(cursor, event.id, entity_roles)
+            self._commit()
+            return updated # Retorna True se alguma linha foi afetada
         except sqlite3.Error as e:
-            print(f"Erro ao atualizar evento: {e}")
+            logger.error(f"Erro ao atualizar evento: {e}")
             if self.conn:
-                self.conn.rollback()
+                self._rollback()
             return False
 
     def delete_event(self, event_id: int) -> bool:
         """Exclui um evento do banco de dados pelo seu ID."""
         if not self.conn:
-            print("Conexão com o banco de dados não estabelecida.")
+            logger.error("Conexão com o banco de dados não estabelecida.")
             return False
             
+        self._caches['events'].invalidate(event_id)
+        # Tarefas filhas têm parent_event_id anulado (ON DELETE SET NULL)
+        self._caches['tasks'].clear()
         try:
             cursor = self.conn.cursor()
             query = "DELETE FROM Events WHERE id = ?"
+            # ON DELETE CASCADE remove as ocorrências materializadas em EventOccurrences
             cursor.execute(query, (event_id,))
-            self.conn.commit()
+            self._commit()
             return cursor.rowcount > 0 # Retorna True se alguma linha foi afetada
         except sqlite3.Error as e:
-            print(f"Erro ao excluir evento: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao excluir evento: {e}")
+            if self.conn: self._rollback()
             return False
 
     def _add_sample_event_and_task(self):
         """Adiciona um evento de exemplo e uma tarefa associada para testes."""
         if not self.conn:
-            print("Conexão para _add_sample_event_and_task não estabelecida.")
+            logger.error("Conexão para _add_sample_event_and_task não estabelecida.")
             return
         try:
             cursor = self.conn.cursor()
@@ -403,7 +1103,7 @@ class DatabaseManager:
             existing_event = cursor.fetchone()
 
             if existing_event:
-                print(f"Evento de exemplo 'Reunião de Planejamento' para {sample_event_date} já existe.")
+                logger.info(f"Evento de exemplo 'Reunião de Planejamento' para {sample_event_date} já existe.")
                 event_id_for_task = existing_event['id']
             else:
                 event_data = {
@@ -422,15 +1122,15 @@ class DatabaseManager:
                     self._datetime_to_str(event_data["start_time"]), self._datetime_to_str(event_data["end_time"]),
                     event_data["event_type"], event_data["location"]
                 ))
-                self.conn.commit()
+                self._commit()
                 event_id_for_task = cursor.lastrowid
-                print(f"Evento de exemplo '{event_data['title']}' adicionado para {sample_event_date} com ID {event_id_for_task}.")
+                logger.info(f"Evento de exemplo '{event_data['title']}' adicionado para {sample_event_date} com ID {event_id_for_task}.")
 
             if event_id_for_task:
                 cursor.execute("SELECT id FROM Tasks WHERE title = ? AND parent_event_id = ?",
                                ("Preparar apresentação para Reunião de Planejamento", event_id_for_task))
                 if cursor.fetchone():
-                    print("Tarefa de exemplo 'Preparar apresentação...' já existe para este evento.")
+                    logger.info("Tarefa de exemplo 'Preparar apresentação...' já existe para este evento.")
                 else:
                     task_data = {
                         "title": "Preparar apresentação para Reunião de Planejamento",
@@ -445,17 +1145,17 @@ class DatabaseManager:
                         task_data["title"], task_data["description"], task_data["priority"],
                         self._datetime_to_str(task_data["due_date"]), task_data["status"], task_data["parent_event_id"]
                     ))
-                    self.conn.commit()
-                    print(f"Tarefa de exemplo '{task_data['title']}' adicionada.")
+                    self._commit()
+                    logger.info(f"Tarefa de exemplo '{task_data['title']}' adicionada.")
         except sqlite3.Error as e:
-            print(f"Erro ao adicionar evento/tarefa de exemplo em _add_sample_event_and_task: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao adicionar evento/tarefa de exemplo em _add_sample_event_and_task: {e}")
+            if self.conn: self._rollback()
             
     # --- CRUD para Tasks ---
     def add_task(self, task: Task) -> Optional[Task]:
         """Adiciona uma nova tarefa ao banco de dados."""
         if not self.conn:
-            print("Conexão com o banco de dados não estabelecida.")
+            logger.error("Conexão com o banco de dados não estabelecida.")
             return None
         try:
             cursor = self.conn.cursor()
@@ -471,27 +1171,53 @@ class DatabaseManager:
                 task.status,
                 task.parent_event_id
             ))
-            self.conn.commit()
+            self._commit()
             task.id = cursor.lastrowid
             if task.id:
                 # Buscar para obter created_at e updated_at definidos pelo DB
                 return self.get_task_by_id(task.id)
             return None
         except sqlite3.Error as e:
-            print(f"Erro ao adicionar tarefa: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao adicionar tarefa: {e}")
+            if self.conn: self._rollback()
             return None
 
+    def add_tasks_bulk(self, tasks: Iterable[Task]) -> List[int]:
+        """Adiciona várias tarefas numa única transação. Retorna os ids na ordem de entrada."""
+        if not self.conn: return []
+        query = """
+        INSERT INTO Tasks (title, description, priority, due_date, status, parent_event_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        try:
+            ids = self._insert_many(query, tasks, lambda task: (
+                task.title,
+                task.description,
+                task.priority,
+                self._datetime_to_str(task.due_date),
+                task.status,
+                task.parent_event_id
+            ))
+            self._commit()
+            return ids
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao adicionar tarefas em lote: {e}")
+            if self.conn: self._rollback()
+            return []
+
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         """Busca uma tarefa específica pelo seu ID."""
         if not self.conn: return None
+        cached = self._caches['tasks'].get(task_id)
+        if cached is not None:
+            return cached
         try:
             cursor = self.conn.cursor()
             query = "SELECT * FROM Tasks WHERE id = ?"
             cursor.execute(query, (task_id,))
             row = cursor.fetchone()
             if row:
-                return Task(
+                task = Task(
                     id=row['id'],
                     title=row['title'],
                     description=row['description'],
@@ -502,9 +1228,11 @@ class DatabaseManager:
                     created_at=self._datetime_from_str(row['created_at']),
                     updated_at=self._datetime_from_str(row['updated_at'])
                 )
+                self._caches['tasks'].put(task_id, task)
+                return task
             return None
         except sqlite3.Error as e:
-            print(f"Erro ao buscar tarefa por ID: {e}")
+            logger.error(f"Erro ao buscar tarefa por ID: {e}")
             return None
 
     def get_all_tasks(self, status: Optional[str] = None, priority: Optional[str] = None) -> List[Task]:
@@ -543,12 +1271,13 @@ class DatabaseManager:
                     updated_at=self._datetime_from_str(row['updated_at'])
                 ))
         except sqlite3.Error as e:
-            print(f"Erro ao buscar todas as tarefas: {e}")
+            logger.error(f"Erro ao buscar todas as tarefas: {e}")
         return tasks
 
     def update_task(self, task: Task) -> bool:
         """Atualiza uma tarefa existente no banco de dados."""
         if not self.conn or task.id is None: return False
+        self._caches['tasks'].invalidate(task.id)
         try:
             cursor = self.conn.cursor()
             query = """
@@ -566,25 +1295,26 @@ class DatabaseManager:
                 task.parent_event_id,
                 task.id
             ))
-            self.conn.commit()
+            self._commit()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Erro ao atualizar tarefa: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao atualizar tarefa: {e}")
+            if self.conn: self._rollback()
             return False
 
     def delete_task(self, task_id: int) -> bool:
         """Exclui uma tarefa do banco de dados pelo seu ID."""
         if not self.conn: return False
+        self._caches['tasks'].invalidate(task_id)
         try:
             cursor = self.conn.cursor()
             query = "DELETE FROM Tasks WHERE id = ?"
             cursor.execute(query, (task_id,))
-            self.conn.commit()
+            self._commit()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Erro ao excluir tarefa: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao excluir tarefa: {e}")
+            if self.conn: self._rollback()
             return False
 
     # --- CRUD para Questions ---
@@ -599,10 +1329,10 @@ class DatabaseManager:
             try:
                 options_list = json.loads(options_json)
                 if not isinstance(options_list, list) or not all(isinstance(opt, str) for opt in options_list):
-                    print(f"Aviso: 'options' para Question ID {row['id']} não é uma lista de strings JSON válida: {options_json}")
+                    logger.warning(f"Aviso: 'options' para Question ID {row['id']} não é uma lista de strings JSON válida: {options_json}")
                     options_list = [] # Resetar para lista vazia se o formato for inválido
             except json.JSONDecodeError:
-                print(f"Aviso: Falha ao decodificar 'options' JSON para Question ID {row['id']}: {options_json}")
+                logger.warning(f"Aviso: Falha ao decodificar 'options' JSON para Question ID {row['id']}: {options_json}")
                 options_list = []
 
         return Question(
@@ -633,29 +1363,84 @@ class DatabaseManager:
                 options_json,
                 question.answer
             ))
-            self.conn.commit()
+            self._commit()
             question.id = cursor.lastrowid
             if question.id:
                 return self.get_question_by_id(question.id) # Para obter timestamps
             return None
         except sqlite3.Error as e:
-            print(f"Erro ao adicionar pergunta: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao adicionar pergunta: {e}")
+            if self.conn: self._rollback()
             return None
 
+    def add_questions_bulk(self, questions: Iterable[Question]) -> List[int]:
+        """Adiciona várias perguntas numa única transação. Retorna os ids na ordem de entrada."""
+        if not self.conn: return []
+        query = """
+        INSERT INTO Questions (text, subject, difficulty, options, answer)
+        VALUES (?, ?, ?, ?, ?)
+        """
+        try:
+            ids = self._insert_many(query, questions, lambda question: (
+                question.text,
+                question.subject,
+                question.difficulty,
+                json.dumps(question.options) if question.options else None,
+                question.answer
+            ))
+            self._commit()
+            return ids
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao adicionar perguntas em lote: {e}")
+            if self.conn: self._rollback()
+            return []
+
     def get_question_by_id(self, question_id: int) -> Optional[Question]:
         """Busca uma pergunta específica pelo seu ID."""
         if not self.conn: return None
+        cached = self._caches['questions'].get(question_id)
+        if cached is not None:
+            return cached
         try:
             cursor = self.conn.cursor()
             query = "SELECT * FROM Questions WHERE id = ?"
             cursor.execute(query, (question_id,))
             row = cursor.fetchone()
-            return self._question_from_row(row)
+            question = self._question_from_row(row)
+            self._caches['questions'].put(question_id, question)
+            return question
         except sqlite3.Error as e:
-            print(f"Erro ao buscar pergunta por ID: {e}")
+            logger.error(f"Erro ao buscar pergunta por ID: {e}")
             return None
 
+    def get_questions_by_ids(self, question_ids: Iterable[int]) -> Tuple[List[Question], List[int]]:
+        """Busca várias perguntas de uma vez, preservando a ordem dos IDs informados.
+
+        Retorna (perguntas, ids_não_encontrados). Os IDs são consultados em blocos de
+        IN_CLAUSE_CHUNK_SIZE, então o número de consultas não depende do tamanho do quiz.
+        """
+        question_ids = list(question_ids)
+        if not self.conn: return [], question_ids
+        found: Dict[int, Question] = {}
+        unique_ids = list(dict.fromkeys(question_ids))
+        try:
+            cursor = self.conn.cursor()
+            for i in range(0, len(unique_ids), self.IN_CLAUSE_CHUNK_SIZE):
+                chunk = unique_ids[i:i + self.IN_CLAUSE_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"SELECT * FROM Questions WHERE id IN ({placeholders})", chunk)
+                for row in cursor.fetchall():
+                    question_obj = self._question_from_row(row)
+                    if question_obj:
+                        found[question_obj.id] = question_obj
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar perguntas por IDs: {e}")
+            return [], question_ids
+
+        questions = [found[q_id] for q_id in question_ids if q_id in found]
+        missing_ids = [q_id for q_id in unique_ids if q_id not in found]
+        return questions, missing_ids
+
     def get_all_questions(self, subject: Optional[str] = None, difficulty: Optional[str] = None) -> List[Question]:
         """Busca todas as perguntas, com filtros opcionais por assunto e dificuldade."""
         if not self.conn: return []
@@ -684,12 +1469,127 @@ class DatabaseManager:
                 if question_obj:
                     questions.append(question_obj)
         except sqlite3.Error as e:
-            print(f"Erro ao buscar todas as perguntas: {e}")
+            logger.error(f"Erro ao buscar todas as perguntas: {e}")
+        return questions
+
+    def get_questions_page(self, subject: Optional[str] = None, difficulty: Optional[str] = None,
+                           after: Optional[Tuple[Optional[str], int]] = None, limit: int = 200) -> List[Question]:
+        """Busca uma página de perguntas na ordem de get_all_questions (assunto, id).
+
+        after é a chave (subject, id) da última pergunta da página anterior. A paginação é
+        por chave, sem OFFSET, então cada página custa o mesmo independentemente da posição.
+        """
+        if not self.conn: return []
+        conditions = []
+        params: List[Any] = []
+        if subject:
+            conditions.append("subject = ?")
+            params.append(subject)
+        if difficulty:
+            conditions.append("difficulty = ?")
+            params.append(difficulty)
+
+        # Cada parte busca no índice de assunto: primeiro o restante do assunto atual,
+        # depois os assuntos seguintes (NULL vem antes de qualquer texto).
+        if after is None:
+            parts: List[Tuple[Optional[str], List[Any]]] = [(None, [])]
+        else:
+            last_subject, last_id = after
+            if last_subject is None:
+                parts = [("subject IS NULL AND id > ?", [last_id]), ("subject IS NOT NULL", [])]
+            else:
+                parts = [("subject = ? AND id > ?", [last_subject, last_id]), ("subject > ?", [last_subject])]
+
+        questions: List[Question] = []
+        try:
+            cursor = self.conn.cursor()
+            for part_condition, part_params in parts:
+                part_conditions = conditions + ([part_condition] if part_condition else [])
+                query = "SELECT * FROM Questions"
+                if part_conditions:
+                    query += " WHERE " + " AND ".join(part_conditions)
+                query += " ORDER BY subject, id LIMIT ?"
+                cursor.execute(query, params + part_params + [limit - len(questions)])
+                for row in cursor.fetchall():
+                    question_obj = self._question_from_row(row)
+                    if question_obj:
+                        questions.append(question_obj)
+                if len(questions) >= limit:
+                    break
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar página de perguntas: {e}")
+        return questions
+
+    def _fts_match_expression(self, query: str) -> Optional[str]:
+        """Converte o texto digitado numa expressão MATCH segura para FTS5.
+
+        Cada palavra vira um termo entre aspas (sem operadores do usuário) e a última
+        é tratada como prefixo, para que a busca funcione enquanto se digita.
+        """
+        tokens = re.findall(r"\w+", query)
+        if not tokens:
+            return None
+        terms = [f'"{token}"' for token in tokens]
+        terms[-1] += "*"
+        return " ".join(terms)
+
+    def search_questions(self, query: str, subject: Optional[str] = None, difficulty: Optional[str] = None,
+                         limit: int = 200) -> List[Question]:
+        """Busca perguntas por palavras do texto, da resposta ou das opções.
+
+        Os resultados vêm ordenados por relevância (bm25, com mais peso para o texto
+        da pergunta) e podem ser filtrados por assunto e dificuldade.
+        """
+        if not self.conn: return []
+        questions: List[Question] = []
+        match_expression = self._fts_match_expression(query)
+        if not match_expression:
+            return questions
+        try:
+            cursor = self.conn.cursor()
+            conditions = []
+            filter_params: List[Any] = []
+            if subject:
+                conditions.append("Q.subject = ?")
+                filter_params.append(subject)
+            if difficulty:
+                conditions.append("Q.difficulty = ?")
+                filter_params.append(difficulty)
+            filters = "".join(" AND " + condition for condition in conditions)
+
+            if self.fts_enabled:
+                # Todos os resultados (já filtrados) são pontuados antes do LIMIT, então os
+                # `limit` devolvidos são de fato os mais relevantes.
+                base_query = f"""
+                SELECT Q.* FROM QuestionsFTS
+                JOIN Questions Q ON Q.id = QuestionsFTS.rowid
+                WHERE QuestionsFTS MATCH ?{filters}
+                ORDER BY bm25(QuestionsFTS, 10.0, 5.0, 1.0)
+                LIMIT ?
+                """
+                params = [match_expression] + filter_params + [limit]
+            else:
+                base_query = f"""
+                SELECT Q.* FROM Questions Q
+                WHERE Q.text LIKE ?{filters}
+                ORDER BY Q.subject, Q.id
+                LIMIT ?
+                """
+                params = [f"%{query.strip()}%"] + filter_params + [limit]
+
+            cursor.execute(base_query, params)
+            for row in cursor.fetchall():
+                question_obj = self._question_from_row(row)
+                if question_obj:
+                    questions.append(question_obj)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar perguntas por texto: {e}")
         return questions
 
     def update_question(self, question: Question) -> bool:
         """Atualiza uma pergunta existente no banco de dados."""
         if not self.conn or question.id is None: return False
+        self._caches['questions'].invalidate(question.id)
         try:
             cursor = self.conn.cursor()
             options_json = json.dumps(question.options) if question.options else None
@@ -707,93 +1607,183 @@ class DatabaseManager:
                 question.answer,
                 question.id
             ))
-            self.conn.commit()
+            self._commit()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Erro ao atualizar pergunta: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao atualizar pergunta: {e}")
+            if self.conn: self._rollback()
             return False
 
     def delete_question(self, question_id: int) -> bool:
-        """Exclui uma pergunta do banco de dados pelo seu ID."""
+        """Exclui uma pergunta do banco de dados pelo seu ID.
+
+        A pergunta sai dos quizzes que a usavam (ON DELETE CASCADE em QuizConfig_Questions)
+        e a coluna JSON legada desses quizzes é regravada na mesma transação.
+        """
         if not self.conn: return False
+        self._caches['questions'].invalidate(question_id)
         try:
             cursor = self.conn.cursor()
+            cursor.execute("SELECT DISTINCT quiz_config_id FROM QuizConfig_Questions WHERE question_id = ?",
+                           (question_id,))
+            config_ids = [row['quiz_config_id'] for row in cursor.fetchall()]
             query = "DELETE FROM Questions WHERE id = ?"
             cursor.execute(query, (question_id,))
-            self.conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+            if config_ids:
+                self._sync_quiz_config_question_ids_json(cursor, config_ids)
+            self._commit()
+            return deleted
         except sqlite3.Error as e:
-            print(f"Erro ao excluir pergunta: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao excluir pergunta: {e}")
+            if self.conn: self._rollback()
             return False
 
     # --- CRUD para QuizConfig ---
-    def _quiz_config_from_row(self, row: sqlite3.Row) -> Optional[QuizConfig]:
+    def _migrate_quiz_config_question_ids(self, cursor: sqlite3.Cursor):
+        """Preenche QuizConfig_Questions a partir da coluna JSON QuizConfigs.question_ids.
+
+        IDs de perguntas que não existem mais são descartados (a chave estrangeira os rejeitaria).
+        """
+        cursor.execute("SELECT id FROM Questions")
+        existing_question_ids = {row['id'] for row in cursor.fetchall()}
+        # Configurações já migradas (bancos anteriores ao versionamento) são ignoradas
+        cursor.execute("""
+        SELECT id, question_ids FROM QuizConfigs
+        WHERE id NOT IN (SELECT quiz_config_id FROM QuizConfig_Questions)
+        """)
+        rows = []
+        for config_row in cursor.fetchall():
+            try:
+                question_ids = json.loads(config_row['question_ids'])
+            except (json.JSONDecodeError, TypeError):
+                logger.warning(f"Aviso: Falha ao decodificar 'question_ids' JSON para QuizConfig ID {config_row['id']} durante a migração.")
+                continue
+            if not isinstance(question_ids, list):
+                continue
+            for position, question_id in enumerate(question_ids):
+                if isinstance(question_id, int) and question_id in existing_question_ids:
+                    rows.append((config_row['id'], question_id, position))
+        cursor.executemany(
+            "INSERT INTO QuizConfig_Questions (quiz_config_id, question_id, position) VALUES (?, ?, ?)",
+            rows
+        )
+
+    def _get_question_ids_for_quiz_configs(self, cursor: sqlite3.Cursor, config_ids: List[int]) -> Dict[int, List[int]]:
+        """Carrega, em ordem, os IDs das perguntas de várias configurações de quiz."""
+        question_ids_by_config: Dict[int, List[int]] = {config_id: [] for config_id in config_ids}
+        for i in range(0, len(config_ids), self.IN_CLAUSE_CHUNK_SIZE):
+            chunk = config_ids[i:i + self.IN_CLAUSE_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+            SELECT quiz_config_id, question_id FROM QuizConfig_Questions
+            WHERE quiz_config_id IN ({placeholders})
+            ORDER BY quiz_config_id, position
+            """, chunk)
+            for row in cursor.fetchall():
+                question_ids_by_config[row['quiz_config_id']].append(row['question_id'])
+        return question_ids_by_config
+
+    def _sync_quiz_config_question_ids_json(self, cursor: sqlite3.Cursor, config_ids: List[int]):
+        """Regrava a coluna JSON legada QuizConfigs.question_ids a partir de QuizConfig_Questions."""
+        question_ids_by_config = self._get_question_ids_for_quiz_configs(cursor, config_ids)
+        cursor.executemany("UPDATE QuizConfigs SET question_ids = ? WHERE id = ?",
+                           [(json.dumps(question_ids), config_id)
+                            for config_id, question_ids in question_ids_by_config.items()])
+
+    def _missing_question_ids(self, cursor: sqlite3.Cursor, question_ids: Iterable[int]) -> List[int]:
+        """IDs da lista (sem repetição, na ordem recebida) que não existem em Questions."""
+        unique_ids = list(dict.fromkeys(question_ids))
+        existing: set = set()
+        for i in range(0, len(unique_ids), self.IN_CLAUSE_CHUNK_SIZE):
+            chunk = unique_ids[i:i + self.IN_CLAUSE_CHUNK_SIZE]
+            cursor.execute(f"SELECT id FROM Questions WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            existing.update(row['id'] for row in cursor.fetchall())
+        return [question_id for question_id in unique_ids if question_id not in existing]
+
+    def _quiz_config_from_row(self, row: sqlite3.Row, question_ids: List[int]) -> Optional[QuizConfig]:
         if not row: return None
-        question_ids_json = row['question_ids']
-        question_ids_list: List[int] = []
-        try:
-            question_ids_list = json.loads(question_ids_json)
-            if not isinstance(question_ids_list, list) or not all(isinstance(qid, int) for qid in question_ids_list):
-                print(f"Aviso: 'question_ids' para QuizConfig ID {row['id']} não é uma lista de inteiros JSON válida.")
-                question_ids_list = []
-        except json.JSONDecodeError:
-            print(f"Aviso: Falha ao decodificar 'question_ids' JSON para QuizConfig ID {row['id']}.")
-            question_ids_list = []
-        
         return QuizConfig(
             id=row['id'],
             name=row['name'],
-            question_ids=question_ids_list,
+            question_ids=question_ids,
             created_at=self._datetime_from_str(row['created_at'])
             # updated_at não está no modelo QuizConfig, mas o trigger o atualiza no DB
         )
 
+    def _quiz_configs_from_rows(self, cursor: sqlite3.Cursor, rows: List[sqlite3.Row]) -> List[QuizConfig]:
+        question_ids_by_config = self._get_question_ids_for_quiz_configs(cursor, [row['id'] for row in rows])
+        return [self._quiz_config_from_row(row, question_ids_by_config[row['id']]) for row in rows]
+
     def add_quiz_config(self, quiz_config: QuizConfig) -> Optional[QuizConfig]:
+        """Adiciona uma configuração de quiz. Retorna None se alguma pergunta não existir."""
         if not self.conn: return None
         try:
             cursor = self.conn.cursor()
+            missing_ids = self._missing_question_ids(cursor, quiz_config.question_ids)
+            if missing_ids:
+                logger.error(f"Erro ao adicionar QuizConfig: perguntas inexistentes {missing_ids}.")
+                return None
+            # A coluna JSON continua sendo gravada para compatibilidade com versões anteriores;
+            # a fonte de verdade é QuizConfig_Questions.
             question_ids_json = json.dumps(quiz_config.question_ids)
             query = "INSERT INTO QuizConfigs (name, question_ids) VALUES (?, ?)"
             cursor.execute(query, (quiz_config.name, question_ids_json))
-            self.conn.commit()
             quiz_config.id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO QuizConfig_Questions (quiz_config_id, question_id, position) VALUES (?, ?, ?)",
+                [(quiz_config.id, question_id, position) for position, question_id in enumerate(quiz_config.question_ids)]
+            )
+            self._commit()
             if quiz_config.id:
                 # Buscar para obter created_at e garantir consistência
                 return self.get_quiz_config_by_id(quiz_config.id)
             return None
         except sqlite3.Error as e:
-            print(f"Erro ao adicionar QuizConfig: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao adicionar QuizConfig: {e}")
+            if self.conn: self._rollback()
             return None
 
     def get_quiz_config_by_id(self, config_id: int) -> Optional[QuizConfig]:
         if not self.conn: return None
         try:
             cursor = self.conn.cursor()
-            query = "SELECT id, name, question_ids, created_at FROM QuizConfigs WHERE id = ?"
+            query = "SELECT id, name, created_at FROM QuizConfigs WHERE id = ?"
             cursor.execute(query, (config_id,))
             row = cursor.fetchone()
-            return self._quiz_config_from_row(row) # Uses the first _quiz_config_from_row
+            if not row:
+                return None
+            return self._quiz_configs_from_rows(cursor, [row])[0]
         except sqlite3.Error as e:
-            print(f"Erro ao buscar QuizConfig por ID: {e}")
+            logger.error(f"Erro ao buscar QuizConfig por ID: {e}")
             return None
             
     def get_all_quiz_configs(self) -> List[QuizConfig]:
         if not self.conn: return [] # Corrected return type for connection failure
-        configs: List[QuizConfig] = []
         try:
             cursor = self.conn.cursor()
-            query = "SELECT id, name, question_ids, created_at FROM QuizConfigs ORDER BY created_at DESC"
+            query = "SELECT id, name, created_at FROM QuizConfigs ORDER BY created_at DESC"
             cursor.execute(query)
-            for row in cursor.fetchall():
-                config = self._quiz_config_from_row(row) # Uses the first _quiz_config_from_row
-                if config:
-                    configs.append(config)
+            return self._quiz_configs_from_rows(cursor, cursor.fetchall())
         except sqlite3.Error as e:
-            print(f"Erro ao buscar todas as QuizConfigs: {e}")
-        return configs
+            logger.error(f"Erro ao buscar todas as QuizConfigs: {e}")
+            return []
+
+    def get_quiz_configs_for_question(self, question_id: int) -> List[QuizConfig]:
+        """Busca as configurações de quiz que usam a pergunta informada."""
+        if not self.conn: return []
+        try:
+            cursor = self.conn.cursor()
+            query = """
+            SELECT id, name, created_at FROM QuizConfigs
+            WHERE id IN (SELECT quiz_config_id FROM QuizConfig_Questions WHERE question_id = ?)
+            ORDER BY created_at DESC
+            """
+            cursor.execute(query, (question_id,))
+            return self._quiz_configs_from_rows(cursor, cursor.fetchall())
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar QuizConfigs da pergunta ID {question_id}: {e}")
+            return []
 
     # --- CRUD para Entities ---
     def _entity_from_row(self, row: sqlite3.Row) -> Optional[Entity]:
@@ -803,7 +1793,7 @@ class DatabaseManager:
             try:
                 details_dict = json.loads(row['details_json'])
             except json.JSONDecodeError:
-                print(f"Aviso: Falha ao decodificar 'details_json' para Entity ID {row['id']}.")
+                logger.warning(f"Aviso: Falha ao decodificar 'details_json' para Entity ID {row['id']}.")
         
         return Entity(
             id=row['id'],
@@ -821,26 +1811,48 @@ class DatabaseManager:
             details_json_str = json.dumps(entity.details_json) if entity.details_json else None
             query = "INSERT INTO Entities (name, type, details_json) VALUES (?, ?, ?)"
             cursor.execute(query, (entity.name, entity.type, details_json_str))
-            self.conn.commit()
+            self._commit()
             entity.id = cursor.lastrowid
             if entity.id:
                 return self.get_entity_by_id(entity.id) # Para obter timestamps e consistência
             return None
         except sqlite3.Error as e:
-            print(f"Erro ao adicionar Entity: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao adicionar Entity: {e}")
+            if self.conn: self._rollback()
             return None
 
+    def add_entities_bulk(self, entities: Iterable[Entity]) -> List[int]:
+        """Adiciona várias entidades numa única transação. Retorna os ids na ordem de entrada."""
+        if not self.conn: return []
+        query = "INSERT INTO Entities (name, type, details_json) VALUES (?, ?, ?)"
+        try:
+            ids = self._insert_many(query, entities, lambda entity: (
+                entity.name,
+                entity.type,
+                json.dumps(entity.details_json) if entity.details_json else None
+            ))
+            self._commit()
+            return ids
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao adicionar entidades em lote: {e}")
+            if self.conn: self._rollback()
+            return []
+
     def get_entity_by_id(self, entity_id: int) -> Optional[Entity]:
         if not self.conn: return None
+        cached = self._caches['entities'].get(entity_id)
+        if cached is not None:
+            return cached
         try:
             cursor = self.conn.cursor()
             query = "SELECT * FROM Entities WHERE id = ?"
             cursor.execute(query, (entity_id,))
             row = cursor.fetchone()
-            return self._entity_from_row(row)
+            entity = self._entity_from_row(row)
+            self._caches['entities'].put(entity_id, entity)
+            return entity
         except sqlite3.Error as e:
-            print(f"Erro ao buscar Entity por ID: {e}")
+            logger.error(f"Erro ao buscar Entity por ID: {e}")
             return None
             
     def get_all_entities(self, entity_type: Optional[str] = None) -> List[Entity]: # Renamed and added entity_type
@@ -862,41 +1874,42 @@ class DatabaseManager:
                     entities.append(entity_obj)
             return entities
         except sqlite3.Error as e:
-            print(f"Erro ao buscar todas as Entities: {e}")
+            logger.error(f"Erro ao buscar todas as Entities: {e}")
             return []
 
     def update_entity(self, entity: Entity) -> bool:
         if not self.conn or entity.id is None: return False
+        self._caches['entities'].invalidate(entity.id)
         try:
             cursor = self.conn.cursor()
             details_json_str = json.dumps(entity.details_json) if entity.details_json else None
             query = "UPDATE Entities SET name = ?, type = ?, details_json = ? WHERE id = ?"
             # updated_at será atualizado pelo trigger
             cursor.execute(query, (entity.name, entity.type, details_json_str, entity.id))
-            self.conn.commit()
+            self._commit()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Erro ao atualizar Entity: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao atualizar Entity: {e}")
+            if self.conn: self._rollback()
             return False
 
     def delete_entity(self, entity_id: int) -> bool:
         if not self.conn: return False
+        self._caches['entities'].invalidate(entity_id)
         try:
             cursor = self.conn.cursor()
             query = "DELETE FROM Entities WHERE id = ?"
             cursor.execute(query, (entity_id,))
-            self.conn.commit()
+            self._commit()
             # ON DELETE CASCADE deve cuidar da tabela Event_Entities
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Erro ao excluir Entity: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao excluir Entity: {e}")
+            if self.conn: self._rollback()
             return False
 
     # --- Associações Event-Entity ---
     def link_entity_to_event(self, event_id: int, entity_id: int, role: str) -> bool:
-        print(f"[DBManager] link_entity_to_event called with event_id={event_id}, entity_id={entity_id}, role='{role}'")
         if not self.conn: return False
         try:
             cursor = self.conn.cursor()
@@ -904,32 +1917,109 @@ class DatabaseManager:
             # ou INSERT OR REPLACE se quisermos atualizar o papel se o link existir.
             # Por simplicidade, INSERT OR IGNORE. Se precisar atualizar o papel, uma lógica de UPDATE seria melhor.
             query = "INSERT OR IGNORE INTO Event_Entities (event_id, entity_id, role) VALUES (?, ?, ?)"
-            print(f"[DBManager] link_entity_to_event: Executing query: {query}")
-            params = (event_id, entity_id, role)
-            print(f"[DBManager] link_entity_to_event: With params: {params}")
-            cursor.execute(query, params)
-            self.conn.commit()
-            row_count = cursor.rowcount
-            print(f"[DBManager] link_entity_to_event: Row count after insert/ignore: {row_count}")
-            return row_count > 0
+            cursor.execute(query, (event_id, entity_id, role))
+            self._commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao vincular Entity {entity_id} ao Event {event_id}: {e}")
+            if self.conn: self._rollback()
+            return False
+
+    def _apply_event_entities(self, cursor: sqlite3.Cursor, event_id: int, entity_roles: Dict[int, str]):
+        """Leva os vínculos do evento a entity_roles alterando só as diferenças (sem commit)."""
+        cursor.execute("SELECT entity_id, role FROM Event_Entities WHERE event_id = ?", (event_id,))
+        current_roles = {row['entity_id']: row['role'] for row in cursor.fetchall()}
+
+        removed = [(event_id, entity_id) for entity_id in current_roles if entity_id not in entity_roles]
+        added = [(event_id, entity_id, role) for entity_id, role in entity_roles.items() if entity_id not in current_roles]
+        changed = [(role, event_id, entity_id) for entity_id, role in entity_roles.items()
+                   if entity_id in current_roles and current_roles[entity_id] != role]
+        if removed:
+            cursor.executemany("DELETE FROM Event_Entities WHERE event_id = ? AND entity_id = ?", removed)
+        if added:
+            cursor.executemany("INSERT INTO Event_Entities (event_id, entity_id, role) VALUES (?, ?, ?)", added)
+        if changed:
+            cursor.executemany("UPDATE Event_Entities SET role = ? WHERE event_id = ? AND entity_id = ?", changed)
+
+    def set_event_entities(self, event_id: int, entity_roles: Dict[int, str]) -> bool:
+        """Define os vínculos do evento como {entity_id: papel}, numa única transação.
+
+        Só as diferenças em relação aos vínculos atuais são gravadas: entidades ausentes
+        do dicionário são desvinculadas, as novas são vinculadas e papéis alterados são
+        atualizados.
+        """
+        if not self.conn: return False
+        try:
+            cursor = self.conn.cursor()
+            self._apply_event_entities(cursor, event_id, entity_roles)
+            self._commit()
+            return True
         except sqlite3.Error as e:
-            print(f"[DBManager] link_entity_to_event: SQLite error: {e}") # Log the error
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao definir as entidades do Event {event_id}: {e}")
+            if self.conn: self._rollback()
             return False
 
+    def link_entities_to_events_bulk(self, links: Iterable[Tuple[int, int, str]]) -> int:
+        """Vincula vários pares (event_id, entity_id, papel) numa única transação.
+
+        Vínculos já existentes são mantidos como estão (INSERT OR IGNORE, como em
+        link_entity_to_event). Retorna quantos vínculos novos foram gravados.
+        """
+        if not self.conn: return 0
+        query = "INSERT OR IGNORE INTO Event_Entities (event_id, entity_id, role) VALUES (?, ?, ?)"
+        try:
+            cursor = self.conn.cursor()
+            changes_before = self.conn.total_changes
+            chunk: List[Tuple[int, int, str]] = []
+            for link in links:
+                chunk.append(link)
+                if len(chunk) >= self.BULK_CHUNK_SIZE:
+                    cursor.executemany(query, chunk)
+                    chunk.clear()
+            if chunk:
+                cursor.executemany(query, chunk)
+            added = self.conn.total_changes - changes_before
+            self._commit()
+            return added
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao vincular entidades a eventos em lote: {e}")
+            if self.conn: self._rollback()
+            return 0
+
     def unlink_entity_from_event(self, event_id: int, entity_id: int) -> bool:
         if not self.conn: return False
         try:
             cursor = self.conn.cursor()
             query = "DELETE FROM Event_Entities WHERE event_id = ? AND entity_id = ?"
             cursor.execute(query, (event_id, entity_id))
-            self.conn.commit()
+            self._commit()
             return cursor.rowcount > 0
         except sqlite3.Error as e:
-            print(f"Erro ao desvincular Entity {entity_id} do Event {event_id}: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao desvincular Entity {entity_id} do Event {event_id}: {e}")
+            if self.conn: self._rollback()
             return False
 
+    def _get_entity_links(self, cursor: sqlite3.Cursor, event_ids: Iterable[int],
+                          entities_by_id: Dict[int, Entity]) -> Dict[int, List[Tuple[Entity, str]]]:
+        """Entidades e papéis de vários eventos, reaproveitando os objetos de entities_by_id."""
+        event_ids = list(event_ids)
+        links: Dict[int, List[Tuple[Entity, str]]] = {}
+        for i in range(0, len(event_ids), self.IN_CLAUSE_CHUNK_SIZE):
+            chunk = event_ids[i:i + self.IN_CLAUSE_CHUNK_SIZE]
+            cursor.execute(f"""
+            SELECT E.*, EE.event_id, EE.role
+            FROM Event_Entities EE
+            JOIN Entities E ON E.id = EE.entity_id
+            WHERE EE.event_id IN ({",".join("?" * len(chunk))})
+            """, chunk)
+            for row in cursor.fetchall():
+                entity = entities_by_id.get(row['id'])
+                if entity is None:
+                    entity = self._entity_from_row(row)
+                    entities_by_id[row['id']] = entity
+                links.setdefault(row['event_id'], []).append((entity, row['role']))
+        return links
+
     def get_entities_for_event(self, event_id: int) -> List[tuple[Entity, str]]:
         if not self.conn: return []
         linked_entities: List[tuple[Entity, str]] = []
@@ -949,42 +2039,86 @@ class DatabaseManager:
                 if entity:
                     linked_entities.append((entity, role))
         except sqlite3.Error as e:
-            print(f"Erro ao buscar entidades para o Evento ID {event_id}: {e}")
+            logger.error(f"Erro ao buscar entidades para o Evento ID {event_id}: {e}")
         return linked_entities
 
+    def get_events_for_entity(self, entity_id: int, start: Optional[datetime] = None,
+                              end: Optional[datetime] = None) -> List[Tuple[Event, str]]:
+        """Eventos vinculados à entidade, com o papel dela em cada um, ordenados por início.
 
-    # The duplicated QuizConfig methods that were here are now removed.
-    # The correct get_quiz_config_by_id and get_all_quiz_configs have been inserted earlier,
-    # after the first (and correct) add_quiz_config method.
+        Sem intervalo, devolve os eventos como cadastrados (um recorrente aparece uma vez).
+        Com start e/ou end, filtra pelo início no intervalo semiaberto [start, end) e
+        devolve cada ocorrência dos recorrentes, como get_events_in_range; com um só
+        limite, as ocorrências se restringem às da janela materializada.
+        """
+        results: List[Tuple[Event, str]] = []
+        if not self.conn:
+            logger.error("Conexão com o banco de dados não estabelecida.")
+            return results
 
-    # --- CRUD para QuizAttempt ---
-    def _quiz_attempt_from_row(self, row: sqlite3.Row, question_ids_json=None) -> QuizConfig | None:
-        if not row: return None
-        user_answers_json = row['user_answers']
-        question_ids_list: List[int] = []
+        columns = "E.id, E.title, E.description, {start}, {end}, E.event_type, E.location, E.recurrence_rule, E.created_at, E.updated_at, EE.role"
         try:
-            question_ids_list = json.loads(question_ids_json)
-            if not isinstance(question_ids_list, list) or not all(isinstance(qid, int) for qid in question_ids_list):
-                print(f"Aviso: 'question_ids' para QuizConfig ID {row['id']} não é uma lista de inteiros JSON válida.")
-                question_ids_list = []
-        except json.JSONDecodeError:
-            print(f"Aviso: Falha ao decodificar 'question_ids' JSON para QuizConfig ID {row['id']}.")
-            question_ids_list = []
-        
-        return QuizConfig(
-            id=row['id'],
-            name=row['name'],
-            question_ids=question_ids_list,
-            created_at=self._datetime_from_str(row['created_at'])
-            # updated_at não está no modelo QuizConfig, mas o trigger o atualiza no DB
-        )
+            cursor = self.conn.cursor()
+            if start is None and end is None:
+                query = f"""
+                SELECT {columns.format(start='E.start_time', end='E.end_time')}
+                FROM Event_Entities EE
+                JOIN Events E ON E.id = EE.event_id
+                WHERE EE.entity_id = ?
+                ORDER BY E.start_time
+                """
+                params: List[Any] = [entity_id]
+            else:
+                event_filter, occurrence_filter, range_params = "", "", []
+                if start is not None:
+                    event_filter += " AND E.start_time >= ?"
+                    occurrence_filter += " AND O.occurrence_start >= ?"
+                    range_params.append(self._datetime_to_str(start))
+                if end is not None:
+                    event_filter += " AND E.start_time < ?"
+                    occurrence_filter += " AND O.occurrence_start < ?"
+                    range_params.append(self._datetime_to_str(end))
+                query = f"""
+                SELECT {columns.format(start='E.start_time', end='E.end_time')}
+                FROM Event_Entities EE
+                JOIN Events E ON E.id = EE.event_id
+                WHERE EE.entity_id = ? AND E.recurrence_rule IS NULL{event_filter}
+                UNION ALL
+                SELECT {columns.format(start='O.occurrence_start', end='O.occurrence_end')}
+                FROM Event_Entities EE
+                JOIN Events E ON E.id = EE.event_id
+                JOIN EventOccurrences O ON O.event_id = E.id
+                WHERE EE.entity_id = ?{occurrence_filter}
+                ORDER BY 4
+                """
+                params = [entity_id, *range_params, entity_id, *range_params]
+            cursor.execute(query, params)
+            for row in cursor.fetchall():
+                event = self._event_from_row(row)
+                if event:
+                    results.append((event, row['role']))
+            if start is not None and end is not None:
+                outside = self._occurrences_outside_window(cursor, start, end, entity_id=entity_id)
+                if outside:
+                    results.extend(outside)
+                    results.sort(key=lambda result: result[0].start_time)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar eventos para a Entidade ID {entity_id}: {e}")
+            if self.conn: self._rollback()
+        return results
+
+    # --- CRUD para QuizAttempt ---
+    def _insert_attempt_answers(self, cursor: sqlite3.Cursor, rows: List[tuple]):
+        """Grava respostas (attempt_id, question_id, answer) em AttemptAnswers.
+
+        is_correct é calculado comparando com Questions.answer no momento da gravação.
+        """
+        cursor.executemany("""
+        INSERT INTO AttemptAnswers (attempt_id, question_id, answer, is_correct)
+        VALUES (?, ?, ?, COALESCE((SELECT answer = ? FROM Questions WHERE id = ?), 0))
+        """, [(attempt_id, question_id, answer, answer, question_id) for attempt_id, question_id, answer in rows])
 
-    # add_quiz_config, get_quiz_config_by_id, get_all_quiz_configs were moved up
-    # to replace the duplicated _quiz_config_from_row and its associated methods.
-    # This SEARCH block is now targeting the content that was originally after
-    # the second (now deleted) _quiz_config_from_row.
-    # The new content for these methods is already in the REPLACE block above.
-    # This effectively deletes the duplicated methods that were here.
+    def _parse_user_answers_json(self, attempt_id: int, user_answers_json: Optional[str]) -> Dict[int, str]:
         user_answers_dict: Dict[int, str] = {}
         try:
             # As chaves no JSON são strings, converter para int
@@ -992,25 +2126,61 @@ class DatabaseManager:
             if isinstance(loaded_answers, dict):
                 user_answers_dict = {int(k): v for k, v in loaded_answers.items() if isinstance(v, str)}
             else:
-                print(f"Aviso: 'user_answers' para QuizAttempt ID {row['id']} não é um dict JSON válido.")
-        except json.JSONDecodeError:
-            print(f"Aviso: Falha ao decodificar 'user_answers' JSON para QuizAttempt ID {row['id']}.")
-        
+                logger.warning(f"Aviso: 'user_answers' para QuizAttempt ID {attempt_id} não é um dict JSON válido.")
+        except (json.JSONDecodeError, TypeError, ValueError):
+            logger.warning(f"Aviso: Falha ao decodificar 'user_answers' JSON para QuizAttempt ID {attempt_id}.")
+        return user_answers_dict
+
+    def _migrate_attempt_answers(self, cursor: sqlite3.Cursor):
+        """Preenche AttemptAnswers a partir da coluna JSON QuizAttempts.user_answers."""
+        # Tentativas já migradas (bancos anteriores ao versionamento) são ignoradas
+        cursor.execute("""
+        SELECT id, user_answers FROM QuizAttempts
+        WHERE id NOT IN (SELECT attempt_id FROM AttemptAnswers)
+        """)
+        rows: List[tuple] = []
+        for attempt_row in cursor.fetchall():
+            user_answers = self._parse_user_answers_json(attempt_row['id'], attempt_row['user_answers'])
+            rows.extend((attempt_row['id'], question_id, answer) for question_id, answer in user_answers.items())
+        self._insert_attempt_answers(cursor, rows)
+
+    def _get_answers_for_attempts(self, cursor: sqlite3.Cursor, attempt_ids: List[int]) -> Dict[int, Dict[int, str]]:
+        """Carrega as respostas de várias tentativas, na ordem em que foram gravadas."""
+        answers_by_attempt: Dict[int, Dict[int, str]] = {attempt_id: {} for attempt_id in attempt_ids}
+        for i in range(0, len(attempt_ids), self.IN_CLAUSE_CHUNK_SIZE):
+            chunk = attempt_ids[i:i + self.IN_CLAUSE_CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+            SELECT attempt_id, question_id, answer FROM AttemptAnswers
+            WHERE attempt_id IN ({placeholders})
+            ORDER BY attempt_id, rowid
+            """, chunk)
+            for row in cursor.fetchall():
+                answers_by_attempt[row['attempt_id']][row['question_id']] = row['answer']
+        return answers_by_attempt
+
+    def _quiz_attempt_from_row(self, row: sqlite3.Row, user_answers: Dict[int, str]) -> Optional[QuizAttempt]:
+        if not row: return None
         return QuizAttempt(
             id=row['id'],
             quiz_config_id=row['quiz_config_id'],
-            user_answers=user_answers_dict,
+            user_answers=user_answers,
             score=row['score'],
             total_questions=row['total_questions'],
             attempted_at=self._datetime_from_str(row['attempted_at'])
             # updated_at não está no modelo QuizAttempt, mas o trigger o atualiza no DB
         )
 
+    def _quiz_attempts_from_rows(self, cursor: sqlite3.Cursor, rows: List[sqlite3.Row]) -> List[QuizAttempt]:
+        answers_by_attempt = self._get_answers_for_attempts(cursor, [row['id'] for row in rows])
+        return [self._quiz_attempt_from_row(row, answers_by_attempt[row['id']]) for row in rows]
+
     def add_quiz_attempt(self, attempt: QuizAttempt) -> Optional[QuizAttempt]:
         if not self.conn: return None
         try:
             cursor = self.conn.cursor()
-            # As chaves do dicionário (question_id) devem ser strings no JSON
+            # As chaves do dicionário (question_id) devem ser strings no JSON.
+            # A coluna JSON é mantida para compatibilidade; as respostas são lidas de AttemptAnswers.
             user_answers_json = json.dumps({str(k): v for k, v in attempt.user_answers.items()})
             
             query = """
@@ -1029,17 +2199,50 @@ class DatabaseManager:
                 attempt.total_questions,
                 attempted_at_str
             ))
-            self.conn.commit()
             attempt.id = cursor.lastrowid
+            self._insert_attempt_answers(
+                cursor, [(attempt.id, question_id, answer) for question_id, answer in attempt.user_answers.items()])
+            self._commit()
             if attempt.id:
                 # Buscar para obter attempted_at e updated_at (se o modelo tivesse) do DB
                 return self.get_quiz_attempt_by_id(attempt.id)
             return None
         except sqlite3.Error as e:
-            print(f"Erro ao adicionar QuizAttempt: {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao adicionar QuizAttempt: {e}")
+            if self.conn: self._rollback()
             return None
 
+    def add_quiz_attempts_bulk(self, attempts: Iterable[QuizAttempt]) -> List[int]:
+        """Adiciona várias tentativas (com suas respostas) numa única transação.
+
+        Retorna os ids na ordem de entrada.
+        """
+        if not self.conn: return []
+        query = """
+        INSERT INTO QuizAttempts (quiz_config_id, user_answers, score, total_questions, attempted_at)
+        VALUES (?, ?, ?, ?, ?)
+        """
+
+        def insert_answers(cursor: sqlite3.Cursor, chunk: List[QuizAttempt]):
+            self._insert_attempt_answers(cursor, [(attempt.id, question_id, answer)
+                                                  for attempt in chunk
+                                                  for question_id, answer in attempt.user_answers.items()])
+
+        try:
+            ids = self._insert_many(query, attempts, lambda attempt: (
+                attempt.quiz_config_id,
+                json.dumps({str(k): v for k, v in attempt.user_answers.items()}),
+                attempt.score,
+                attempt.total_questions,
+                self._datetime_to_str(attempt.attempted_at if attempt.attempted_at else datetime.now())
+            ), on_chunk=insert_answers)
+            self._commit()
+            return ids
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao adicionar QuizAttempts em lote: {e}")
+            if self.conn: self._rollback()
+            return []
+
     def get_quiz_attempt_by_id(self, attempt_id: int) -> Optional[QuizAttempt]:
         if not self.conn: return None
         try:
@@ -1047,30 +2250,58 @@ class DatabaseManager:
             query = "SELECT * FROM QuizAttempts WHERE id = ?"
             cursor.execute(query, (attempt_id,))
             row = cursor.fetchone()
-            return self._quiz_attempt_from_row(row)
+            if not row:
+                return None
+            return self._quiz_attempts_from_rows(cursor, [row])[0]
         except sqlite3.Error as e:
-            print(f"Erro ao buscar QuizAttempt por ID: {e}")
+            logger.error(f"Erro ao buscar QuizAttempt por ID: {e}")
             return None
 
     def get_attempts_for_quiz_config(self, quiz_config_id: int) -> List[QuizAttempt]:
         if not self.conn: return []
-        attempts: List[QuizAttempt] = []
         try:
             cursor = self.conn.cursor()
             query = "SELECT * FROM QuizAttempts WHERE quiz_config_id = ? ORDER BY attempted_at DESC"
             cursor.execute(query, (quiz_config_id,))
-            for row in cursor.fetchall():
-                attempt_obj = self._quiz_attempt_from_row(row)
-                if attempt_obj:
-                    attempts.append(attempt_obj)
+            return self._quiz_attempts_from_rows(cursor, cursor.fetchall())
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao buscar tentativas para QuizConfig ID {quiz_config_id}: {e}")
+            return []
+
+    def get_question_answer_stats(self, question_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, int]]:
+        """Estatísticas de respostas por pergunta: {question_id: {'answered': n, 'correct': n}}.
+
+        Sem question_ids, agrega todas as perguntas já respondidas em uma única consulta GROUP BY.
+        """
+        if not self.conn: return {}
+        stats: Dict[int, Dict[str, int]] = {}
+        query = """
+        SELECT question_id, COUNT(*) AS answered, SUM(is_correct) AS correct
+        FROM AttemptAnswers
+        """
+        try:
+            cursor = self.conn.cursor()
+            if question_ids is None:
+                chunks: List[List[int]] = [[]]
+            else:
+                ids = list(dict.fromkeys(question_ids))
+                chunks = [ids[i:i + self.IN_CLAUSE_CHUNK_SIZE] for i in range(0, len(ids), self.IN_CLAUSE_CHUNK_SIZE)]
+            for chunk in chunks:
+                chunk_query = query
+                if question_ids is not None:
+                    chunk_query += f"WHERE question_id IN ({', '.join('?' * len(chunk))})\n"
+                chunk_query += "GROUP BY question_id"
+                cursor.execute(chunk_query, chunk)
+                for row in cursor.fetchall():
+                    stats[row['question_id']] = {'answered': row['answered'], 'correct': row['correct']}
         except sqlite3.Error as e:
-            print(f"Erro ao buscar tentativas para QuizConfig ID {quiz_config_id}: {e}")
-        return attempts
+            logger.error(f"Erro ao calcular estatísticas de respostas: {e}")
+        return stats
         
     def add_sample_data(self):
         """Adiciona dados de exemplo: um evento, uma tarefa e algumas perguntas."""
         if not self.conn:
-            print("Conexão com o banco de dados não estabelecida. Dados de exemplo não adicionados.")
+            logger.error("Conexão com o banco de dados não estabelecida. Dados de exemplo não adicionados.")
             return
 
         # Adicionar evento e tarefa de exemplo
@@ -1122,17 +2353,17 @@ class DatabaseManager:
                 )
                 added_q = self.add_question(question)
                 if added_q and added_q.id is not None:
-                    print(f"Pergunta de exemplo adicionada: '{added_q.text}'")
+                    logger.info(f"Pergunta de exemplo adicionada: '{added_q.text}'")
                     questions_added_count += 1
                 else:
-                    print(f"Falha ao adicionar pergunta de exemplo: '{q_data['text']}'")
+                    logger.error(f"Falha ao adicionar pergunta de exemplo: '{q_data['text']}'")
             else:
-                print(f"Pergunta de exemplo já existe: '{q_data['text']}'")
+                logger.info(f"Pergunta de exemplo já existe: '{q_data['text']}'")
         
         if questions_added_count > 0:
-            print(f"{questions_added_count} novas perguntas de exemplo foram adicionadas.")
+            logger.info(f"{questions_added_count} novas perguntas de exemplo foram adicionadas.")
         else:
-            print("Nenhuma nova pergunta de exemplo foi adicionada (provavelmente já existiam).")
+            logger.info("Nenhuma nova pergunta de exemplo foi adicionada (provavelmente já existiam).")
 
     # --- Settings ---
     def get_setting(self, key: str, default_value: Optional[str] = None) -> Optional[str]:
@@ -1147,7 +2378,7 @@ class DatabaseManager:
                 return row['value']
             return default_value
         except sqlite3.Error as e:
-            print(f"Erro ao buscar configuração '{key}': {e}")
+            logger.error(f"Erro ao buscar configuração '{key}': {e}")
             return default_value
 
     def set_setting(self, key: str, value: str) -> bool:
@@ -1158,11 +2389,11 @@ class DatabaseManager:
             # INSERT OR REPLACE (UPSERT) para inserir se não existir, ou substituir se existir.
             query = "INSERT OR REPLACE INTO Settings (key, value) VALUES (?, ?)"
             cursor.execute(query, (key, value))
-            self.conn.commit()
+            self._commit()
             return cursor.rowcount > 0 # type: ignore
         except sqlite3.Error as e:
-            print(f"Erro ao salvar configuração '{key}'='{value}': {e}")
-            if self.conn: self.conn.rollback()
+            logger.error(f"Erro ao salvar configuração '{key}'='{value}': {e}")
+            if self.conn: self._rollback()
             return False
 
     def close(self):
@@ -1170,12 +2401,15 @@ class DatabaseManager:
         if self.conn:
             self.conn.close()
             self.conn = None
+        self.clear_caches()
 
 if __name__ == '__main__':
     # Corrigir a chamada para add_sample_data se o nome do método foi alterado
     # Supondo que o método de adicionar dados de exemplo agora é add_sample_data
     # db_manager.add_sample_event() foi provavelmente renomeado para db_manager.add_sample_data()
     # Vou assumir que add_sample_data() é o método correto que também lida com Settings.
+    import logging
+    logging.basicConfig(level=logging.INFO, format="%(message)s") # Mostra as mensagens de add_sample_data
     
     db_manager = DatabaseManager(db_path='data/agenda.db') 
     if db_manager.conn:
@@ -0,0 +1,204 @@
+import logging
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Callable, List, Optional
+
+# Logger das operações do banco. Cada instrução executada vira um registro DEBUG com
+# nome (método do DatabaseManager que a executou), duração e número de linhas.
+logger = logging.getLogger("agenda.db")
+
+# Variável de ambiente que liga a instrumentação numa sessão:
+#   AGENDA_DB_LOG=1 (ou true/debug)  -> registros DEBUG em stderr
+#   AGENDA_DB_LOG=/caminho/arquivo   -> registros DEBUG nesse arquivo
+LOG_ENV_VAR = "AGENDA_DB_LOG"
+
+_TRUTHY = {"1", "true", "yes", "on", "debug"}
+_FALSY = {"", "0", "false", "no", "off"}
+
+# Funções chamadas a cada instrução medida, na thread da conexão:
+# (conexão, nome, sql, parâmetros, duração em s, linhas)
+StatementHook = Callable[[sqlite3.Connection, str, str, Any, float, int], None]
+_statement_hooks: List[StatementHook] = []
+
+_env_configured = False
+
+
+def configure_from_env() -> bool:
+    """Aplica AGENDA_DB_LOG ao logger (uma única vez por processo). Devolve True se ligou o DEBUG."""
+    global _env_configured
+    value = os.environ.get(LOG_ENV_VAR, "").strip()
+    if value.lower() in _FALSY:
+        return False
+    if not _env_configured:
+        _env_configured = True
+        if value.lower() in _TRUTHY:
+            handler: logging.Handler = logging.StreamHandler(sys.stderr)
+        else:
+            handler = logging.FileHandler(value, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+    return True
+
+
+def add_statement_hook(hook: StatementHook):
+    """Registra uma função a ser chamada para cada instrução medida (liga a instrumentação)."""
+    if hook not in _statement_hooks:
+        _statement_hooks.append(hook)
+
+
+def remove_statement_hook(hook: StatementHook):
+    if hook in _statement_hooks:
+        _statement_hooks.remove(hook)
+
+
+def instrumentation_enabled() -> bool:
+    """True se as conexões novas devem ser instrumentadas (DEBUG ligado ou algum hook registrado)."""
+    configure_from_env()
+    return bool(_statement_hooks) or logger.isEnabledFor(logging.DEBUG)
+
+
+def connection_factory() -> Optional[type]:
+    """Classe de conexão a passar para sqlite3.connect, ou None para a conexão padrão.
+
+    Decidido na abertura da conexão: sem instrumentação, a conexão é a sqlite3.Connection
+    comum e não há custo algum por instrução.
+    """
+    return InstrumentedConnection if instrumentation_enabled() else None
+
+
+def _caller_name() -> str:
+    """Nome do método (fora deste módulo) que executou a instrução."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else "?"
+
+
+def _summarize_sql(sql: str, max_length: int = 120) -> str:
+    summary = " ".join(sql.split())
+    return summary if len(summary) <= max_length else summary[:max_length - 3] + "..."
+
+
+def _record(connection: sqlite3.Connection, name: str, sql: str, parameters: Any, duration: float, rows: int):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s: %.3f ms, %d linha(s): %s", name, duration * 1000, rows, _summarize_sql(sql),
+                     extra={'db_statement': name, 'db_duration_ms': duration * 1000, 'db_rows': rows})
+    for hook in list(_statement_hooks):
+        try:
+            hook(connection, name, sql, parameters, duration, rows)
+        except Exception as e: # Um hook com defeito não pode derrubar a consulta
+            logger.warning(f"Aviso: hook de instrumentação falhou: {e}")
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor que mede cada instrução.
+
+    Para consultas, a duração inclui a leitura das linhas (fetch*/iteração); o registro
+    é emitido quando as linhas acabam, na próxima instrução ou ao fechar o cursor.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None # [conexão, nome, sql, parâmetros, duração, linhas]
+
+    def _flush(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            _record(*pending)
+
+    def _run(self, method, sql: str, parameters: Any):
+        self._flush()
+        name = _caller_name()
+        start = time.perf_counter()
+        method(sql, parameters)
+        duration = time.perf_counter() - start
+        if self.description is None: # Sem linhas a ler (INSERT/UPDATE/DELETE, DDL...)
+            _record(self.connection, name, sql, parameters, duration, max(self.rowcount, 0))
+        else:
+            self._pending = [self.connection, name, sql, parameters, duration, 0]
+        return self
+
+    def execute(self, sql: str, parameters: Any = ()):
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any):
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        return self._run(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str):
+        self._flush()
+        name = _caller_name()
+        start = time.perf_counter()
+        super().executescript(sql_script)
+        _record(self.connection, name, sql_script, None, time.perf_counter() - start, 0)
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        if self._pending is not None:
+            self._pending[4] += time.perf_counter() - start
+            if row is None:
+                self._flush()
+            else:
+                self._pending[5] += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._pending is not None:
+            self._pending[4] += time.perf_counter() - start
+            self._pending[5] += len(rows)
+            if not rows:
+                self._flush()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        if self._pending is not None:
+            self._pending[4] += time.perf_counter() - start
+            self._pending[5] += len(rows)
+            self._flush()
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._flush()
+        super().close()
+
+    def __del__(self):
+        # Consultas lidas só em parte (ex.: um único fetchone) são registradas quando o cursor é descartado
+        try:
+            self._flush()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os atalhos execute*) são InstrumentedCursor."""
+
+    def cursor(self, factory: Callable[..., sqlite3.Cursor] = InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str):
+        return self.cursor().executescript(sql_script)
@@ -0,0 +1,55 @@
+import copy
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class ObjectCache:
+    """Cache LRU limitado de objetos por ID (mapa de identidade de uma tabela).
+
+    Usado pelo DatabaseManager para servir get_*_by_id da memória. Com max_size 0
+    o cache fica desativado: get sempre falha e put não guarda nada.
+
+    put guarda uma cópia e get devolve outra: alterar um objeto recebido (sem salvá-lo)
+    não muda o que o cache entrega depois. A cópia é profunda porque os modelos têm
+    listas e dicionários (ex.: Question.options, Entity.details_json).
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max(0, max_size)
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size == 0 or value is None:
+            return
+        self._items[key] = copy.deepcopy(value)
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False) # Remove o item usado há mais tempo
+
+    def invalidate(self, key: Hashable):
+        self._items.pop(key, None)
+
+    def clear(self):
+        self._items.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._items),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def __len__(self):
+        return len(self._items)
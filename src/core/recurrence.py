@@ -0,0 +1,310 @@
+import calendar
+from datetime import datetime, date, time, timedelta
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, FrozenSet
+
+# Expansão de regras de recorrência no estilo RRULE (RFC 5545), restrita ao
+# subconjunto usado pela agenda: FREQ=DAILY/WEEKLY/MONTHLY, INTERVAL, BYDAY,
+# BYMONTHDAY, COUNT, UNTIL e EXDATE.
+#
+# Exemplo de regra armazenada em Events.recurrence_rule:
+#   FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20251231T235959;EXDATE=20250303T080000,20250416
+
+WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+WEEKDAY_NAMES = {v: k for k, v in WEEKDAYS.items()}
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+
+# Limite de períodos consecutivos sem nenhuma ocorrência válida (ex.: BYMONTHDAY=31
+# com INTERVAL=2 começando num mês de 30 dias). Evita laços infinitos.
+MAX_EMPTY_PERIODS = 1000
+
+# Entradas dos caches de regras e de fim das séries com COUNT. Consultas fora da janela
+# materializada expandem todos os recorrentes de uma vez; um cache menor que o número
+# de séries seria esvaziado a cada consulta.
+RULE_CACHE_SIZE = 8192
+
+
+def _parse_rule_datetime(value: str) -> Tuple[Optional[datetime], bool]:
+    """Converte 'YYYYMMDD[THHMMSS]' ou ISO 8601 em datetime.
+
+    Retorna (datetime, somente_data). Para valores só com data o horário é 00:00.
+    """
+    value = value.strip().rstrip('Z')
+    for fmt in ('%Y%m%dT%H%M%S', '%Y%m%dT%H%M'):
+        try:
+            return datetime.strptime(value, fmt), False
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(value, '%Y%m%d'), True
+    except ValueError:
+        pass
+    try:
+        if len(value) == 10:
+            return datetime.combine(date.fromisoformat(value), time()), True
+        return datetime.fromisoformat(value), False
+    except ValueError:
+        raise ValueError(f"Data inválida na regra de recorrência: '{value}'")
+
+
+class RecurrenceRule:
+    """Regra de recorrência imutável, com expansão preguiçosa de ocorrências."""
+
+    def __init__(self,
+                 freq: str,
+                 interval: int = 1,
+                 count: Optional[int] = None,
+                 until: Optional[datetime] = None,
+                 by_day: Optional[List[Tuple[Optional[int], int]]] = None,
+                 by_month_day: Optional[List[int]] = None,
+                 exdates: Optional[List[datetime]] = None,
+                 exdate_days: Optional[List[date]] = None):
+        if freq not in FREQUENCIES:
+            raise ValueError(f"FREQ não suportada: '{freq}'")
+        if interval < 1:
+            raise ValueError("INTERVAL deve ser maior ou igual a 1")
+        if count is not None and count < 1:
+            raise ValueError("COUNT deve ser maior ou igual a 1")
+        self.freq = freq
+        self.interval = interval
+        self.count = count
+        self.until = until
+        self.by_day: Tuple[Tuple[Optional[int], int], ...] = tuple(by_day or ())
+        self.by_month_day: Tuple[int, ...] = tuple(by_month_day or ())
+        self.exdates: FrozenSet[datetime] = frozenset(exdates or ())
+        self.exdate_days: FrozenSet[date] = frozenset(exdate_days or ())
+        self._weekday_set = frozenset(wd for _, wd in self.by_day)
+
+    @classmethod
+    def parse(cls, text: str) -> 'RecurrenceRule':
+        """Interpreta o texto de Events.recurrence_rule. Levanta ValueError se inválido."""
+        return _parse_cached(text.strip())
+
+    def _key(self):
+        return (self.freq, self.interval, self.count, self.until, self.by_day,
+                self.by_month_day, self.exdates, self.exdate_days)
+
+    def __eq__(self, other):
+        return isinstance(other, RecurrenceRule) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"<RecurrenceRule({self.to_string()})>"
+
+    def to_string(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.by_day:
+            parts.append("BYDAY=" + ",".join(
+                f"{ordinal if ordinal else ''}{WEEKDAY_NAMES[wd]}" for ordinal, wd in self.by_day))
+        if self.by_month_day:
+            parts.append("BYMONTHDAY=" + ",".join(str(d) for d in self.by_month_day))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%S')}")
+        exdates = sorted([dt.strftime('%Y%m%dT%H%M%S') for dt in self.exdates] +
+                         [d.strftime('%Y%m%d') for d in self.exdate_days])
+        if exdates:
+            parts.append("EXDATE=" + ",".join(exdates))
+        return ";".join(parts)
+
+    # --- Expansão ---
+    def _first_period(self, dtstart: datetime, window_start: datetime) -> int:
+        """Índice do primeiro período que pode conter ocorrências >= window_start."""
+        if window_start <= dtstart:
+            return 0
+        d0 = dtstart.date()
+        target = window_start.date()
+        if self.freq == 'DAILY':
+            return (target - d0).days // self.interval
+        if self.freq == 'WEEKLY':
+            week0 = d0 - timedelta(days=d0.weekday())
+            return (target - week0).days // (7 * self.interval)
+        month_index0 = d0.year * 12 + d0.month - 1
+        target_index = target.year * 12 + target.month - 1
+        return (target_index - month_index0) // self.interval
+
+    def _period_dates(self, d0: date, period: int) -> List[date]:
+        """Datas candidatas (ordenadas) do período indicado."""
+        if self.freq == 'DAILY':
+            day = d0 + timedelta(days=period * self.interval)
+            if self._weekday_set and day.weekday() not in self._weekday_set:
+                return []
+            return [day]
+
+        if self.freq == 'WEEKLY':
+            week_start = d0 - timedelta(days=d0.weekday()) + timedelta(weeks=period * self.interval)
+            weekdays = sorted(self._weekday_set) if self._weekday_set else [d0.weekday()]
+            return [week_start + timedelta(days=wd) for wd in weekdays]
+
+        month_index = d0.year * 12 + d0.month - 1 + period * self.interval
+        year, month = divmod(month_index, 12)
+        month += 1
+        days_in_month = calendar.monthrange(year, month)[1]
+        days = set()
+        if self.by_month_day:
+            for md in self.by_month_day:
+                day_number = md if md > 0 else days_in_month + md + 1
+                if 1 <= day_number <= days_in_month:
+                    days.add(day_number)
+        elif self.by_day:
+            first_weekday = calendar.monthrange(year, month)[0]
+            for ordinal, wd in self.by_day:
+                first = 1 + (wd - first_weekday) % 7
+                matches = list(range(first, days_in_month + 1, 7))
+                if ordinal is None:
+                    days.update(matches)
+                elif 0 < ordinal <= len(matches):
+                    days.add(matches[ordinal - 1])
+                elif 0 < -ordinal <= len(matches):
+                    days.add(matches[ordinal])
+        elif d0.day <= days_in_month:
+            days.add(d0.day)
+        return [date(year, month, day) for day in sorted(days)]
+
+    def _iter_candidates(self, dtstart: datetime, first_period: int) -> Iterator[datetime]:
+        """Gera as ocorrências brutas (antes de UNTIL/COUNT/EXDATE) a partir de um período."""
+        d0 = dtstart.date()
+        start_time = dtstart.time()
+        period = first_period
+        empty_periods = 0
+        while True:
+            dates = self._period_dates(d0, period)
+            if dates:
+                empty_periods = 0
+                for day in dates:
+                    candidate = datetime.combine(day, start_time)
+                    if candidate >= dtstart:
+                        yield candidate
+            else:
+                empty_periods += 1
+                if empty_periods > MAX_EMPTY_PERIODS:
+                    return
+            period += 1
+
+    def last_occurrence(self, dtstart: datetime) -> Optional[datetime]:
+        """Último instante possível da série (UNTIL e/ou COUNT), ou None se infinita."""
+        limit = self.until
+        if self.count is not None:
+            counted = _count_limit(self, dtstart)
+            if counted is not None and (limit is None or counted < limit):
+                limit = counted
+        return limit
+
+    def occurrences(self,
+                    dtstart: datetime,
+                    window_start: Optional[datetime] = None,
+                    window_end: Optional[datetime] = None) -> Iterator[datetime]:
+        """Gera preguiçosamente as ocorrências em [window_start, window_end).
+
+        A expansão salta diretamente para o período que contém window_start, então
+        o custo depende apenas do tamanho da janela, e não da idade da série.
+        """
+        limit = self.last_occurrence(dtstart)
+        first_period = self._first_period(dtstart, window_start) if window_start else 0
+        for occurrence in self._iter_candidates(dtstart, first_period):
+            if limit is not None and occurrence > limit:
+                return
+            if window_end is not None and occurrence >= window_end:
+                return
+            if window_start is not None and occurrence < window_start:
+                continue
+            if occurrence in self.exdates or occurrence.date() in self.exdate_days:
+                continue
+            yield occurrence
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def _count_limit(rule: RecurrenceRule, dtstart: datetime) -> Optional[datetime]:
+    """Data/hora da COUNT-ésima ocorrência (EXDATE não altera a contagem, como na RFC 5545)."""
+    remaining = rule.count
+    for occurrence in rule._iter_candidates(dtstart, 0):
+        if rule.until is not None and occurrence > rule.until:
+            return None
+        remaining -= 1
+        if remaining == 0:
+            return occurrence
+    return None
+
+
+@lru_cache(maxsize=RULE_CACHE_SIZE)
+def _parse_cached(text: str) -> RecurrenceRule:
+    if not text:
+        raise ValueError("Regra de recorrência vazia")
+
+    fields = {}
+    exdates: List[datetime] = []
+    exdate_days: List[date] = []
+    for line in text.replace('\r', '').split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        upper = line.upper()
+        if upper.startswith('RRULE:'):
+            line = line[6:]
+        elif upper.startswith('EXDATE:'):
+            line = 'EXDATE=' + line[7:]
+        for part in line.split(';'):
+            if not part.strip():
+                continue
+            if '=' not in part:
+                raise ValueError(f"Parte inválida na regra de recorrência: '{part}'")
+            key, value = part.split('=', 1)
+            key = key.strip().upper()
+            if key == 'EXDATE':
+                for raw in value.split(','):
+                    if raw.strip():
+                        parsed, date_only = _parse_rule_datetime(raw)
+                        if date_only:
+                            exdate_days.append(parsed.date())
+                        else:
+                            exdates.append(parsed)
+            else:
+                fields[key] = value.strip()
+
+    freq = fields.pop('FREQ', '').upper()
+    if not freq:
+        raise ValueError("Regra de recorrência sem FREQ")
+
+    try:
+        interval = int(fields.pop('INTERVAL', '1'))
+        count = int(fields['COUNT']) if 'COUNT' in fields else None
+        by_month_day = [int(v) for v in fields['BYMONTHDAY'].split(',')] if 'BYMONTHDAY' in fields else None
+    except ValueError:
+        raise ValueError(f"Valor numérico inválido na regra de recorrência: '{text}'")
+    fields.pop('COUNT', None)
+    fields.pop('BYMONTHDAY', None)
+
+    until = None
+    if 'UNTIL' in fields:
+        until, date_only = _parse_rule_datetime(fields.pop('UNTIL'))
+        if date_only:
+            # UNTIL só com data inclui o dia inteiro
+            until = datetime.combine(until.date(), time.max.replace(microsecond=0))
+
+    by_day = None
+    if 'BYDAY' in fields:
+        by_day = []
+        for token in fields.pop('BYDAY').upper().split(','):
+            token = token.strip()
+            weekday = WEEKDAYS.get(token[-2:])
+            if weekday is None:
+                raise ValueError(f"Dia da semana inválido em BYDAY: '{token}'")
+            ordinal_text = token[:-2]
+            try:
+                ordinal = int(ordinal_text) if ordinal_text else None
+            except ValueError:
+                raise ValueError(f"Ordinal inválido em BYDAY: '{token}'")
+            by_day.append((ordinal, weekday))
+
+    fields.pop('WKST', None)  # Semanas sempre começam na segunda-feira
+    if fields:
+        raise ValueError(f"Partes não suportadas na regra de recorrência: {', '.join(sorted(fields))}")
+
+    return RecurrenceRule(freq=freq, interval=interval, count=count, until=until,
+                          by_day=by_day, by_month_day=by_month_day,
+                          exdates=exdates, exdate_days=exdate_days)
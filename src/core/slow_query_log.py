@@ -0,0 +1,222 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.core.db_instrumentation import logger, add_statement_hook, remove_statement_hook
+
+# Variável de ambiente com o limite (em ms) a partir do qual uma instrução é registrada.
+# O registro é opcional: sem ela as conexões não são instrumentadas.
+#   AGENDA_SLOW_QUERY_MS=50  -> registra instruções com 50 ms ou mais
+#   AGENDA_SLOW_QUERY_MS=0   -> desliga o registro (como sem a variável)
+SLOW_QUERY_ENV_VAR = "AGENDA_SLOW_QUERY_MS"
+DEFAULT_THRESHOLD_MS = 100.0
+
+# Só estas instruções têm plano de consulta; BEGIN/COMMIT/DDL são registrados sem plano
+_EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+# "FROM Tabela alias" / "JOIN Tabela AS alias" -> nome do alias usado no plano
+_TABLE_ALIAS_RE = re.compile(
+    r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|INNER|CROSS|GROUP|ORDER|LIMIT|USING|UNION|NATURAL)\b)(\w+))?',
+    re.IGNORECASE)
+
+_installed: Optional['SlowQueryLog'] = None
+
+
+def _value_shape(value: Any) -> str:
+    """Descrição do tipo (e tamanho) de um parâmetro, sem o valor: os dumps podem ser compartilhados."""
+    if value is None:
+        return "None"
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def _parameter_shapes(parameters: Any, executemany: bool) -> Any:
+    if parameters is None:
+        return None
+    if executemany:
+        batch = list(parameters)
+        return {'batch': len(batch), 'first': _parameter_shapes(batch[0], False) if batch else None}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    return [_value_shape(value) for value in parameters]
+
+
+class SlowQueryLog:
+    """Registro das instruções SQL mais lentas que um limite, para diagnóstico.
+
+    Recebe as instruções de todas as conexões instrumentadas (ver db_instrumentation) e
+    guarda as últimas `capacity` que levaram threshold_ms ou mais, cada uma com:
+    método do DatabaseManager, duração, SQL, formato dos parâmetros (tipos e tamanhos,
+    nunca os valores), o EXPLAIN QUERY PLAN e as varreduras completas (SCAN) em tabelas
+    com large_table_rows linhas ou mais. O tamanho das tabelas vem das estatísticas do
+    ANALYZE (sqlite_stat1), sem contar linhas; sem estatísticas, toda varredura é
+    registrada, com 'rows' None.
+
+    Precisa ser instalado (install()) antes da abertura das conexões a observar.
+    """
+
+    def __init__(self, threshold_ms: float = DEFAULT_THRESHOLD_MS, capacity: int = 200,
+                 large_table_rows: int = 10000):
+        self.threshold_ms = threshold_ms
+        self.capacity = capacity
+        self.large_table_rows = large_table_rows
+        self._entries: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        # Estimativa de linhas por (conexão, tabela) -> (estimativa, momento), reaproveitada por um tempo
+        self._table_rows: Dict[tuple, tuple] = {}
+
+    def install(self):
+        """Passa a receber as instruções das conexões abertas a partir de agora."""
+        global _installed
+        add_statement_hook(self._on_statement)
+        _installed = self
+
+    def uninstall(self):
+        global _installed
+        remove_statement_hook(self._on_statement)
+        if _installed is self:
+            _installed = None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Cópia das instruções registradas, da mais antiga para a mais recente."""
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def to_json(self) -> str:
+        entries = self.entries()
+        return json.dumps({
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'threshold_ms': self.threshold_ms,
+            'large_table_rows': self.large_table_rows,
+            'count': len(entries),
+            'entries': entries,
+        }, ensure_ascii=False, indent=2)
+
+    def dump_json(self, path: str) -> bool:
+        """Grava as instruções registradas em um arquivo JSON. Devolve False em caso de erro."""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.to_json())
+            return True
+        except OSError as e:
+            logger.error(f"Erro ao gravar as consultas lentas em {path}: {e}")
+            return False
+
+    def _on_statement(self, connection: sqlite3.Connection, name: str, sql: str, parameters: Any,
+                      duration: float, rows: int):
+        duration_ms = duration * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        # executemany chega como lista de sequências de parâmetros
+        executemany = isinstance(parameters, list) and bool(parameters) \
+            and isinstance(parameters[0], (list, tuple, dict))
+        plan, full_scans = self._explain(connection, sql, parameters, executemany)
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+            'method': name,
+            'thread': threading.current_thread().name,
+            'duration_ms': round(duration_ms, 3),
+            'rows': rows,
+            'sql': " ".join(sql.split()),
+            'parameters': _parameter_shapes(parameters, executemany),
+            'plan': plan,
+            'full_scans': full_scans,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        if full_scans:
+            logger.warning(f"Aviso: consulta lenta em {name} ({duration_ms:.1f} ms) varre "
+                           + ", ".join(f"{scan['table']} ({scan['rows']} linhas)" if scan['rows'] is not None
+                                       else f"{scan['table']} (tamanho desconhecido)" for scan in full_scans))
+
+    def _explain(self, connection: sqlite3.Connection, sql: str, parameters: Any,
+                 executemany: bool):
+        """(plano, varreduras completas em tabelas grandes) de uma instrução."""
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE_PREFIXES):
+            return None, []
+        if executemany:
+            parameters = parameters[0]
+        try:
+            # Cursor comum: o EXPLAIN não deve passar de novo pela instrumentação
+            cursor = sqlite3.Cursor(connection)
+            plan_rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters or ()).fetchall()
+        except sqlite3.Error as e:
+            return [f"EXPLAIN QUERY PLAN falhou: {e}"], []
+
+        # Indentação pela profundidade no plano, como no shell do sqlite3
+        depth = {0: -1}
+        plan = []
+        full_scans = []
+        aliases = {(alias or table).lower(): table for table, alias in _TABLE_ALIAS_RE.findall(sql)}
+        for row in plan_rows:
+            node_id, parent_id, detail = row[0], row[1], row[3]
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            plan.append("  " * depth[node_id] + detail)
+            words = detail.split()
+            if len(words) < 2 or words[0] != "SCAN":
+                continue
+            table = aliases.get(words[1].lower(), words[1])
+            table_rows = self._estimated_rows(connection, table)
+            if table_rows is None or table_rows >= self.large_table_rows:
+                full_scans.append({'table': table, 'rows': table_rows, 'detail': detail})
+        return plan, full_scans
+
+    TABLE_ROWS_TTL_S = 60.0
+
+    def _estimated_rows(self, connection: sqlite3.Connection, table: str) -> Optional[int]:
+        """Linhas de table segundo sqlite_stat1; None sem ANALYZE ou sem estatística da tabela.
+
+        Não usa COUNT(*): a varredura extra pesaria justamente numa consulta que já é lenta.
+        """
+        key = (id(connection), table)
+        cached = self._table_rows.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.TABLE_ROWS_TTL_S:
+            return cached[0]
+        try:
+            cursor = sqlite3.Cursor(connection)
+            # O primeiro número de stat é a quantidade de linhas da tabela (ou do índice)
+            stats = cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ?", (table,)).fetchall()
+            counts = [int(row[0].split()[0]) for row in stats if row[0]]
+            table_rows = max(counts) if counts else None
+        except (sqlite3.Error, ValueError): # Sem sqlite_stat1 (nenhum ANALYZE) ou stat inesperado
+            table_rows = None
+        self._table_rows[key] = (table_rows, time.monotonic())
+        return table_rows
+
+
+def installed_slow_query_log() -> Optional[SlowQueryLog]:
+    """O SlowQueryLog instalado neste processo, se houver."""
+    return _installed
+
+
+def install_from_env() -> Optional[SlowQueryLog]:
+    """Instala um SlowQueryLog com o limite de AGENDA_SLOW_QUERY_MS, se a variável estiver definida.
+
+    Devolve None (e nada é instalado) sem a variável, com valor inválido ou com 0.
+    """
+    value = os.environ.get(SLOW_QUERY_ENV_VAR, "").strip()
+    if not value:
+        return None
+    try:
+        threshold_ms = float(value)
+    except ValueError:
+        logger.warning(f"Aviso: {SLOW_QUERY_ENV_VAR} inválido ('{value}'); registro de consultas lentas desligado.")
+        return None
+    if threshold_ms <= 0:
+        return None
+    if _installed is not None:
+        _installed.threshold_ms = threshold_ms
+        return _installed
+    slow_query_log = SlowQueryLog(threshold_ms=threshold_ms)
+    slow_query_log.install()
+    return slow_query_log
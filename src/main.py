@@ -4,6 +4,7 @@ from PyQt6.QtWidgets import QApplication, QMessageBox
 from src.ui.main_window import MainWindow
 from src.core.database_manager import DatabaseManager
 from src.ui.theme_manager import ThemeManager # Adicionado ThemeManager
+from src.core.slow_query_log import install_from_env
 
 def get_application_base_path():
     """Retorna o caminho base para dados, considerando se está empacotado ou em dev."""
@@ -39,6 +40,10 @@ def main():
                                  "A aplicação pode não funcionar corretamente.")
             # A aplicação provavelmente falhará se não puder criar/acessar o DB.
     
+    # Registro de consultas lentas, só com AGENDA_SLOW_QUERY_MS definido (ex.: 100). Instalado
+    # antes de abrir qualquer conexão: só as conexões abertas depois dele são observadas.
+    install_from_env()
+
     # Inicializar o DatabaseManager com o caminho dinâmico
     db_manager = DatabaseManager(db_path=db_path)
     
@@ -0,0 +1,328 @@
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.core.database_manager import DatabaseManager
+from src.core.models import Event, Task, Question, QuizConfig, QuizAttempt, Entity
+
+# Gerador de bancos sintéticos para testes de carga, benchmarks e reprodução de bugs.
+#
+# O mesmo seed (e os mesmos tamanhos) produz sempre o mesmo conteúdo; só as colunas
+# preenchidas pelo SQLite (created_at/updated_at) variam. Cada tabela usa um gerador
+# aleatório próprio, derivado do seed, para que mudar o tamanho de uma não altere as outras.
+#
+# Uso:
+#   python -m src.tools.dataset_generator --scale large --seed 42 --output data/carga.db
+
+logger = logging.getLogger("agenda.tools")
+
+# Quantidade de linhas por tabela em cada escala
+SCALES: Dict[str, Dict[str, int]] = {
+    'small': {
+        'events': 1000, 'tasks': 500, 'questions': 500, 'entities': 100,
+        'event_entity_links': 5000, 'quiz_configs': 20, 'quiz_attempts': 1000,
+    },
+    'medium': {
+        'events': 10000, 'tasks': 5000, 'questions': 5000, 'entities': 1000,
+        'event_entity_links': 100000, 'quiz_configs': 100, 'quiz_attempts': 20000,
+    },
+    'large': {
+        'events': 100000, 'tasks': 20000, 'questions': 50000, 'entities': 10000,
+        'event_entity_links': 1000000, 'quiz_configs': 500, 'quiz_attempts': 200000,
+    },
+}
+DEFAULT_SEED = 42
+# Versão do conteúdo gerado: incrementar quando uma mudança no gerador alterar o banco
+# produzido por um mesmo seed (os bancos em cache dos benchmarks levam esta versão no nome)
+GENERATOR_VERSION = 1
+# Data de referência fixa (e não date.today()) para que o conteúdo seja reprodutível
+DEFAULT_BASE_DATE = date(2025, 1, 1)
+# Eventos e tarefas ficam em [base - DATE_SPAN_DAYS, base + DATE_SPAN_DAYS)
+DATE_SPAN_DAYS = 365
+
+EVENT_TYPES = ["aula", "aula", "aula", "reuniao", "prova", "plantao", "evento"]
+EVENT_TITLES = ["Aula de {subject}", "Revisão de {subject}", "Prova de {subject}", "Reunião de {subject}",
+                "Plantão de dúvidas: {subject}", "Conselho de classe", "Reunião de pais", "Atividade extra"]
+LOCATIONS = ["Sala 101", "Sala 102", "Sala 203", "Laboratório", "Biblioteca", "Auditório", "Quadra", None]
+RECURRENCE_RULES = [
+    "FREQ=WEEKLY;BYDAY=MO,WE;COUNT=40",
+    "FREQ=WEEKLY;BYDAY=TU,TH;COUNT=40",
+    "FREQ=WEEKLY;INTERVAL=2;BYDAY=FR;COUNT=20",
+    "FREQ=DAILY;INTERVAL=2;COUNT=30",
+    "FREQ=MONTHLY;BYMONTHDAY=15;COUNT=12",
+    "FREQ=MONTHLY;BYDAY=1MO;COUNT=10",
+]
+# Fração dos eventos gerados com regra de recorrência
+RECURRING_FRACTION = 0.03
+
+SUBJECTS = ["Matemática", "Português", "História", "Geografia", "Física", "Química", "Biologia",
+            "Inglês", "Literatura", "Filosofia", "Sociologia", "Artes"]
+DIFFICULTIES = ["Fácil", "Médio", "Médio", "Difícil"]
+QUESTION_TEMPLATES = ["Qual é o conceito central de {topic}?", "Explique a relação entre {topic} e {other}.",
+                      "Qual alternativa descreve corretamente {topic}?", "Em que contexto se aplica {topic}?",
+                      "Qual é a principal consequência de {topic}?"]
+TOPICS = ["funções", "equações", "revoluções", "clima", "energia", "ligações químicas", "células", "verbos",
+          "romantismo", "ética", "urbanização", "perspectiva", "frações", "ondas", "evolução", "gramática",
+          "modernismo", "cartografia", "estequiometria", "genética"]
+
+ENTITY_TYPES = ["Aluno"] * 6 + ["Professor", "Professor", "Contato", "Outro"]
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+               "João", "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Tiago",
+               "Valéria", "William"]
+LAST_NAMES = ["Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Ferreira", "Rodrigues",
+              "Almeida", "Costa", "Gomes", "Martins", "Araújo", "Barbosa"]
+ROLES = ["participante", "participante", "participante", "responsável", "convidado"]
+
+TASK_PRIORITIES = ["Low", "Medium", "Medium", "High"]
+TASK_STATUSES = ["Open", "Open", "In Progress", "Completed"]
+TASK_TITLES = ["Corrigir provas de {subject}", "Preparar aula de {subject}", "Lançar notas de {subject}",
+               "Revisar material de {subject}", "Planejar atividade de {subject}"]
+
+
+class DatasetGenerator:
+    """Preenche um DatabaseManager com dados sintéticos pelos caminhos de escrita em lote.
+
+    generate() insere, nesta ordem: entidades, eventos, vínculos evento-entidade,
+    tarefas, perguntas, configurações de quiz e tentativas. Cada tabela é gravada
+    em uma única transação (add_*_bulk / link_entities_to_events_bulk).
+    """
+
+    def __init__(self, db_manager: DatabaseManager, seed: int = DEFAULT_SEED,
+                 base_date: date = DEFAULT_BASE_DATE, recurring_fraction: float = RECURRING_FRACTION):
+        self.db_manager = db_manager
+        self.seed = seed
+        self.base_date = base_date
+        self.recurring_fraction = recurring_fraction
+
+    def _random(self, table: str) -> random.Random:
+        return random.Random(f"{self.seed}:{table}")
+
+    def _random_datetime(self, rng: random.Random) -> datetime:
+        """Horário entre 7h e 21h30 (em passos de 30 min) de um dia do intervalo gerado."""
+        day = self.base_date + timedelta(days=rng.randrange(-DATE_SPAN_DAYS, DATE_SPAN_DAYS))
+        return datetime.combine(day, datetime.min.time()) + timedelta(minutes=7 * 60 + 30 * rng.randrange(30))
+
+    def generate(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """Gera as quantidades pedidas (chaves como em SCALES) e devolve quantas linhas foram gravadas."""
+        created: Dict[str, int] = {}
+
+        def timed(table: str, insert):
+            start = time.perf_counter()
+            created[table] = insert()
+            logger.info(f"{table}: {created[table]} linha(s) em {time.perf_counter() - start:.1f} s")
+
+        entity_ids: List[int] = []
+        event_ids: List[int] = []
+        questions: List[Question] = []
+        quiz_configs: List[QuizConfig] = []
+
+        def insert_entities():
+            entity_ids.extend(self.db_manager.add_entities_bulk(self._entities(counts.get('entities', 0))))
+            return len(entity_ids)
+        timed('entities', insert_entities)
+
+        def insert_events():
+            event_ids.extend(self.db_manager.add_events_bulk(self._events(counts.get('events', 0))))
+            return len(event_ids)
+        timed('events', insert_events)
+
+        timed('event_entity_links', lambda: self.db_manager.link_entities_to_events_bulk(
+            self._event_entity_links(counts.get('event_entity_links', 0), event_ids, entity_ids)))
+
+        timed('tasks', lambda: len(self.db_manager.add_tasks_bulk(self._tasks(counts.get('tasks', 0), event_ids))))
+
+        def insert_questions():
+            questions.extend(self._questions(counts.get('questions', 0)))
+            return len(self.db_manager.add_questions_bulk(questions))
+        timed('questions', insert_questions)
+
+        def insert_quiz_configs():
+            with self.db_manager.transaction():
+                for quiz_config in self._quiz_configs(counts.get('quiz_configs', 0), questions):
+                    added = self.db_manager.add_quiz_config(quiz_config)
+                    if added:
+                        quiz_configs.append(added)
+            return len(quiz_configs)
+        timed('quiz_configs', insert_quiz_configs)
+
+        timed('quiz_attempts', lambda: len(self.db_manager.add_quiz_attempts_bulk(
+            self._quiz_attempts(counts.get('quiz_attempts', 0), quiz_configs, questions))))
+        return created
+
+    def _entities(self, count: int) -> Iterator[Entity]:
+        rng = self._random('entities')
+        for i in range(count):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            entity_type = rng.choice(ENTITY_TYPES)
+            details = {"email": f"{first_name.lower()}.{last_name.lower()}{i}@escola.example"}
+            if entity_type == "Aluno":
+                details["turma"] = f"{rng.randint(6, 9)}º {rng.choice('ABCD')}"
+            yield Entity(name=f"{first_name} {last_name} {i}", type=entity_type, details_json=details)
+
+    def _events(self, count: int) -> Iterator[Event]:
+        rng = self._random('events')
+        for _ in range(count):
+            start_time = self._random_datetime(rng)
+            subject = rng.choice(SUBJECTS)
+            recurrence_rule = rng.choice(RECURRENCE_RULES) if rng.random() < self.recurring_fraction else None
+            yield Event(
+                title=rng.choice(EVENT_TITLES).format(subject=subject),
+                description=f"Conteúdo: {rng.choice(TOPICS)} ({subject})" if rng.random() < 0.5 else None,
+                start_time=start_time,
+                end_time=start_time + timedelta(minutes=rng.choice((50, 50, 100, 120, 180))),
+                event_type=rng.choice(EVENT_TYPES),
+                location=rng.choice(LOCATIONS),
+                recurrence_rule=recurrence_rule
+            )
+
+    def _event_entity_links(self, count: int, event_ids: List[int],
+                            entity_ids: List[int]) -> Iterator[Tuple[int, int, str]]:
+        """count vínculos distintos, distribuídos igualmente entre os eventos.
+
+        Metade das escolhas cai nos primeiros 5% das entidades, para que algumas
+        (professores, turmas) apareçam em muitos eventos, como em dados reais.
+        """
+        if not event_ids or not entity_ids:
+            return
+        rng = self._random('event_entity_links')
+        per_event, remainder = divmod(count, len(event_ids))
+        per_event_max = min(len(entity_ids), per_event + 1)
+        popular = max(1, len(entity_ids) // 20)
+        for index, event_id in enumerate(event_ids):
+            wanted = min(per_event + (1 if index < remainder else 0), per_event_max)
+            chosen: Dict[int, None] = {}
+            while len(chosen) < wanted:
+                pool = popular if rng.random() < 0.5 else len(entity_ids)
+                chosen.setdefault(entity_ids[rng.randrange(pool)], None)
+            for entity_id in chosen:
+                yield event_id, entity_id, rng.choice(ROLES)
+
+    def _tasks(self, count: int, event_ids: List[int]) -> Iterator[Task]:
+        rng = self._random('tasks')
+        for _ in range(count):
+            subject = rng.choice(SUBJECTS)
+            yield Task(
+                title=rng.choice(TASK_TITLES).format(subject=subject),
+                description=f"Turma {rng.randint(6, 9)}º {rng.choice('ABCD')}" if rng.random() < 0.6 else None,
+                priority=rng.choice(TASK_PRIORITIES),
+                due_date=self._random_datetime(rng) if rng.random() < 0.8 else None,
+                status=rng.choice(TASK_STATUSES),
+                parent_event_id=rng.choice(event_ids) if event_ids and rng.random() < 0.2 else None
+            )
+
+    def _questions(self, count: int) -> List[Question]:
+        rng = self._random('questions')
+        questions = []
+        for i in range(count):
+            subject = rng.choice(SUBJECTS)
+            topic, other = rng.sample(TOPICS, 2)
+            options = [f"{topic.capitalize()}: alternativa {letter} ({i})" for letter in "ABCD"]
+            questions.append(Question(
+                text=f"{rng.choice(QUESTION_TEMPLATES).format(topic=topic, other=other)} [{subject} #{i}]",
+                subject=subject,
+                difficulty=rng.choice(DIFFICULTIES),
+                options=options,
+                answer=rng.choice(options)
+            ))
+        return questions
+
+    def _quiz_configs(self, count: int, questions: List[Question]) -> Iterator[QuizConfig]:
+        if not questions:
+            return
+        rng = self._random('quiz_configs')
+        for i in range(count):
+            size = min(len(questions), rng.randint(5, 20))
+            yield QuizConfig(name=f"Quiz {i + 1}",
+                             question_ids=[question.id for question in rng.sample(questions, size)])
+
+    def _quiz_attempts(self, count: int, quiz_configs: List[QuizConfig],
+                       questions: List[Question]) -> Iterator[QuizAttempt]:
+        if not quiz_configs:
+            return
+        rng = self._random('quiz_attempts')
+        questions_by_id = {question.id: question for question in questions}
+        for _ in range(count):
+            quiz_config = rng.choice(quiz_configs)
+            user_answers: Dict[int, str] = {}
+            score = 0
+            for question_id in quiz_config.question_ids:
+                question = questions_by_id[question_id]
+                answer = question.answer if rng.random() < 0.6 else rng.choice(question.options)
+                user_answers[question_id] = answer
+                score += answer == question.answer
+            yield QuizAttempt(quiz_config_id=quiz_config.id, user_answers=user_answers, score=score,
+                              total_questions=len(quiz_config.question_ids),
+                              attempted_at=self._random_datetime(rng))
+
+
+def remove_database(db_path: str):
+    """Apaga o arquivo do banco e os arquivos auxiliares do WAL."""
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+
+def generate_database(db_path: str, scale: str = 'small', seed: int = DEFAULT_SEED,
+                      base_date: date = DEFAULT_BASE_DATE, overwrite: bool = False,
+                      **counts: int) -> Dict[str, int]:
+    """Cria em db_path um banco com a escala pedida; counts sobrepõe quantidades de SCALES.
+
+    Levanta FileExistsError se o arquivo já existir e overwrite for False.
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Escala desconhecida: '{scale}' (use {', '.join(SCALES)})")
+    unknown = set(counts) - set(SCALES[scale])
+    if unknown:
+        raise ValueError(f"Tabelas desconhecidas: {', '.join(sorted(unknown))}")
+    if os.path.exists(db_path):
+        if not overwrite:
+            raise FileExistsError(f"O banco {db_path} já existe (use overwrite/--overwrite para substituí-lo)")
+        remove_database(db_path)
+
+    db_manager = DatabaseManager(db_path=db_path, cache_size=0)
+    if not db_manager.conn:
+        raise ConnectionError(f"Não foi possível abrir o banco de dados: {db_path}")
+    try:
+        generator = DatasetGenerator(db_manager, seed=seed, base_date=base_date)
+        return generator.generate({**SCALES[scale], **counts})
+    finally:
+        db_manager.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gera um banco da agenda com dados sintéticos para testes de carga.")
+    parser.add_argument("--output", default=os.path.join("data", "carga.db"), help="arquivo do banco a criar")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--base-date", type=date.fromisoformat, default=DEFAULT_BASE_DATE,
+                        help="data central dos eventos e tarefas (AAAA-MM-DD)")
+    parser.add_argument("--overwrite", action="store_true", help="substitui o banco se ele já existir")
+    for table in SCALES['small']:
+        parser.add_argument(f"--{table.replace('_', '-')}", dest=table, type=int,
+                            help=f"quantidade de {table} (sobrepõe a escala)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    counts = {table: getattr(args, table) for table in SCALES['small'] if getattr(args, table) is not None}
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    try:
+        created = generate_database(args.output, scale=args.scale, seed=args.seed, base_date=args.base_date,
+                                    overwrite=args.overwrite, **counts)
+    except (FileExistsError, ConnectionError) as e:
+        logger.error(f"Erro: {e}")
+        return 1
+    logger.info(f"Banco gerado em {args.output} ({sum(created.values())} linhas, "
+                f"{time.perf_counter() - start:.1f} s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
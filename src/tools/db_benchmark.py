@@ -0,0 +1,286 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.database_manager import DatabaseManager
+from src.core.models import QuizAttempt
+from src.tools.dataset_generator import (SCALES, DEFAULT_SEED, DEFAULT_BASE_DATE, DATE_SPAN_DAYS,
+                                         GENERATOR_VERSION, generate_database, remove_database)
+
+# Benchmarks dos caminhos mais usados do DatabaseManager sobre bancos gerados por
+# dataset_generator, em várias escalas. Para cada operação são medidos mediana e p95
+# da latência, vazão (operações/s) e pico de memória alocada pelo Python (tracemalloc,
+# que não vê a memória interna do SQLite; numa execução separada para não distorcer os tempos). O resultado vai para um JSON
+# que pode ser comparado com o de outro commit (--compare).
+#
+# Uso:
+#   python -m src.tools.db_benchmark --scales small medium --output benchmark_atual.json
+#   python -m src.tools.db_benchmark --scales medium --compare benchmark_anterior.json
+
+logger = logging.getLogger("agenda.tools")
+
+DEFAULT_DATA_DIR = os.path.join("data", "benchmarks")
+DEFAULT_ITERATIONS = 30
+
+
+class BenchmarkContext:
+    """Estado compartilhado pelas operações de uma escala: banco aberto e ids sorteados."""
+
+    def __init__(self, db_path: str, seed: int):
+        self.db_path = db_path
+        self.rng = random.Random(f"{seed}:benchmark")
+        self.db_manager = DatabaseManager(db_path=db_path)
+        if not self.db_manager.conn:
+            raise ConnectionError(f"Não foi possível abrir o banco de dados: {db_path}")
+        cursor = self.db_manager.conn.cursor()
+        self.event_ids = [row[0] for row in cursor.execute("SELECT id FROM Events")]
+        self.quiz_configs = self.db_manager.get_all_quiz_configs()
+        questions = self.db_manager.get_questions_by_ids(
+            {question_id for quiz_config in self.quiz_configs for question_id in quiz_config.question_ids})[0]
+        self.questions_by_id = {question.id: question for question in questions}
+
+    def close(self):
+        self.db_manager.close()
+
+    def random_date(self):
+        return DEFAULT_BASE_DATE + timedelta(days=self.rng.randrange(-DATE_SPAN_DAYS, DATE_SPAN_DAYS))
+
+    def random_attempt(self) -> QuizAttempt:
+        quiz_config = self.rng.choice(self.quiz_configs)
+        user_answers = {}
+        for question_id in quiz_config.question_ids:
+            question = self.questions_by_id[question_id]
+            user_answers[question_id] = self.rng.choice(question.options) if question.options else question.answer
+        score = sum(answer == self.questions_by_id[question_id].answer for question_id, answer in user_answers.items())
+        return QuizAttempt(quiz_config_id=quiz_config.id, user_answers=user_answers, score=score,
+                           total_questions=len(user_answers))
+
+
+def _open_fresh_manager(db_path: str):
+    """Abre (e fecha) um DatabaseManager: conexão, PRAGMAs e verificação das migrações."""
+    DatabaseManager(db_path=db_path).close()
+
+
+def _create_empty_database(_context: BenchmarkContext):
+    """Cria um banco vazio do zero, aplicando todas as migrações."""
+    directory = tempfile.mkdtemp(prefix="agenda-bench-")
+    try:
+        _open_fresh_manager(os.path.join(directory, "vazio.db"))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# Operações medidas: nome -> função que recebe o contexto e faz uma chamada.
+# Cada função sorteia seus argumentos com o rng do contexto (mesmo seed, mesma sequência).
+OPERATIONS: Dict[str, Callable[[BenchmarkContext], Any]] = {
+    'get_events_by_date': lambda context: context.db_manager.get_events_by_date(context.random_date()),
+    'get_all_questions': lambda context: context.db_manager.get_all_questions(),
+    'get_all_tasks': lambda context: context.db_manager.get_all_tasks(),
+    'get_entities_for_event': lambda context: context.db_manager.get_entities_for_event(
+        context.rng.choice(context.event_ids)),
+    'add_quiz_attempt': lambda context: context.db_manager.add_quiz_attempt(context.random_attempt()),
+    # Inicialização: abrir um banco já populado (_connect + _create_tables sem migrações pendentes)
+    'startup_existing': lambda context: _open_fresh_manager(context.db_path),
+    # Inicialização: criar o esquema inteiro num arquivo novo
+    'startup_new_database': _create_empty_database,
+}
+# Operações lentas demais para repetir tantas vezes quanto as consultas pontuais
+FULL_LOAD_OPERATIONS = {'get_all_questions', 'get_all_tasks'}
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Percentil por interpolação linear (como statistics.quantiles, método 'inclusive')."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize_durations(durations: List[float]) -> Dict[str, Any]:
+    """Mediana, p95, mínimo e máximo (em ms) de uma lista de durações em segundos."""
+    durations = sorted(durations)
+    return {
+        'iterations': len(durations),
+        'median_ms': round(statistics.median(durations) * 1000, 4),
+        'p95_ms': round(_percentile(durations, 0.95) * 1000, 4),
+        'min_ms': round(durations[0] * 1000, 4),
+        'max_ms': round(durations[-1] * 1000, 4),
+    }
+
+
+def measure(operation: Callable[[BenchmarkContext], Any], context: BenchmarkContext,
+            iterations: int) -> Dict[str, Any]:
+    """Executa a operação iterations vezes (após um aquecimento) e resume os tempos."""
+    operation(context) # Aquecimento: cache de páginas do SQLite, instruções preparadas
+
+    durations: List[float] = []
+    total_start = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation(context)
+        durations.append(time.perf_counter() - start)
+    total = time.perf_counter() - total_start
+
+    # Pico de memória numa execução à parte: o tracemalloc deixa o Python bem mais lento
+    tracemalloc.start()
+    try:
+        operation(context)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        **summarize_durations(durations),
+        'throughput_ops_s': round(iterations / total, 2) if total > 0 else None,
+        'peak_memory_kib': round(peak_bytes / 1024, 1),
+    }
+
+
+def prepare_database(scale: str, seed: int, data_dir: str) -> str:
+    """Caminho de um banco gerado para a escala, criado na primeira vez e reaproveitado depois.
+
+    O nome leva a versão do esquema e a do gerador: um banco gerado antes de uma migração
+    ou de uma mudança no gerador não é reaproveitado.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    db_path = os.path.join(
+        data_dir, f"{scale}-seed{seed}-schema{DatabaseManager.SCHEMA_VERSION}-gen{GENERATOR_VERSION}.db")
+    if not os.path.exists(db_path):
+        logger.info(f"Gerando banco '{scale}' em {db_path}...")
+        try:
+            generate_database(db_path, scale=scale, seed=seed)
+        except Exception:
+            remove_database(db_path) # Não deixar um banco pela metade para as próximas execuções
+            raise
+    return db_path
+
+
+def run_scale(scale: str, seed: int, data_dir: str, iterations: int,
+              operations: List[str]) -> List[Dict[str, Any]]:
+    """Mede as operações sobre uma cópia do banco da escala (as escritas não alteram o original)."""
+    source_path = prepare_database(scale, seed, data_dir)
+    work_dir = tempfile.mkdtemp(prefix="agenda-bench-")
+    work_path = os.path.join(work_dir, os.path.basename(source_path))
+    results = []
+    try:
+        shutil.copyfile(source_path, work_path)
+        context = BenchmarkContext(work_path, seed)
+        try:
+            for name in operations:
+                operation_iterations = max(3, iterations // 5) if name in FULL_LOAD_OPERATIONS else iterations
+                logger.info(f"[{scale}] {name} ({operation_iterations} iterações)...")
+                result = measure(OPERATIONS[name], context, operation_iterations)
+                results.append({'scale': scale, 'operation': name, **result})
+        finally:
+            context.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_metadata(scales: List[str], seed: int, iterations: int) -> Dict[str, Any]:
+    """Dados da execução gravados junto dos resultados, para comparar execuções."""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': seed,
+        'schema_version': DatabaseManager.SCHEMA_VERSION,
+        'generator_version': GENERATOR_VERSION,
+        'iterations': iterations,
+        'scales': {scale: SCALES[scale] for scale in scales},
+    }
+
+
+def run_benchmarks(scales: List[str], seed: int = DEFAULT_SEED, data_dir: str = DEFAULT_DATA_DIR,
+                   iterations: int = DEFAULT_ITERATIONS, operations: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Executa os benchmarks e devolve o documento gravado em JSON (metadados + resultados)."""
+    operations = operations or list(OPERATIONS)
+    results = []
+    for scale in scales:
+        results.extend(run_scale(scale, seed, data_dir, iterations, operations))
+    return {'metadata': benchmark_metadata(scales, seed, iterations), 'results': results}
+
+
+def format_results(document: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Tabela de texto dos resultados; com baseline, inclui a razão entre as medianas."""
+    baseline_medians = {}
+    if baseline:
+        baseline_medians = {(result['scale'], result['operation']): result['median_ms']
+                            for result in baseline.get('results', [])}
+    header = f"{'escala':<8} {'operação':<24} {'mediana ms':>11} {'p95 ms':>10} {'ops/s':>10} {'pico KiB':>10}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    lines = [header, "-" * len(header)]
+    for result in document['results']:
+        line = (f"{result['scale']:<8} {result['operation']:<24} {result['median_ms']:>11.3f} "
+                f"{result['p95_ms']:>10.3f} {result['throughput_ops_s'] or 0:>10.1f} {result['peak_memory_kib']:>10.1f}")
+        if baseline:
+            base_median = baseline_medians.get((result['scale'], result['operation']))
+            line += f" {result['median_ms'] / base_median:>7.2f}x" if base_median else f" {'-':>8}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos principais do DatabaseManager.")
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=["small", "medium"])
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS), default=None,
+                        help="operações a medir (padrão: todas)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="onde guardar os bancos gerados")
+    parser.add_argument("--output", default=os.path.join(DEFAULT_DATA_DIR, "db_benchmark.json"),
+                        help="arquivo JSON com os resultados")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar as medianas")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Erro ao ler {args.compare}: {e}")
+            return 1
+
+    document = run_benchmarks(args.scales, seed=args.seed, data_dir=args.data_dir,
+                              iterations=max(1, args.iterations), operations=args.operations)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    print(format_results(document, baseline))
+    logger.info(f"Resultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
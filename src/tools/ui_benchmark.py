@@ -0,0 +1,373 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from PyQt6.QtCore import QDate
+from PyQt6.QtWidgets import QApplication, QWidget
+
+from src.core.database_manager import DatabaseManager
+from src.tools.dataset_generator import SCALES, DEFAULT_SEED, DEFAULT_BASE_DATE
+from src.tools.db_benchmark import (DEFAULT_DATA_DIR, prepare_database, summarize_durations,
+                                    benchmark_metadata)
+from src.ui.db_worker import AsyncDbRunner
+from src.ui.agenda_view import AgendaView
+from src.ui.entities_view import EntitiesView
+from src.ui.questions_view import QuestionsView
+from src.ui.quiz_config_view import QuizConfigView
+from src.ui.tasks_view import TasksView
+
+# Benchmark das views sem janela (QT_QPA_PLATFORM=offscreen) sobre bancos gerados por
+# dataset_generator. Para cada view são medidos:
+#   construct       criação do widget (parte síncrona, na thread da GUI)
+#   first_load      da criação até os dados estarem na tela
+#   reload          recarga completa (o método _load_* / _refresh_* da view)
+#   <interação>     cada tecla digitada ou troca de filtro, até o resultado ser exibido
+# além da quantidade de widgets filhos e de itens exibidos. O JSON de saída tem o
+# mesmo formato de metadados de db_benchmark e pode ser comparado com --compare.
+#
+# Uso:
+#   python -m src.tools.ui_benchmark --scales medium large --output ui_atual.json
+
+logger = logging.getLogger("agenda.tools")
+
+DEFAULT_ITERATIONS = 5
+# Tempo máximo de espera por uma carga em segundo plano
+WAIT_TIMEOUT_S = 120.0
+
+
+class UiBenchmarkContext:
+    """Aplicação Qt, conexão da GUI e AsyncDbRunner compartilhado pelas views (como na MainWindow)."""
+
+    def __init__(self, app: QApplication, db_path: str, iterations: int):
+        self.app = app
+        self.iterations = iterations
+        self.db_manager = DatabaseManager(db_path=db_path)
+        if not self.db_manager.conn:
+            raise ConnectionError(f"Não foi possível abrir o banco de dados: {db_path}")
+        self.db_runner = AsyncDbRunner(db_path)
+
+    def close(self):
+        self.db_runner.close()
+        self.app.processEvents()
+        self.db_manager.close()
+
+    def wait_until(self, predicate: Callable[[], bool], timeout_s: float = WAIT_TIMEOUT_S):
+        """Processa eventos até predicate() ser verdadeiro (resultados das threads chegam como eventos)."""
+        deadline = time.perf_counter() + timeout_s
+        while True:
+            self.app.processEvents()
+            if predicate():
+                return
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"A view não terminou de carregar em {timeout_s:.0f} s")
+            time.sleep(0.0005) # Cede o GIL às threads de consulta
+
+
+class ViewBenchmark(ABC):
+    """Como criar, recarregar e interagir com uma view; subclasses para cada view medida."""
+    name = ""
+
+    @abstractmethod
+    def create(self, context: UiBenchmarkContext) -> QWidget:
+        """Constrói a view com o banco e o AsyncDbRunner do contexto."""
+
+    def is_idle(self, view: QWidget) -> bool:
+        """True quando não há carga em andamento e o resultado já foi exibido."""
+        return not view.db_runner.is_busy()
+
+    def prepare(self, context: UiBenchmarkContext, view: QWidget):
+        """Ajustes fora da medição, antes de recarregar e interagir (ex.: ir para um mês com dados)."""
+
+    @abstractmethod
+    def reload(self, view: QWidget):
+        """Dispara a recarga completa da view."""
+
+    @abstractmethod
+    def item_count(self, view: QWidget) -> int:
+        """Quantidade de itens exibidos pela view."""
+
+    def interactions(self, view: QWidget) -> Dict[str, List[Callable[[], None]]]:
+        """Passos de interação por métrica; cada passo é medido até a view ficar ociosa."""
+        return {}
+
+
+class QuestionsViewBenchmark(ViewBenchmark):
+    name = "QuestionsView"
+    SEARCH_TEXT = "energia"
+    SUBJECT_TEXT = "Matem"
+
+    def __init__(self):
+        self._resets = 0
+        self._expected_resets = 0
+
+    def create(self, context: UiBenchmarkContext) -> QWidget:
+        # Sem espera entre teclas: cada tecla dispara (e é medida até) a sua consulta
+        view = QuestionsView(context.db_manager, db_runner=context.db_runner, filter_delay_ms=0)
+        # A primeira página chega depois do construtor, pelo db_runner
+        self._resets, self._expected_resets = 0, 1
+        view.questions_model.modelReset.connect(self._on_model_reset)
+        return view
+
+    def _on_model_reset(self):
+        self._resets += 1
+
+    def is_idle(self, view: QWidget) -> bool:
+        return self._resets >= self._expected_resets and not view.is_loading()
+
+    def reload(self, view: QWidget):
+        self._expected_resets = self._resets + 1
+        view._load_questions()
+
+    def item_count(self, view: QWidget) -> int:
+        return view.questions_model.rowCount()
+
+    def _type_into(self, line_edit, text: str) -> List[Callable[[], None]]:
+        def keystroke(character: str):
+            self._expected_resets = self._resets + 1
+            line_edit.insert(character)
+        steps = [lambda character=character: keystroke(character) for character in text]
+
+        def clear():
+            self._expected_resets = self._resets + 1
+            line_edit.clear()
+        return steps + [clear]
+
+    def interactions(self, view: QWidget) -> Dict[str, List[Callable[[], None]]]:
+        return {
+            'keystroke_search': self._type_into(view.search_edit, self.SEARCH_TEXT),
+            'keystroke_subject': self._type_into(view.subject_filter_edit, self.SUBJECT_TEXT),
+        }
+
+
+class TasksViewBenchmark(ViewBenchmark):
+    name = "TasksView"
+
+    def create(self, context: UiBenchmarkContext) -> QWidget:
+        return TasksView(context.db_manager, db_runner=context.db_runner)
+
+    def reload(self, view: QWidget):
+        view._load_tasks()
+
+    def item_count(self, view: QWidget) -> int:
+        return view.tasks_table.rowCount()
+
+    def interactions(self, view: QWidget) -> Dict[str, List[Callable[[], None]]]:
+        combo = view.status_filter_combo
+        indexes = list(range(1, combo.count())) + [0]
+        return {'status_change': [lambda index=index: combo.setCurrentIndex(index) for index in indexes]}
+
+
+class EntitiesViewBenchmark(ViewBenchmark):
+    name = "EntitiesView"
+
+    def create(self, context: UiBenchmarkContext) -> QWidget:
+        return EntitiesView(context.db_manager, db_runner=context.db_runner)
+
+    def reload(self, view: QWidget):
+        view._load_entities()
+
+    def item_count(self, view: QWidget) -> int:
+        return view.entities_table.rowCount()
+
+    def interactions(self, view: QWidget) -> Dict[str, List[Callable[[], None]]]:
+        combo = view.type_filter_combo
+        indexes = list(range(1, combo.count())) + [0]
+        return {'type_change': [lambda index=index: combo.setCurrentIndex(index) for index in indexes]}
+
+
+class QuizConfigViewBenchmark(ViewBenchmark):
+    name = "QuizConfigView"
+
+    def create(self, context: UiBenchmarkContext) -> QWidget:
+        return QuizConfigView(context.db_manager, db_runner=context.db_runner)
+
+    def reload(self, view: QWidget):
+        view._load_available_questions()
+
+    def item_count(self, view: QWidget) -> int:
+        return view.available_questions_table.rowCount()
+
+
+class AgendaViewBenchmark(ViewBenchmark):
+    name = "AgendaView"
+    # Dia com dados no banco gerado (a view abre no dia de hoje, que pode estar fora do período)
+    START_DATE = DEFAULT_BASE_DATE + timedelta(days=14)
+    # Meses à frente visitados na medição de meses que ainda não estão em memória
+    UNCACHED_MONTH_JUMPS = 3
+
+    def create(self, context: UiBenchmarkContext) -> QWidget:
+        return AgendaView(context.db_manager, db_runner=context.db_runner)
+
+    def is_idle(self, view: QWidget) -> bool:
+        # A lista está pronta quando o mês do dia selecionado está em memória; o pré-carregamento
+        # dos meses vizinhos continua em segundo plano, como para o usuário
+        selected_date = view.calendar.selectedDate().toPyDate()
+        key = (selected_date.year, selected_date.month)
+        return key in view._month_events and not view.db_runner.is_busy(view._month_channel(key))
+
+    def prepare(self, context: UiBenchmarkContext, view: QWidget):
+        view.calendar.setSelectedDate(QDate(self.START_DATE.year, self.START_DATE.month, self.START_DATE.day))
+        context.wait_until(lambda: not view.db_runner.is_busy())
+
+    def reload(self, view: QWidget):
+        view._refresh_event_list_for_selected_date()
+
+    def item_count(self, view: QWidget) -> int:
+        return view.events_list.count()
+
+    def interactions(self, view: QWidget) -> Dict[str, List[Callable[[], None]]]:
+        calendar = view.calendar
+        start = QDate(self.START_DATE.year, self.START_DATE.month, 1)
+        # Dias do mês já carregado: a lista é montada a partir do cache de meses
+        cached_days = [lambda day=day: calendar.setSelectedDate(start.addDays(day))
+                       for day in range(start.daysInMonth())]
+        # Saltos de dois meses: o mês de destino ainda não foi carregado nem pré-carregado
+        uncached_months = [lambda jump=jump: calendar.setSelectedDate(start.addMonths(2 * jump))
+                           for jump in range(1, self.UNCACHED_MONTH_JUMPS + 1)]
+        return {'date_change_cached': cached_days, 'date_change_uncached': uncached_months}
+
+
+VIEW_BENCHMARKS: Dict[str, Callable[[], ViewBenchmark]] = {
+    benchmark.name: benchmark for benchmark in (QuestionsViewBenchmark, TasksViewBenchmark, EntitiesViewBenchmark,
+                                                QuizConfigViewBenchmark, AgendaViewBenchmark)
+}
+
+
+def _destroy(context: UiBenchmarkContext, view: QWidget):
+    context.wait_until(lambda: not context.db_runner.is_busy())
+    view.deleteLater()
+    context.app.processEvents()
+
+
+def run_view(context: UiBenchmarkContext, benchmark: ViewBenchmark) -> List[Dict[str, Any]]:
+    """Mede construção, primeira carga, recarga e interações de uma view."""
+    timings: Dict[str, List[float]] = {'construct': [], 'first_load': [], 'reload': []}
+    view = None
+    for iteration in range(context.iterations):
+        start = time.perf_counter()
+        view = benchmark.create(context)
+        constructed = time.perf_counter()
+        context.wait_until(lambda: benchmark.is_idle(view))
+        timings['construct'].append(constructed - start)
+        timings['first_load'].append(time.perf_counter() - start)
+        if iteration < context.iterations - 1:
+            _destroy(context, view)
+
+    benchmark.prepare(context, view)
+    for _ in range(context.iterations):
+        start = time.perf_counter()
+        benchmark.reload(view)
+        context.wait_until(lambda: benchmark.is_idle(view))
+        timings['reload'].append(time.perf_counter() - start)
+    counts = {'widgets': len(view.findChildren(QWidget)), 'items': benchmark.item_count(view)}
+
+    for metric, steps in benchmark.interactions(view).items():
+        timings[metric] = []
+        for step in steps:
+            start = time.perf_counter()
+            step()
+            context.wait_until(lambda: benchmark.is_idle(view))
+            timings[metric].append(time.perf_counter() - start)
+    _destroy(context, view)
+
+    return [{'view': benchmark.name, 'metric': metric, **summarize_durations(durations), **counts}
+            for metric, durations in timings.items() if durations]
+
+
+def run_scale(app: QApplication, scale: str, seed: int, data_dir: str, iterations: int,
+              views: List[str]) -> List[Dict[str, Any]]:
+    """Mede as views sobre uma cópia do banco da escala (a abertura grava a janela de ocorrências)."""
+    source_path = prepare_database(scale, seed, data_dir)
+    work_dir = tempfile.mkdtemp(prefix="agenda-ui-bench-")
+    results = []
+    try:
+        work_path = os.path.join(work_dir, os.path.basename(source_path))
+        shutil.copyfile(source_path, work_path)
+        context = UiBenchmarkContext(app, work_path, iterations)
+        try:
+            for name in views:
+                logger.info(f"[{scale}] {name}...")
+                results.extend({'scale': scale, **result} for result in run_view(context, VIEW_BENCHMARKS[name]()))
+        finally:
+            context.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def format_results(document: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """Tabela de texto dos resultados; com baseline, inclui a razão entre as medianas."""
+    baseline_medians = {}
+    if baseline:
+        baseline_medians = {(result['scale'], result['view'], result['metric']): result['median_ms']
+                            for result in baseline.get('results', [])}
+    header = (f"{'escala':<8} {'view':<16} {'métrica':<22} {'mediana ms':>11} {'p95 ms':>10} "
+              f"{'widgets':>8} {'itens':>8}")
+    if baseline:
+        header += f" {'vs base':>8}"
+    lines = [header, "-" * len(header)]
+    for result in document['results']:
+        line = (f"{result['scale']:<8} {result['view']:<16} {result['metric']:<22} {result['median_ms']:>11.3f} "
+                f"{result['p95_ms']:>10.3f} {result['widgets']:>8} {result['items']:>8}")
+        if baseline:
+            base_median = baseline_medians.get((result['scale'], result['view'], result['metric']))
+            line += f" {result['median_ms'] / base_median:>7.2f}x" if base_median else f" {'-':>8}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark das views da agenda, sem janela (offscreen).")
+    parser.add_argument("--scales", nargs="+", choices=sorted(SCALES), default=["medium"])
+    parser.add_argument("--views", nargs="+", choices=list(VIEW_BENCHMARKS), default=None,
+                        help="views a medir (padrão: todas)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="onde guardar os bancos gerados")
+    parser.add_argument("--output", default=os.path.join(DEFAULT_DATA_DIR, "ui_benchmark.json"),
+                        help="arquivo JSON com os resultados")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar as medianas")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Erro ao ler {args.compare}: {e}")
+            return 1
+
+    # Sem janela: precisa ser definido antes de criar a QApplication
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    iterations = max(1, args.iterations)
+    views = args.views or list(VIEW_BENCHMARKS)
+    results = []
+    for scale in args.scales:
+        results.extend(run_scale(app, scale, args.seed, args.data_dir, iterations, views))
+    document = {'metadata': {**benchmark_metadata(args.scales, args.seed, iterations),
+                             'qt_platform': app.platformName()},
+                'results': results}
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+    print(format_results(document, baseline))
+    logger.info(f"Resultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
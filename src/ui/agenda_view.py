@@ -1,23 +1,56 @@
 import sys
-from typing import Optional  # Adicionado Dict
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple  # Adicionado Dict
 
 from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QCalendarWidget, QListWidget,
+    QWidget, QVBoxLayout, QHBoxLayout, QListWidget,
     QListWidgetItem, QLabel, QSplitter, QPushButton, QMessageBox,
     QScrollArea, QFormLayout, QDialog  # Adicionado QScrollArea, QFormLayout and QDialog
 )
 
 from src.core.database_manager import DatabaseManager
+from src.core.models import Event, Entity
 from src.ui.event_dialog import EventDialog
+from src.ui.db_worker import AsyncDbRunner, BusyIndicator
+from src.ui.event_calendar_widget import EventDensityCalendar
+
+
+# Evento (ou ocorrência) com as entidades vinculadas e seus papéis
+EventEntry = Tuple[Event, List[Tuple[Entity, str]]]
 
 
 class AgendaView(QWidget):
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    # Prefixo dos canais de carga de cada mês no AsyncDbRunner (um canal por mês, para que
+    # o pré-carregamento dos vizinhos não torne obsoleta a carga do mês selecionado)
+    MONTH_CHANNEL_PREFIX = "agenda_view.month"
+    # Prefixo dos canais das contagens de eventos por dia (também um canal por mês: na
+    # navegação rápida pelo calendário, a contagem de um mês não descarta a de outro)
+    COUNTS_CHANNEL_PREFIX = "agenda_view.counts"
+    # Quantos meses de eventos ficam em memória (os usados há mais tempo saem primeiro)
+    MONTH_CACHE_SIZE = 6
+
+    def __init__(self, db_manager: DatabaseManager, db_runner: Optional[AsyncDbRunner] = None, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        # A lista de eventos do dia é consultada fora da thread da GUI
+        self.db_runner = db_runner or AsyncDbRunner(db_manager.db_path, parent=self)
         self.current_selected_event_id: Optional[int] = None
+        # Contagens de eventos por dia, por mês (ano, mês); invalidadas quando eventos do mês mudam
+        self._month_counts: Dict[Tuple[int, int], Dict[date, int]] = {}
+        # Eventos (com entidades) por dia, por mês; a navegação e a seleção são servidas daqui
+        self._month_events: "OrderedDict[Tuple[int, int], Dict[date, List[EventEntry]]]" = OrderedDict()
+        self._pending_months: set = set()
+        # Incrementada ao invalidar o cache: cargas iniciadas antes disso são descartadas
+        self._month_events_generation = 0
+        # Idem para as contagens: só _invalidate_months as torna obsoletas
+        self._month_counts_generation = 0
+        # Evento a selecionar quando o mês do dia selecionado terminar de carregar
+        self._select_event_id_on_load: Optional[int] = None
+        # Eventos do dia exibido na lista, por ID, para os detalhes
+        self._day_entries: Dict[int, EventEntry] = {}
 
         main_layout = QHBoxLayout(self)
         main_layout.setContentsMargins(10, 10, 10, 10) 
@@ -29,9 +62,10 @@ class AgendaView(QWidget):
         left_v_layout.setContentsMargins(0,0,0,0)
         left_v_layout.setSpacing(10)
 
-        self.calendar = QCalendarWidget()
+        self.calendar = EventDensityCalendar()
         self.calendar.setGridVisible(True)
         self.calendar.selectionChanged.connect(self._on_date_selected)
+        self.calendar.currentPageChanged.connect(self._load_month_counts)
         left_v_layout.addWidget(self.calendar)
 
         action_buttons_layout = QHBoxLayout()
@@ -51,6 +85,9 @@ class AgendaView(QWidget):
         
         left_v_layout.addLayout(action_buttons_layout)
 
+        self.busy_indicator = BusyIndicator(self.db_runner, [])
+        left_v_layout.addWidget(self.busy_indicator)
+
         self.events_list = QListWidget()
         self.events_list.currentItemChanged.connect(self._on_event_selected)
         self.events_list.setStyleSheet("QListWidget::item { padding: 5px; }")
@@ -115,6 +152,7 @@ class AgendaView(QWidget):
         main_layout.addWidget(splitter)
 
         self._clear_details_labels() # Limpa os labels inicialmente
+        self._load_month_counts(self.calendar.yearShown(), self.calendar.monthShown())
         self._on_date_selected() 
 
     def _clear_details_labels(self):
@@ -130,16 +168,105 @@ class AgendaView(QWidget):
         self.event_details_widget.setToolTip("Selecione um evento para ver os detalhes.")
 
 
+    @staticmethod
+    def _month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+        """Intervalo semiaberto [início do mês, início do mês seguinte)."""
+        month_start = datetime(year, month, 1)
+        month_end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return month_start, month_end
+
+    @staticmethod
+    def _neighbour_months(key: Tuple[int, int]) -> List[Tuple[int, int]]:
+        year, month = key
+        previous_month = (year - 1, 12) if month == 1 else (year, month - 1)
+        next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return [previous_month, next_month]
+
+    def _month_channel(self, key: Tuple[int, int]) -> str:
+        return f"{self.MONTH_CHANNEL_PREFIX}.{key[0]}-{key[1]:02d}"
+
+    def _counts_channel(self, key: Tuple[int, int]) -> str:
+        return f"{self.COUNTS_CHANNEL_PREFIX}.{key[0]}-{key[1]:02d}"
+
+    def _update_busy_channels(self):
+        """O indicador acompanha as contagens do mês exibido e os eventos do mês selecionado."""
+        selected_date = self.calendar.selectedDate().toPyDate()
+        shown_key = (self.calendar.yearShown(), self.calendar.monthShown())
+        self.busy_indicator.set_channels([self._counts_channel(shown_key),
+                                          self._month_channel((selected_date.year, selected_date.month))])
+
+    def _request_month(self, key: Tuple[int, int]):
+        """Carrega em segundo plano os eventos (com entidades) do mês, se ainda não estão em memória."""
+        if key in self._month_events or key in self._pending_months:
+            return
+        self._pending_months.add(key)
+        generation = self._month_events_generation
+        month_start, month_end = self._month_range(*key)
+        self.db_runner.submit("get_events_with_entities_in_range", month_start, month_end,
+                              channel=self._month_channel(key),
+                              on_result=lambda entries: self._on_month_loaded(key, generation, entries),
+                              on_error=lambda message: self._on_month_load_error(key, generation, message))
+
+    def _on_month_loaded(self, key: Tuple[int, int], generation: int, entries: List[EventEntry]):
+        if generation != self._month_events_generation:
+            return # Carga iniciada antes de uma invalidação: o mês será pedido de novo
+        self._pending_months.discard(key)
+
+        events_by_day: Dict[date, List[EventEntry]] = {}
+        for event_obj, linked_entities in entries:
+            events_by_day.setdefault(event_obj.start_time.date(), []).append((event_obj, linked_entities))
+        self._month_events[key] = events_by_day
+        while len(self._month_events) > self.MONTH_CACHE_SIZE:
+            self._month_events.popitem(last=False)
+
+        selected_date = self.calendar.selectedDate().toPyDate()
+        if key == (selected_date.year, selected_date.month):
+            self._populate_event_list(events_by_day.get(selected_date, []), self._select_event_id_on_load)
+            self._prefetch_neighbour_months(key)
+
+    def _on_month_load_error(self, key: Tuple[int, int], generation: int, message: str):
+        if generation != self._month_events_generation:
+            return
+        self._pending_months.discard(key)
+        selected_date = self.calendar.selectedDate().toPyDate()
+        if key == (selected_date.year, selected_date.month):
+            QMessageBox.critical(self, "Erro", f"Falha ao carregar os eventos: {message}")
+
+    def _prefetch_neighbour_months(self, key: Tuple[int, int]):
+        """Pré-carrega os meses anterior e seguinte, para a navegação pelo calendário vir da memória."""
+        for neighbour in self._neighbour_months(key):
+            self._request_month(neighbour)
+
     def _refresh_event_list_for_selected_date(self):
-        """Atualiza a lista de eventos para a data atualmente selecionada no calendário."""
+        """Atualiza a lista de eventos para a data selecionada no calendário.
+
+        Com o mês em memória a lista é montada na hora; caso contrário, o mês é carregado
+        em segundo plano e a lista é montada quando ele chegar.
+        """
         selected_qdate = self.calendar.selectedDate()
         selected_date = selected_qdate.toPyDate()
-        
+        key = (selected_date.year, selected_date.month)
+
+        # O evento a manter selecionado é capturado agora: limpar a lista dispara
+        # _on_event_selected, que zera current_selected_event_id.
+        self._select_event_id_on_load = self.current_selected_event_id
+        self._update_busy_channels()
+
+        events_by_day = self._month_events.get(key)
+        if events_by_day is None:
+            self._request_month(key)
+            return
+        self._month_events.move_to_end(key)
+        self._populate_event_list(events_by_day.get(selected_date, []), self._select_event_id_on_load)
+        self._prefetch_neighbour_months(key)
+
+    def _populate_event_list(self, entries: List[EventEntry], select_event_id: Optional[int] = None):
+        self._day_entries = {event_obj.id: (event_obj, linked_entities) for event_obj, linked_entities in entries}
+        events = [event_obj for event_obj, _ in entries]
         self.events_list.clear()
         # Não limpa os detalhes aqui, pois pode ser chamado após uma edição/deleção
         # e queremos manter o contexto ou limpá-lo seletivamente.
-
-        events = self.db_manager.get_events_by_date(selected_date)
+        self.current_selected_event_id = select_event_id
 
         if not events:
             item = QListWidgetItem("Nenhum evento para esta data.")
@@ -180,6 +307,65 @@ class AgendaView(QWidget):
                  self.events_list.setCurrentRow(0)
 
 
+    def _load_month_counts(self, year: int, month: int):
+        """Pinta no calendário as contagens por dia do mês exibido (uma consulta por mês, em cache)."""
+        key = (year, month)
+        self._update_busy_channels()
+        if key in self._month_counts:
+            self.calendar.set_day_counts(self._month_counts[key])
+            return
+
+        generation = self._month_counts_generation
+        month_start, month_end = self._month_range(year, month)
+        # Cada mês no seu canal: todo resultado que chega vai para o cache, mesmo que o
+        # calendário já esteja em outro mês
+        self.db_runner.submit("get_event_counts_by_day", month_start, month_end,
+                              channel=self._counts_channel(key),
+                              on_result=lambda counts: self._on_month_counts_loaded(key, generation, counts))
+
+    def _on_month_counts_loaded(self, key: Tuple[int, int], generation: int, counts: Dict[date, int]):
+        if generation != self._month_counts_generation:
+            return # Contagem iniciada antes de uma invalidação: o mês exibido já foi pedido de novo
+        self._month_counts[key] = counts
+        if key == (self.calendar.yearShown(), self.calendar.monthShown()):
+            self.calendar.set_day_counts(counts)
+
+    def _invalidate_months(self, *events):
+        """Descarta os meses em cache (contagens e eventos) afetados pelos eventos alterados.
+
+        Recarrega as contagens do mês exibido; a lista é recarregada pelo chamador, com
+        _refresh_event_list_for_selected_date.
+        """
+        # Vínculos com entidades também ficam em cache, então qualquer alteração
+        # descarta as cargas ainda em andamento
+        self._month_events_generation += 1
+        self._month_counts_generation += 1
+        self._pending_months.clear()
+        for event_obj in events:
+            if event_obj is None:
+                continue
+            if event_obj.recurrence_rule:
+                # Ocorrências podem cair em qualquer mês
+                self._month_counts.clear()
+                self._month_events.clear()
+                break
+            if event_obj.start_time:
+                key = (event_obj.start_time.year, event_obj.start_time.month)
+                self._month_counts.pop(key, None)
+                self._month_events.pop(key, None)
+        self._load_month_counts(self.calendar.yearShown(), self.calendar.monthShown())
+
+    def invalidate_entities(self):
+        """Descarta os eventos em cache após mudanças em entidades feitas fora desta view.
+
+        Os meses em memória guardam as entidades vinculadas a cada evento; as contagens
+        por dia não dependem delas e são mantidas.
+        """
+        self._month_events_generation += 1
+        self._pending_months.clear()
+        self._month_events.clear()
+        self._refresh_event_list_for_selected_date()
+
     def _on_date_selected(self):
         """Chamado quando a data no calendário é alterada."""
         self.current_selected_event_id = None # Reseta a seleção de evento ao mudar de data
@@ -205,7 +391,13 @@ class AgendaView(QWidget):
             # _clear_details_labels() já foi chamado no início.
             return
 
-        event_obj = self.db_manager.get_event_by_id(self.current_selected_event_id)
+        # Evento e participantes vêm do cache do mês; o banco só é consultado se faltarem
+        entry = self._day_entries.get(self.current_selected_event_id)
+        if entry:
+            event_obj, linked_entities = entry
+        else:
+            event_obj = self.db_manager.get_event_by_id(self.current_selected_event_id)
+            linked_entities = self.db_manager.get_entities_for_event(event_obj.id) if event_obj else [] # type: ignore
 
         if event_obj:
             self.edit_event_button.setEnabled(True)
@@ -227,7 +419,6 @@ class AgendaView(QWidget):
             self.detail_description_label.setText(event_obj.description or "-")
 
             # Mostrar entidades vinculadas
-            linked_entities = self.db_manager.get_entities_for_event(event_obj.id) # type: ignore
             if linked_entities:
                 participants_html = "" # Usar HTML para formatação de lista no QLabel
                 for entity, role in linked_entities:
@@ -248,34 +439,23 @@ class AgendaView(QWidget):
 
 
     def _add_event_dialog(self):
-        print("[AgendaView] _add_event_dialog called")
         # Passar db_manager para o EventDialog
         dialog = EventDialog(db_manager=self.db_manager, parent=self)
-        if dialog.exec() == QDialog.accepted: # Changed to QDialog.Accepted
-            print("[AgendaView] EventDialog accepted")
+        if dialog.exec() == QDialog.DialogCode.Accepted:
             # Acessar os dados salvos no diálogo
             event_data, selected_entities_map = dialog.event_data_to_save
-            print(f"[AgendaView] Received event_data: {event_data}")
-            print(f"[AgendaView] Received selected_entities_map: {selected_entities_map}")
             
             if event_data:
-                print(f"[AgendaView] Calling db_manager.add_event with: {event_data}")
-                new_event = self.db_manager.add_event(event_data)
-                print(f"[AgendaView] Result from add_event: {new_event}")
+                # Evento e associações são gravados numa única transação
+                new_event = self.db_manager.add_event(event_data, entity_roles=selected_entities_map)
                 if new_event and new_event.id:
-                    print(f"[AgendaView] Event added successfully (ID: {new_event.id}). Linking entities...")
-                    # Salvar associações
-                    for entity_id, role in selected_entities_map.items():
-                        print(f"[AgendaView] Calling db_manager.link_entity_to_event for event_id={new_event.id}, entity_id={entity_id}, role={role}")
-                        self.db_manager.link_entity_to_event(new_event.id, entity_id, role)
-                    
                     QMessageBox.information(self, "Sucesso", f"Evento '{new_event.title}' adicionado com ID: {new_event.id}.")
+                    self._invalidate_months(new_event)
                     if new_event.start_time:
                         self.calendar.setSelectedDate(QDate(new_event.start_time.year, new_event.start_time.month, new_event.start_time.day))
                     self.current_selected_event_id = new_event.id 
                     self._refresh_event_list_for_selected_date() 
                 else:
-                    print(f"[AgendaView] Failed to add event or event ID missing. new_event: {new_event}")
                     QMessageBox.critical(self, "Erro", "Falha ao adicionar o evento no banco de dados.")
     
     def _edit_event_dialog(self):
@@ -291,22 +471,15 @@ class AgendaView(QWidget):
 
         # Passar db_manager para o EventDialog
         dialog = EventDialog(db_manager=self.db_manager, event=event_to_edit, parent=self)
-        if dialog.exec() == QDialog.accepted: # Changed to QDialog.Accepted
+        if dialog.exec() == QDialog.DialogCode.Accepted:
             
             event_data, selected_entities_map = dialog.event_data_to_save
             
             if event_data and event_data.id is not None: 
-                if self.db_manager.update_event(event_data):
-                    # Atualizar associações:
-                    existing_linked_entities = self.db_manager.get_entities_for_event(event_data.id)
-                    for entity, _ in existing_linked_entities:
-                        if entity.id is not None:
-                             self.db_manager.unlink_entity_from_event(event_data.id, entity.id)
-                    
-                    for entity_id, role in selected_entities_map.items():
-                        self.db_manager.link_entity_to_event(event_data.id, entity_id, role)
-
+                # Atualiza o evento e aplica só as diferenças nas associações, numa única transação
+                if self.db_manager.update_event(event_data, entity_roles=selected_entities_map):
                     QMessageBox.information(self, "Sucesso", f"Evento '{event_data.title}' atualizado.")
+                    self._invalidate_months(event_to_edit, event_data)
                     if event_data.start_time:
                          self.calendar.setSelectedDate(QDate(event_data.start_time.year, event_data.start_time.month, event_data.start_time.day))
                     self.current_selected_event_id = event_data.id 
@@ -333,6 +506,7 @@ class AgendaView(QWidget):
         if reply == QMessageBox.StandardButton.Yes:
             if self.db_manager.delete_event(self.current_selected_event_id):
                 QMessageBox.information(self, "Sucesso", f"Evento '{event_to_delete.title}' excluído.")
+                self._invalidate_months(event_to_delete)
                 self.current_selected_event_id = None 
                 self._clear_details_labels()
                 self._refresh_event_list_for_selected_date() 
@@ -0,0 +1,194 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QProgressBar
+
+from src.core.database_manager import DatabaseManager
+
+logger = logging.getLogger("agenda.ui")
+
+# Conexões SQLite não podem ser compartilhadas entre threads: cada thread de trabalho
+# abre (uma única vez) o seu próprio DatabaseManager para o mesmo arquivo. O registro é
+# por identificador da thread, e não threading.local: as threads do QThreadPool não
+# guardam o estado Python entre uma execução e outra. Também permite que o
+# encerramento feche as conexões.
+_thread_managers: Dict[Tuple[int, str], DatabaseManager] = {}
+_thread_managers_lock = threading.Lock()
+
+
+def thread_database_manager(db_path: str) -> DatabaseManager:
+    """DatabaseManager exclusivo da thread atual para db_path, criado na primeira chamada."""
+    key = (threading.get_ident(), db_path)
+    with _thread_managers_lock:
+        db_manager = _thread_managers.get(key)
+    if db_manager is None or not db_manager.conn:
+        # Sem cache de objetos: os dados desta conexão não são invalidados pelas escritas da GUI.
+        # Esquema e janela de ocorrências ficam a cargo da conexão principal (run_startup=False)
+        db_manager = DatabaseManager(db_path=db_path, cache_size=0, check_same_thread=False,
+                                     run_startup=False)
+        with _thread_managers_lock:
+            _thread_managers[key] = db_manager
+    return db_manager
+
+
+def close_thread_database_managers(db_path: Optional[str] = None):
+    """Fecha os DatabaseManagers das threads de trabalho (todos, ou só os de db_path).
+
+    Só deve ser chamado sem consultas em andamento nesses bancos. Uma thread que voltar
+    a consultar abre um DatabaseManager novo.
+    """
+    with _thread_managers_lock:
+        keys = [key for key in _thread_managers if db_path is None or key[1] == db_path]
+        closing = [_thread_managers.pop(key) for key in keys]
+    for db_manager in closing:
+        db_manager.close()
+
+
+class DbWorkerSignals(QObject):
+    finished = pyqtSignal(int, object) # (geração, resultado)
+    failed = pyqtSignal(int, str)      # (geração, mensagem de erro)
+
+
+class DbWorker(QRunnable):
+    """Executa uma consulta ao banco em uma thread do QThreadPool.
+
+    task recebe o DatabaseManager da thread de trabalho e devolve o resultado, que é
+    entregue à GUI pelo sinal finished. A geração identifica a requisição, para que a
+    view possa descartar resultados que já ficaram obsoletos.
+    """
+
+    def __init__(self, db_path: str, task: Callable[[DatabaseManager], Any], generation: int = 0):
+        super().__init__()
+        self.db_path = db_path
+        self.task = task
+        self.generation = generation
+        self.signals = DbWorkerSignals()
+
+    def run(self):
+        try:
+            result = self.task(thread_database_manager(self.db_path))
+        except Exception as e:
+            logger.exception(f"Erro na consulta em segundo plano: {e}")
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, result)
+
+
+class AsyncDbRunner(QObject):
+    """Fachada assíncrona do DatabaseManager para as views.
+
+    submit("get_all_tasks", status="Open", on_result=...) executa o método em uma thread
+    do QThreadPool próprio do runner, com as conexões de trabalho de
+    thread_database_manager, e entrega o resultado ao callback na thread da GUI.
+
+    Cada requisição pertence a um canal (por padrão, o nome do método). Uma nova
+    requisição no mesmo canal torna obsoletas as anteriores: seus resultados são
+    descartados. busy_changed informa quando um canal passa a ter (ou deixa de ter)
+    requisições pendentes, para os indicadores de carregamento.
+    """
+    busy_changed = pyqtSignal(str, bool) # (canal, ocupado)
+
+    def __init__(self, db_path: str, max_threads: int = 2, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        # Mantém as threads (e suas conexões) vivas entre as requisições
+        self._pool.setExpiryTimeout(-1)
+        self._next_request_id = 0
+        self._requests: Dict[int, Tuple[str, Optional[Callable[[Any], None]], Optional[Callable[[str], None]]]] = {}
+        self._latest_request: Dict[str, int] = {}
+        self._pending: Dict[str, int] = {}
+
+    def submit(self, method_name: str, *args,
+               channel: Optional[str] = None,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[str], None]] = None,
+               **kwargs) -> int:
+        """Agenda db_manager.<method_name>(*args, **kwargs) e devolve o ID da requisição."""
+        if method_name.startswith('_') or not callable(getattr(DatabaseManager, method_name, None)):
+            raise ValueError(f"Método do DatabaseManager inválido: {method_name}")
+        channel = channel or method_name
+
+        self._next_request_id += 1
+        request_id = self._next_request_id
+        self._requests[request_id] = (channel, on_result, on_error)
+        self._latest_request[channel] = request_id
+        self._set_pending(channel, self._pending.get(channel, 0) + 1)
+
+        worker = DbWorker(self.db_path,
+                          lambda db_manager: getattr(db_manager, method_name)(*args, **kwargs),
+                          generation=request_id)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        self._pool.start(worker)
+        return request_id
+
+    def is_busy(self, channel: Optional[str] = None) -> bool:
+        if channel is None:
+            return any(self._pending.values())
+        return self._pending.get(channel, 0) > 0
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """Bloqueia até as requisições em andamento terminarem (uso em testes e no encerramento)."""
+        return self._pool.waitForDone(msecs)
+
+    def close(self):
+        """Espera as requisições em andamento e fecha as conexões das threads de trabalho."""
+        self._pool.waitForDone()
+        close_thread_database_managers(self.db_path)
+
+    def _set_pending(self, channel: str, count: int):
+        was_busy = self._pending.get(channel, 0) > 0
+        self._pending[channel] = count
+        if was_busy != (count > 0):
+            self.busy_changed.emit(channel, count > 0)
+
+    def _take_request(self, request_id: int):
+        """Remove a requisição concluída; devolve seus callbacks, ou None se ficou obsoleta."""
+        request = self._requests.pop(request_id, None)
+        if request is None:
+            return None
+        channel = request[0]
+        self._set_pending(channel, self._pending.get(channel, 1) - 1)
+        if self._latest_request.get(channel) != request_id:
+            return None
+        return request
+
+    def _on_finished(self, request_id: int, result: Any):
+        request = self._take_request(request_id)
+        if request and request[1]:
+            request[1](result)
+
+    def _on_failed(self, request_id: int, message: str):
+        request = self._take_request(request_id)
+        if request and request[2]:
+            request[2](message)
+
+
+class BusyIndicator(QProgressBar):
+    """Barra de progresso indeterminada, visível enquanto os canais observados têm consultas pendentes."""
+
+    def __init__(self, db_runner: AsyncDbRunner, channels: Iterable[str], parent=None):
+        super().__init__(parent)
+        self.db_runner = db_runner
+        self.channels = set(channels)
+        self.setRange(0, 0) # Modo indeterminado
+        self.setTextVisible(False)
+        self.setMaximumHeight(6)
+        self._update_visibility()
+        db_runner.busy_changed.connect(self._on_busy_changed)
+
+    def set_channels(self, channels: Iterable[str]):
+        """Troca os canais observados (ex.: quando o canal depende do que está na tela)."""
+        self.channels = set(channels)
+        self._update_visibility()
+
+    def _on_busy_changed(self, channel: str, busy: bool):
+        if channel in self.channels:
+            self._update_visibility()
+
+    def _update_visibility(self):
+        self.setVisible(any(self.db_runner.is_busy(channel) for channel in self.channels))
@@ -1,21 +1,35 @@
 import sys
 import json
+from datetime import datetime, timedelta
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QPushButton, QComboBox, QLabel, QMessageBox, QHeaderView, QDialog, QApplication
+    QPushButton, QComboBox, QLabel, QMessageBox, QHeaderView, QDialog, QApplication,
+    QSplitter, QListWidget, QListWidgetItem
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from src.core.database_manager import DatabaseManager
-from src.core.models import Entity
+from src.core.models import Entity, Event
 from src.ui.entity_dialog import EntityDialog # Importar o diálogo
+from src.ui.db_worker import AsyncDbRunner, BusyIndicator
 
 class EntitiesView(QWidget):
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    # Canal das consultas da lista no AsyncDbRunner
+    LOAD_CHANNEL = "entities_view.load"
+    # Canal das consultas da linha do tempo da entidade selecionada
+    TIMELINE_CHANNEL = "entities_view.timeline"
+    # Períodos da linha do tempo
+    TIMELINE_PERIODS = ["Semestre atual", "Próximos 30 dias", "Últimos 30 dias", "Todos"]
+    # Emitido quando uma entidade é editada ou excluída (outras views guardam entidades em cache)
+    entities_changed = pyqtSignal()
+
+    def __init__(self, db_manager: DatabaseManager, db_runner: Optional[AsyncDbRunner] = None, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        # As consultas da lista rodam fora da thread da GUI
+        self.db_runner = db_runner or AsyncDbRunner(db_manager.db_path, parent=self)
         self.current_selected_entity_id: Optional[int] = None
 
         main_layout = QVBoxLayout(self)
@@ -34,13 +48,18 @@ class EntitiesView(QWidget):
         # Popular com tipos existentes no DB? Poderia ser feito, mas para simplificar:
         self.type_filter_combo.addItems(["Professor", "Aluno", "Contato", "Outro"]) # Tipos comuns
         self.type_filter_combo.setEditable(True) # Permitir digitar outros tipos
-        self.type_filter_combo.currentIndexChanged.connect(self._load_entities)
-        self.type_filter_combo.lineEdit().editingFinished.connect(self._load_entities) # Para quando edita e pressiona Enter
+        self.type_filter_combo.currentIndexChanged.connect(lambda: self._load_entities())
+        self.type_filter_combo.lineEdit().editingFinished.connect(lambda: self._load_entities()) # Para quando edita e pressiona Enter
 
         filter_layout.addWidget(self.type_filter_combo)
         filter_layout.addStretch()
         main_layout.addLayout(filter_layout)
 
+        self.busy_indicator = BusyIndicator(self.db_runner, [self.LOAD_CHANNEL, self.TIMELINE_CHANNEL])
+        main_layout.addWidget(self.busy_indicator)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+
         # Tabela de Entidades
         self.entities_table = QTableWidget()
         self.entities_table.setColumnCount(3) # Nome, Tipo, Detalhes JSON
@@ -55,7 +74,33 @@ class EntitiesView(QWidget):
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch) # Nome
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents) # Tipo
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch) # Detalhes
-        main_layout.addWidget(self.entities_table)
+        splitter.addWidget(self.entities_table)
+
+        # --- Linha do tempo: eventos da entidade selecionada ---
+        timeline_panel = QWidget()
+        timeline_layout = QVBoxLayout(timeline_panel)
+        timeline_layout.setContentsMargins(0, 0, 0, 0)
+
+        timeline_title = QLabel("Linha do Tempo")
+        timeline_title.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        timeline_layout.addWidget(timeline_title)
+
+        period_layout = QHBoxLayout()
+        period_layout.addWidget(QLabel("Período:"))
+        self.timeline_period_combo = QComboBox()
+        self.timeline_period_combo.addItems(self.TIMELINE_PERIODS)
+        self.timeline_period_combo.currentIndexChanged.connect(lambda: self._load_timeline())
+        period_layout.addWidget(self.timeline_period_combo)
+        period_layout.addStretch()
+        timeline_layout.addLayout(period_layout)
+
+        self.timeline_list = QListWidget()
+        self.timeline_list.setStyleSheet("QListWidget::item { padding: 4px; }")
+        timeline_layout.addWidget(self.timeline_list)
+
+        splitter.addWidget(timeline_panel)
+        splitter.setSizes([600, 350])
+        main_layout.addWidget(splitter)
 
         # Botões de Ação
         action_buttons_layout = QHBoxLayout()
@@ -76,16 +121,23 @@ class EntitiesView(QWidget):
         main_layout.addLayout(action_buttons_layout)
         self._load_entities()
 
-    def _load_entities(self):
-        self.entities_table.setRowCount(0)
-        self.current_selected_entity_id = None
-        self._update_action_buttons_state()
-
+    def _load_entities(self, select_entity_id: Optional[int] = None):
+        """Recarrega a tabela em segundo plano; select_entity_id é selecionada ao chegar o resultado."""
         entity_type_filter = self.type_filter_combo.currentText()
         if entity_type_filter == "Todos" or not entity_type_filter.strip():
             entity_type_filter = None 
         
-        entities = self.db_manager.get_all_entities(entity_type=entity_type_filter)
+        self.db_runner.submit("get_all_entities", entity_type=entity_type_filter, channel=self.LOAD_CHANNEL,
+                              on_result=lambda entities: self._populate_entities(entities, select_entity_id),
+                              on_error=self._on_load_error)
+
+    def _on_load_error(self, message: str):
+        QMessageBox.critical(self, "Erro", f"Falha ao carregar as entidades: {message}")
+
+    def _populate_entities(self, entities: List[Entity], select_entity_id: Optional[int] = None):
+        self.entities_table.setRowCount(0)
+        self.current_selected_entity_id = None
+        self._update_action_buttons_state()
 
         for entity in entities:
             row_position = self.entities_table.rowCount()
@@ -110,8 +162,15 @@ class EntitiesView(QWidget):
             self.entities_table.setItem(row_position, 1, type_item)
             self.entities_table.setItem(row_position, 2, details_item)
         
-        if self.entities_table.rowCount() > 0:
-            self.entities_table.selectRow(0)
+        if self.entities_table.rowCount() == 0:
+            return
+        if select_entity_id is not None:
+            for row in range(self.entities_table.rowCount()):
+                item = self.entities_table.item(row, 0)
+                if item and item.data(Qt.ItemDataRole.UserRole) == select_entity_id:
+                    self.entities_table.selectRow(row)
+                    return
+        self.entities_table.selectRow(0)
 
     def _on_entity_selected(self):
         selected_items = self.entities_table.selectedItems()
@@ -122,6 +181,47 @@ class EntitiesView(QWidget):
             entity_id_data = first_item_in_row.data(Qt.ItemDataRole.UserRole)
             self.current_selected_entity_id = int(entity_id_data) if entity_id_data is not None else None
         self._update_action_buttons_state()
+        self._load_timeline()
+
+    def _timeline_range(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Intervalo [início, fim) do período escolhido; (None, None) para todos os eventos."""
+        period = self.timeline_period_combo.currentText()
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        if period == "Semestre atual":
+            if today.month <= 6:
+                return datetime(today.year, 1, 1), datetime(today.year, 7, 1)
+            return datetime(today.year, 7, 1), datetime(today.year + 1, 1, 1)
+        if period == "Próximos 30 dias":
+            return today, today + timedelta(days=30)
+        if period == "Últimos 30 dias":
+            return today - timedelta(days=30), today + timedelta(days=1)
+        return None, None
+
+    def _load_timeline(self):
+        """Busca em segundo plano os eventos da entidade selecionada no período escolhido."""
+        entity_id = self.current_selected_entity_id
+        if entity_id is None:
+            self.timeline_list.clear()
+            return
+        start, end = self._timeline_range()
+        self.db_runner.submit("get_events_for_entity", entity_id, start, end, channel=self.TIMELINE_CHANNEL,
+                              on_result=lambda events: self._populate_timeline(entity_id, events))
+
+    def _populate_timeline(self, entity_id: int, events: List[Tuple[Event, str]]):
+        if entity_id != self.current_selected_entity_id:
+            return
+        self.timeline_list.clear()
+        if not events:
+            item = QListWidgetItem("Nenhum evento no período.")
+            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
+            self.timeline_list.addItem(item)
+            return
+        for event_obj, role in events:
+            start_str = event_obj.start_time.strftime('%d/%m/%Y %H:%M') if event_obj.start_time else "Horário Indef."
+            role_str = f" ({role})" if role else ""
+            item = QListWidgetItem(f"{start_str} - {event_obj.title}{role_str}")
+            item.setData(Qt.ItemDataRole.UserRole, event_obj.id)
+            self.timeline_list.addItem(item)
 
     def _update_action_buttons_state(self):
         has_selection = self.current_selected_entity_id is not None
@@ -136,13 +236,7 @@ class EntitiesView(QWidget):
                 new_entity = self.db_manager.add_entity(entity_data)
                 if new_entity and new_entity.id:
                     QMessageBox.information(self, "Sucesso", f"Entidade '{new_entity.name}' adicionada.")
-                    self._load_entities()
-                    # Tentar selecionar a entidade recém-adicionada
-                    for row in range(self.entities_table.rowCount()):
-                        item = self.entities_table.item(row, 0)
-                        if item and item.data(Qt.ItemDataRole.UserRole) == new_entity.id:
-                            self.entities_table.selectRow(row)
-                            break
+                    self._load_entities(select_entity_id=new_entity.id) # Seleciona a entidade recém-adicionada
                 else:
                     QMessageBox.critical(self, "Erro", "Falha ao adicionar a entidade no banco de dados.")
 
@@ -163,12 +257,8 @@ class EntitiesView(QWidget):
             if entity_data:
                 if self.db_manager.update_entity(entity_data):
                     QMessageBox.information(self, "Sucesso", f"Entidade '{entity_data.name}' atualizada.")
-                    self._load_entities()
-                    for row in range(self.entities_table.rowCount()):
-                        item = self.entities_table.item(row, 0)
-                        if item and item.data(Qt.ItemDataRole.UserRole) == entity_data.id:
-                            self.entities_table.selectRow(row)
-                            break
+                    self._load_entities(select_entity_id=entity_data.id)
+                    self.entities_changed.emit()
                 else:
                     QMessageBox.critical(self, "Erro", "Falha ao atualizar a entidade no banco de dados.")
 
@@ -192,6 +282,7 @@ class EntitiesView(QWidget):
             if self.db_manager.delete_entity(self.current_selected_entity_id):
                 QMessageBox.information(self, "Sucesso", f"Entidade '{entity.name}' excluída.")
                 self._load_entities()
+                self.entities_changed.emit()
             else:
                 QMessageBox.critical(self, "Erro", "Falha ao excluir a entidade.")
 
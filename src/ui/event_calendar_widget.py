@@ -0,0 +1,49 @@
+from datetime import date
+from typing import Dict, Optional
+
+from PyQt6.QtCore import Qt, QDate, QRect, QPoint
+from PyQt6.QtGui import QPainter, QColor, QFont
+from PyQt6.QtWidgets import QCalendarWidget
+
+
+class EventDensityCalendar(QCalendarWidget):
+    """QCalendarWidget que mostra, em cada dia, a quantidade de eventos.
+
+    As contagens são entregues de fora (set_day_counts), já agregadas por dia; o
+    widget só as pinta: um ponto no canto inferior da célula e o número de eventos.
+    """
+    DOT_COLOR = QColor("#2a7ae2")
+    DOT_RADIUS = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._day_counts: Dict[date, int] = {}
+
+    def set_day_counts(self, day_counts: Optional[Dict[date, int]]):
+        """Substitui as contagens exibidas e repinta o calendário."""
+        self._day_counts = dict(day_counts or {})
+        self.updateCells()
+
+    def day_count(self, day: date) -> int:
+        return self._day_counts.get(day, 0)
+
+    def paintCell(self, painter: QPainter, rect: QRect, qdate: QDate):
+        super().paintCell(painter, rect, qdate)
+        count = self._day_counts.get(qdate.toPyDate())
+        if not count:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.DOT_COLOR)
+        dot_center = QPoint(rect.left() + 4 + self.DOT_RADIUS, rect.bottom() - 4 - self.DOT_RADIUS)
+        painter.drawEllipse(dot_center, self.DOT_RADIUS, self.DOT_RADIUS)
+
+        font = QFont(painter.font())
+        font.setPointSizeF(max(6.0, font.pointSizeF() * 0.7))
+        painter.setFont(font)
+        painter.setPen(self.DOT_COLOR)
+        painter.drawText(rect.adjusted(0, 0, -3, -1),
+                         Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignBottom, str(count))
+        painter.restore()
@@ -1,4 +1,5 @@
 import sys
+import logging
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QLineEdit, QTextEdit, 
     QDateTimeEdit, QPushButton, QDialogButtonBox, QMessageBox,
@@ -10,6 +11,9 @@ from typing import Optional, List, Tuple, Dict # Added Dict
 
 from src.core.models import Event, Entity # Adicionado Entity
 from src.core.database_manager import DatabaseManager # Necessário para carregar entidades
+from src.core.recurrence import RecurrenceRule
+
+logger = logging.getLogger("agenda.ui")
 
 class EventDialog(QDialog):
     def __init__(self, db_manager: DatabaseManager, event: Optional[Event] = None, parent=None): # db_manager adicionado
@@ -18,6 +22,7 @@ class EventDialog(QDialog):
         self.event = event
         self.all_available_entities: List[Entity] = []
         self.selected_entity_map: Dict[int, str] = {} # entity_id -> role (para este evento)
+        self.linked_entity_roles: Dict[int, str] = {} # Vínculos já gravados do evento em edição
         self.event_data_to_save: Optional[Tuple[Event, Dict[int, str]]] = None # To store event and entity map
 
         if self.event:
@@ -47,7 +52,8 @@ class EventDialog(QDialog):
 
         self.event_type_edit = QLineEdit() # Poderia ser QComboBox
         self.location_edit = QLineEdit()
-        # self.recurrence_rule_edit = QLineEdit() # Opcional por agora
+        self.recurrence_rule_edit = QLineEdit()
+        self.recurrence_rule_edit.setPlaceholderText("Ex: FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20251231 (vazio = sem recorrência)")
 
         form_layout.addRow("Título:", self.title_edit)
         form_layout.addRow("Descrição:", self.description_edit)
@@ -55,7 +61,7 @@ class EventDialog(QDialog):
         form_layout.addRow("Fim:", self.end_time_edit)
         form_layout.addRow("Tipo:", self.event_type_edit)
         form_layout.addRow("Local:", self.location_edit)
-        # form_layout.addRow("Recorrência:", self.recurrence_rule_edit) # Ainda opcional
+        form_layout.addRow("Recorrência:", self.recurrence_rule_edit)
 
         main_layout.addLayout(form_layout)
 
@@ -99,7 +105,7 @@ class EventDialog(QDialog):
 
             self.event_type_edit.setText(self.event.event_type or "")
             self.location_edit.setText(self.event.location or "")
-            # self.recurrence_rule_edit.setText(self.event.recurrence_rule or "")
+            self.recurrence_rule_edit.setText(self.event.recurrence_rule or "")
         else:
             # Valores padrão para novo evento
             self.start_time_edit.setDateTime(QDateTime.currentDateTime())
@@ -127,7 +133,7 @@ class EventDialog(QDialog):
         try:
             self.all_available_entities = self.db_manager.get_all_entities()
         except Exception as e:
-            print(f"Erro ao carregar entidades: {e}")
+            logger.warning(f"Erro ao carregar entidades: {e}")
             self.all_available_entities = []
             error_label = QLabel("Não foi possível carregar as entidades.")
             self.participants_layout.addWidget(error_label)
@@ -143,9 +149,11 @@ class EventDialog(QDialog):
         if self.event and self.event.id is not None:
             try:
                 linked_entities = self.db_manager.get_entities_for_event(self.event.id)
-                linked_entity_ids = {entity.id for entity in linked_entities if entity.id is not None}
+                # get_entities_for_event devolve pares (entidade, papel)
+                self.linked_entity_roles = {entity.id: role for entity, role in linked_entities if entity.id is not None}
+                linked_entity_ids = set(self.linked_entity_roles)
             except Exception as e:
-                print(f"Erro ao carregar entidades para o evento: {e}")
+                logger.warning(f"Erro ao carregar entidades para o evento: {e}")
 
         if not self.all_available_entities:
             no_entities_label = QLabel("Nenhuma entidade disponível para seleção.")
@@ -190,7 +198,13 @@ class EventDialog(QDialog):
 
         event_type = self.event_type_edit.text().strip()
         location = self.location_edit.text().strip()
-        # recurrence_rule = self.recurrence_rule_edit.text().strip()
+        recurrence_rule = self.recurrence_rule_edit.text().strip() or None
+        if recurrence_rule:
+            try:
+                RecurrenceRule.parse(recurrence_rule)
+            except ValueError as e:
+                QMessageBox.warning(self, "Recorrência Inválida", f"A regra de recorrência não é válida:\n{e}")
+                return None
 
         # Se estiver editando, use o ID existente e os timestamps de criação/atualização originais
         event_id = self.event.id if self.event else None
@@ -205,13 +219,12 @@ class EventDialog(QDialog):
             end_time=end_time,
             event_type=event_type,
             location=location,
-            recurrence_rule=None, # recurrence_rule, # Adicionar quando o campo estiver ativo
+            recurrence_rule=recurrence_rule,
             created_at=created_at, 
             updated_at=updated_at 
         )
 
     def validate_and_accept(self):
-        print("[EventDialog] validate_and_accept called")
         """Valida os dados, reconstrói o mapa de entidades selecionadas e aceita o diálogo."""
         # Clear and rebuild selected_entity_map based on checkbox states
         self.selected_entity_map.clear()
@@ -222,23 +235,19 @@ class EventDialog(QDialog):
                 if isinstance(widget, QCheckBox) and widget.isChecked():
                     entity_id = widget.property("entity_id")
                     if entity_id is not None:
-                        # Default role, pode ser expandido no futuro para permitir seleção de roles
-                        self.selected_entity_map[entity_id] = "Participante"
-        print(f"[EventDialog] selected_entity_map: {self.selected_entity_map}")
+                        # Mantém o papel de quem já estava vinculado; novos vínculos recebem o papel padrão
+                        # (pode ser expandido no futuro para permitir seleção de roles)
+                        self.selected_entity_map[entity_id] = self.linked_entity_roles.get(entity_id, "Participante")
 
         event_data = self.get_event_data() # Retorna um objeto Event ou None
-        print(f"[EventDialog] event_data from get_event_data: {event_data}")
 
         if event_data:
             # Estrutura self.event_data_to_save como (Event, Dict[int, str])
             self.event_data_to_save = (event_data, self.selected_entity_map)
-            print(f"[EventDialog] self.event_data_to_save: {self.event_data_to_save}")
             self.accept() # Fecha o diálogo com QDialog.Accepted
-            print("[EventDialog] self.accept() called")
         else:
             # get_event_data já mostrou um QMessageBox de aviso.
             # self.event_data_to_save não é definido, e o diálogo permanece aberto.
-            print("[EventDialog] event_data was None, dialog not accepted")
             pass
 
 # Bloco para teste independente do EventDialog
@@ -254,11 +263,11 @@ if __name__ == '__main__':
                 Entity(id=2, name="Caso XYZ", type="Processo", description="Disputa Contratual", created_at=datetime.now(), updated_at=datetime.now()),
                 Entity(id=3, name="Bob", type="Pessoa", description="Cliente", created_at=datetime.now(), updated_at=datetime.now()),
             ]
-        def get_entities_for_event(self, event_id: int) -> List[Entity]:
+        def get_entities_for_event(self, event_id: int) -> List[Tuple[Entity, str]]:
             if event_id == 1: # Simula que o evento 1 tem Alice e Caso XYZ vinculados
                 return [
-                    Entity(id=1, name="Alice", type="Pessoa", description="Advogada", created_at=datetime.now(), updated_at=datetime.now()),
-                    Entity(id=2, name="Caso XYZ", type="Processo", description="Disputa Contratual", created_at=datetime.now(), updated_at=datetime.now()),
+                    (Entity(id=1, name="Alice", type="Pessoa", description="Advogada", created_at=datetime.now(), updated_at=datetime.now()), "Advogada"),
+                    (Entity(id=2, name="Caso XYZ", type="Processo", description="Disputa Contratual", created_at=datetime.now(), updated_at=datetime.now()), "Participante"),
                 ]
             return []
 
@@ -268,20 +277,7 @@ if __name__ == '__main__':
     # Teste para adicionar novo evento
     # É necessário passar o db_manager para o construtor
     dialog_add = EventDialog(db_manager=mock_db)
-    if dialog_add.exec() == QDialog.accepted: # Usar QDialog.Accepted
-        event_tuple = dialog_add.event_data_to_save
-        if event_tuple:
-            new_event, selected_entities = event_tuple
-            print("Novo Evento (do diálogo de adição):")
-            print(f"  Título: {new_event.title}")
-            print(f"  Início: {new_event.start_time}")
-            print(f"  Fim: {new_event.end_time}")
-            print(f"  Tipo: {new_event.event_type}")
-            print(f"  Local: {new_event.location}")
-            print(f"  Descrição: {new_event.description}")
-            print(f"  Entidades Selecionadas: {selected_entities}")
-    else:
-        print("Criação de novo evento cancelada.")
+    dialog_add.exec()
 
     # Teste para editar evento existente
     sample_start_time = datetime(2024, 8, 20, 10, 0, 0)
@@ -299,18 +295,7 @@ if __name__ == '__main__':
     )
     # É necessário passar o db_manager para o construtor
     dialog_edit = EventDialog(db_manager=mock_db, event=existing_event)
-    if dialog_edit.exec() == QDialog.Accepted: # Usar QDialog.Accepted
-        event_tuple = dialog_edit.event_data_to_save
-        if event_tuple:
-            edited_event, selected_entities = event_tuple
-            print("\nEvento Editado:")
-            print(f"  ID: {edited_event.id}")
-            print(f"  Título: {edited_event.title}")
-            print(f"  Início: {edited_event.start_time}")
-            print(f"  Entidades Selecionadas: {selected_entities}")
-            # ... e outros campos conforme necessário
-    else:
-        print("\nEdição de evento cancelada.")
+    dialog_edit.exec()
         
     # sys.exit(app.exec()) # Para rodar a aplicação de fato e ver os diálogos
     sys.exit(0) # Sair sem iniciar o loop de eventos principal para testes simples (como estava)
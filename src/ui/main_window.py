@@ -1,9 +1,10 @@
 import sys
+import logging
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, 
     QListWidget, QListWidgetItem, QStackedWidget, QLabel, QFrame
 )
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 # from PyQt6.QtGui import QIcon
 
 from src.ui.agenda_view import AgendaView
@@ -13,12 +14,26 @@ from src.ui.quiz_section_widget import QuizSectionWidget
 from src.ui.entities_view import EntitiesView
 from src.ui.settings_view import SettingsView 
 from src.core.database_manager import DatabaseManager
+from src.ui.db_worker import AsyncDbRunner
+from typing import Callable, Dict, List
+
+logger = logging.getLogger("agenda.ui")
 
 class MainWindow(QMainWindow):
-    def __init__(self, db_manager: DatabaseManager, parent=None): # db_manager como parâmetro
+    # Intervalo entre a construção de cada página no pré-aquecimento em segundo plano
+    PREWARM_INTERVAL_MS = 50
+
+    def __init__(self, db_manager: DatabaseManager, prewarm_pages: bool = True, parent=None): # db_manager como parâmetro
         super().__init__(parent) # Chamada única ao super
 
         self.db_manager = db_manager # Usar o db_manager passado
+        # Fachada assíncrona compartilhada pelas views para as consultas de listas e tabelas
+        self.db_runner = AsyncDbRunner(self.db_manager.db_path, parent=self)
+        # As páginas são construídas sob demanda (primeira navegação) a partir destas fábricas
+        self.page_factories: List[Callable[[], QWidget]] = []
+        self.pages: Dict[int, QWidget] = {}
+        self.prewarm_pages = prewarm_pages
+        self._prewarm_started = False
         # QApplication.instance().aboutToQuit.connect(self.cleanup_db_connection) # Pode ser mantido
 
         self.setWindowTitle("Agenda Pessoal") # Chamada única
@@ -64,13 +79,15 @@ class MainWindow(QMainWindow):
         # main_layout.setStretch(1, 1) # Faz o content_stack expandir (já deve ser o comportamento padrão)
 
         # Itens do Menu e Páginas Correspondentes
-        # Agora passamos o db_manager para todas as views principais
-        self.add_menu_item("Agenda", AgendaView(self.db_manager)) 
-        self.add_menu_item("Tarefas", TasksView(self.db_manager)) 
-        self.add_menu_item("Banco de Perguntas", QuestionsView(self.db_manager))
-        self.add_menu_item("Quiz", QuizSectionWidget(self.db_manager))
-        self.add_menu_item("Entidades", EntitiesView(self.db_manager))
-        self.add_menu_item("Configurações", SettingsView(self.db_manager)) # Substituído Placeholder
+        # Agora passamos o db_manager para todas as views principais. Só a página
+        # inicial é construída antes de a janela aparecer; as demais, ao navegar até elas
+        # ou no pré-aquecimento após a primeira pintura.
+        self.add_menu_item("Agenda", lambda: AgendaView(self.db_manager, db_runner=self.db_runner))
+        self.add_menu_item("Tarefas", lambda: TasksView(self.db_manager, db_runner=self.db_runner))
+        self.add_menu_item("Banco de Perguntas", lambda: QuestionsView(self.db_manager, db_runner=self.db_runner))
+        self.add_menu_item("Quiz", lambda: QuizSectionWidget(self.db_manager, db_runner=self.db_runner))
+        self.add_menu_item("Entidades", lambda: EntitiesView(self.db_manager, db_runner=self.db_runner))
+        self.add_menu_item("Configurações", lambda: SettingsView(self.db_manager)) # Substituído Placeholder
 
         # Conectar sinal do menu para mudar a página no QStackedWidget
         self.nav_menu.currentItemChanged.connect(self.change_page)
@@ -79,29 +96,78 @@ class MainWindow(QMainWindow):
         if self.nav_menu.count() > 0:
             self.nav_menu.setCurrentRow(0)
 
-    def add_menu_item(self, name: str, page_widget: QWidget):
-        """Adiciona um item ao menu de navegação e a página correspondente ao QStackedWidget."""
+    def add_menu_item(self, name: str, page_factory: Callable[[], QWidget]):
+        """Adiciona um item ao menu de navegação e registra a fábrica da página correspondente.
+
+        Até a página ser construída, o QStackedWidget guarda um widget vazio na mesma posição.
+        """
         list_item = QListWidgetItem(name)
         # list_item.setIcon(QIcon.fromTheme("nome-do-icone")) # Exemplo
         self.nav_menu.addItem(list_item)
-        
+
+        self.page_factories.append(page_factory)
+        self.content_stack.addWidget(QWidget())
+
+    def _ensure_page(self, index: int) -> QWidget:
+        """Constrói a página do índice informado, se ainda não existir, e a devolve."""
+        page_widget = self.pages.get(index)
+        if page_widget is not None:
+            return page_widget
+
+        page_widget = self.page_factories[index]()
         # Se for um QLabel placeholder, centralizar e estilizar
         is_complex_view = isinstance(page_widget, (AgendaView, TasksView, QuestionsView, QuizSectionWidget, EntitiesView, SettingsView))
         if isinstance(page_widget, QLabel) and not is_complex_view:
             page_widget.setAlignment(Qt.AlignmentFlag.AlignCenter)
             page_widget.setStyleSheet("font-size: 18px; color: #333;")
 
-        self.content_stack.addWidget(page_widget)
+        if isinstance(page_widget, EntitiesView):
+            page_widget.entities_changed.connect(self._on_entities_changed)
+
+        # Substituir o widget vazio pela página real, mantendo a posição
+        placeholder = self.content_stack.widget(index)
+        was_current = self.content_stack.currentIndex() == index
+        self.content_stack.insertWidget(index, page_widget)
+        self.content_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        if was_current:
+            self.content_stack.setCurrentIndex(index)
+
+        self.pages[index] = page_widget
+        return page_widget
 
     def change_page(self, current_item: QListWidgetItem, previous_item: QListWidgetItem):
         """Muda a página visível no QStackedWidget com base no item selecionado no menu."""
         if current_item:
             index = self.nav_menu.row(current_item)
+            self._ensure_page(index)
             self.content_stack.setCurrentIndex(index)
+
+    def showEvent(self, event):
+        """Inicia o pré-aquecimento das páginas restantes depois que a janela aparece."""
+        super().showEvent(event)
+        if self.prewarm_pages and not self._prewarm_started:
+            self._prewarm_started = True
+            QTimer.singleShot(self.PREWARM_INTERVAL_MS, self._prewarm_next_page)
+
+    def _prewarm_next_page(self):
+        """Constrói uma página ainda pendente por vez, devolvendo o controle ao laço de eventos entre elas."""
+        for index in range(len(self.page_factories)):
+            if index not in self.pages:
+                self._ensure_page(index)
+                QTimer.singleShot(self.PREWARM_INTERVAL_MS, self._prewarm_next_page)
+                return
     
+    def _on_entities_changed(self):
+        """A agenda guarda as entidades de cada evento em cache; descarta esse cache."""
+        for page_widget in self.pages.values():
+            if isinstance(page_widget, AgendaView):
+                page_widget.invalidate_entities()
+
     def cleanup_db_connection(self):
         """Fecha a conexão com o banco de dados."""
-        print("Fechando conexão com o banco de dados...")
+        logger.debug("Fechando conexão com o banco de dados...")
+        self.db_runner.close() # Espera as consultas em segundo plano e fecha as conexões das threads
         if self.db_manager:
             self.db_manager.close()
 
@@ -0,0 +1,140 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from typing import Any, Callable, List, Optional, Tuple
+
+from src.core.models import Question
+
+# Origem das páginas: recebe a chave (subject, id) da última linha já carregada (ou None
+# para a primeira página), o tamanho da página e dois callbacks, on_page(perguntas) e
+# on_error(mensagem). A busca é assíncrona: a página chega depois, pelo on_page.
+PageRequester = Callable[[Optional[Tuple[Optional[str], int]], int,
+                          Callable[[List[Question]], None], Callable[[str], None]], None]
+
+
+class QuestionsTableModel(QAbstractTableModel):
+    """Modelo da tabela do banco de perguntas com carregamento incremental.
+
+    As linhas são buscadas em páginas de PAGE_SIZE pelo canFetchMore/fetchMore, à
+    medida que a tabela rola, e guardadas como tuplas de texto já formatado, em vez
+    de um QTableWidgetItem por célula. O fetchMore só pede a página (ex.: a uma thread
+    de trabalho) e não bloqueia a GUI; há no máximo uma página pendente por vez.
+    """
+    PAGE_SIZE = 200
+    HEADERS = ["Texto da Pergunta", "Assunto", "Dificuldade", "Opções", "Resposta"]
+
+    # Posições dentro da tupla de cada linha
+    ID, TEXT, SUBJECT, DIFFICULTY, OPTIONS, ANSWER = range(6)
+    # Chave de paginação (subject original, id), guardada à parte porque SUBJECT é o texto exibido
+    KEY_SUBJECT = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[tuple] = []
+        self._page_requester: Optional[PageRequester] = None
+        self._exhausted = True
+        self._fetching = False
+        # Incrementada a cada troca de origem: páginas pedidas antes disso são descartadas
+        self._source_generation = 0
+
+    @staticmethod
+    def _row_from_question(question: Question) -> tuple:
+        options_str = ", ".join(question.options) if question.options else "N/A"
+        return (question.id, question.text, question.subject or "N/A", question.difficulty or "N/A",
+                options_str, question.answer, question.subject)
+
+    def set_page_requester(self, page_requester: Optional[PageRequester],
+                           first_page: Optional[List[Question]] = None):
+        """Troca a origem das linhas e reinicia o modelo.
+
+        first_page entrega a primeira página já buscada; sem ela, a primeira página é
+        pedida ao page_requester.
+        """
+        self.beginResetModel()
+        self._page_requester = page_requester
+        self._source_generation += 1
+        self._rows = []
+        self._exhausted = page_requester is None
+        self._fetching = False
+        self.endResetModel()
+        if first_page is not None:
+            self._append_page(first_page)
+        elif self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+
+    def _append_page(self, questions: List[Question]):
+        if len(questions) < self.PAGE_SIZE:
+            self._exhausted = True
+        if not questions:
+            return
+        first_row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(questions) - 1)
+        self._rows.extend(self._row_from_question(question) for question in questions)
+        self.endInsertRows()
+
+    # --- Carregamento incremental ---
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return not parent.isValid() and not self._exhausted and not self._fetching
+
+    def fetchMore(self, parent: QModelIndex):
+        if not self.canFetchMore(parent) or self._page_requester is None:
+            return
+        after = None
+        if self._rows:
+            last_row = self._rows[-1]
+            after = (last_row[self.KEY_SUBJECT], last_row[self.ID])
+        self._fetching = True
+        generation = self._source_generation
+        self._page_requester(after, self.PAGE_SIZE,
+                             lambda questions: self._on_page_loaded(generation, questions),
+                             lambda message: self._on_page_error(generation, message))
+
+    def _on_page_loaded(self, generation: int, questions: List[Question]):
+        if generation != self._source_generation:
+            return # Página da origem anterior
+        self._fetching = False
+        self._append_page(questions)
+
+    def _on_page_error(self, generation: int, message: str):
+        if generation != self._source_generation:
+            return
+        # Não tenta de novo a cada rolagem; a próxima recarga da view reinicia o modelo
+        self._fetching = False
+        self._exhausted = True
+
+    def is_fetching(self) -> bool:
+        """True enquanto uma página pedida pelo fetchMore não chegou."""
+        return self._fetching
+
+    # --- Interface do QAbstractTableModel ---
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row[index.column() + 1] # A coluna 0 da tabela é TEXT (posição 1)
+        if role == Qt.ItemDataRole.UserRole:
+            return row[self.ID]
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    # --- Auxiliares para a view ---
+    def question_id_at(self, row: int) -> Optional[int]:
+        if 0 <= row < len(self._rows):
+            return self._rows[row][self.ID]
+        return None
+
+    def row_for_question_id(self, question_id: int) -> int:
+        """Linha (entre as já carregadas) da pergunta informada, ou -1."""
+        for row, values in enumerate(self._rows):
+            if values[self.ID] == question_id:
+                return row
+        return -1
@@ -1,23 +1,41 @@
 import sys
 import json
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView, QAbstractItemView,
     QPushButton, QComboBox, QLabel, QMessageBox, QHeaderView, QLineEdit, QDialog, QApplication
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from typing import Optional, List
 
 from src.core.database_manager import DatabaseManager
 from src.core.models import Question
 from src.ui.question_dialog import QuestionDialog # Importado QuestionDialog
+from src.ui.questions_table_model import QuestionsTableModel
+from src.ui.db_worker import AsyncDbRunner
 
 class QuestionsView(QWidget):
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    # Espera após a última tecla digitada nos filtros antes de consultar o banco
+    FILTER_DELAY_MS = 300
+    # Canais no AsyncDbRunner: primeira página (filtros e recargas) e páginas seguintes (rolagem)
+    FILTER_CHANNEL = "questions_view.filter"
+    PAGE_CHANNEL = "questions_view.page"
+
+    def __init__(self, db_manager: DatabaseManager, db_runner: Optional[AsyncDbRunner] = None,
+                 filter_delay_ms: int = FILTER_DELAY_MS, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        self.db_runner = db_runner or AsyncDbRunner(db_manager.db_path, parent=self)
         self.current_selected_question_id: Optional[int] = None
 
+        # Filtragem assíncrona: a digitação reinicia o timer e só a última consulta é aplicada.
+        # Cada consulta recebe um número de geração; resultados de gerações antigas são descartados.
+        self._filter_generation = 0
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(filter_delay_ms)
+        self.filter_timer.timeout.connect(self._start_filter_query)
+
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(10, 10, 10, 10)
         main_layout.setSpacing(10)
@@ -28,36 +46,45 @@ class QuestionsView(QWidget):
 
         # Filtros
         filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Buscar:"))
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Buscar no texto, resposta ou opções...")
+        self.search_edit.textChanged.connect(self.filter_timer.start)
+        filter_layout.addWidget(self.search_edit)
+
         filter_layout.addWidget(QLabel("Assunto:"))
         self.subject_filter_edit = QLineEdit()
         self.subject_filter_edit.setPlaceholderText("Filtrar por assunto...")
-        self.subject_filter_edit.textChanged.connect(self._load_questions)
+        self.subject_filter_edit.textChanged.connect(self.filter_timer.start)
         filter_layout.addWidget(self.subject_filter_edit)
 
         filter_layout.addWidget(QLabel("Dificuldade:"))
         self.difficulty_filter_combo = QComboBox()
         self.difficulty_filter_combo.addItems(["Todas", "Fácil", "Médio", "Difícil"])
-        self.difficulty_filter_combo.currentIndexChanged.connect(self._load_questions)
+        self.difficulty_filter_combo.currentIndexChanged.connect(self._start_filter_query)
         filter_layout.addWidget(self.difficulty_filter_combo)
         
         main_layout.addLayout(filter_layout)
 
-        # Tabela de Perguntas
-        self.questions_table = QTableWidget()
-        self.questions_table.setColumnCount(5) # Texto, Assunto, Dificuldade, Opções, Resposta
-        self.questions_table.setHorizontalHeaderLabels(["Texto da Pergunta", "Assunto", "Dificuldade", "Opções", "Resposta"])
-        self.questions_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.questions_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.questions_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        # Tabela de Perguntas (modelo com carregamento incremental: só as páginas visitadas são buscadas)
+        self.questions_model = QuestionsTableModel(self)
+        self.questions_table = QTableView()
+        self.questions_table.setModel(self.questions_model) # Texto, Assunto, Dificuldade, Opções, Resposta
+        self.questions_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.questions_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.questions_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.questions_table.verticalHeader().setVisible(False)
-        self.questions_table.itemSelectionChanged.connect(self._on_question_selected)
+        # Altura fixa das linhas evita medir cada linha ao rolar
+        self.questions_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.questions_table.selectionModel().selectionChanged.connect(self._on_question_selected)
         
+        # ResizeToContents mediria todas as linhas carregadas a cada página; larguras interativas não
         header = self.questions_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch) # Texto
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents) # Assunto
-        header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents) # Dificuldade
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents) # Opções
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents) # Resposta
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Interactive) # Assunto
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive) # Dificuldade
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Interactive) # Opções
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.Interactive) # Resposta
         main_layout.addWidget(self.questions_table)
 
         # Botões de Ação
@@ -79,11 +106,8 @@ class QuestionsView(QWidget):
         main_layout.addLayout(action_buttons_layout)
         self._load_questions()
 
-    def _load_questions(self):
-        self.questions_table.setRowCount(0)
-        self.current_selected_question_id = None
-        self._update_action_buttons_state()
-
+    def _current_filters(self):
+        """Retorna (texto_busca, assunto, dificuldade) dos campos de filtro; None quando vazio."""
         subject_filter = self.subject_filter_edit.text().strip()
         if not subject_filter: # Se vazio, não filtrar por assunto
             subject_filter = None
@@ -91,45 +115,90 @@ class QuestionsView(QWidget):
         difficulty_filter = self.difficulty_filter_combo.currentText()
         if difficulty_filter == "Todas":
             difficulty_filter = None
-        
-        questions = self.db_manager.get_all_questions(subject=subject_filter, difficulty=difficulty_filter)
 
-        for question in questions:
-            row_position = self.questions_table.rowCount()
-            self.questions_table.insertRow(row_position)
+        search_text = self.search_edit.text().strip() or None
+        return search_text, subject_filter, difficulty_filter
 
-            text_item = QTableWidgetItem(question.text)
-            if question.id is not None:
-                 text_item.setData(Qt.ItemDataRole.UserRole, question.id)
+    def _submit_page_query(self, filters, after, limit, channel: str, on_result, on_error=None):
+        """Pede uma página de perguntas ao db_runner (busca textual ou listagem por assunto)."""
+        search_text, subject_filter, difficulty_filter = filters
+        if search_text: # Busca textual, ordenada por relevância (resultado limitado, em uma única página)
+            if after is not None:
+                on_result([])
+                return
+            self.db_runner.submit("search_questions", search_text, subject=subject_filter,
+                                  difficulty=difficulty_filter, channel=channel,
+                                  on_result=on_result, on_error=on_error)
+        else:
+            self.db_runner.submit("get_questions_page", subject=subject_filter, difficulty=difficulty_filter,
+                                  after=after, limit=limit, channel=channel,
+                                  on_result=on_result, on_error=on_error)
 
-            subject_item = QTableWidgetItem(question.subject or "N/A")
-            difficulty_item = QTableWidgetItem(question.difficulty or "N/A")
-            
-            options_str = ", ".join(question.options) if question.options else "N/A"
-            options_item = QTableWidgetItem(options_str)
-            
-            answer_item = QTableWidgetItem(question.answer)
+    def _apply_questions(self, filters, first_page: List[Question], select_question_id: Optional[int] = None):
+        self.current_selected_question_id = None
+        self._update_action_buttons_state()
 
-            self.questions_table.setItem(row_position, 0, text_item)
-            self.questions_table.setItem(row_position, 1, subject_item)
-            self.questions_table.setItem(row_position, 2, difficulty_item)
-            self.questions_table.setItem(row_position, 3, options_item)
-            self.questions_table.setItem(row_position, 4, answer_item)
-        
-        if self.questions_table.rowCount() > 0:
+        # As páginas seguintes (ao rolar) também são buscadas nas threads de trabalho
+        self.questions_model.set_page_requester(
+            lambda after, limit, on_page, on_error: self._submit_page_query(
+                filters, after, limit, self.PAGE_CHANNEL, on_page, on_error),
+            first_page=first_page
+        )
+
+        if select_question_id is not None and self.questions_model.row_for_question_id(select_question_id) >= 0:
+            self._select_question(select_question_id)
+        elif self.questions_model.rowCount() > 0: # Pergunta fora da primeira página: seleciona a primeira linha
             self.questions_table.selectRow(0)
 
+    def _load_questions(self, select_question_id: Optional[int] = None):
+        """Recarrega a tabela sem esperar o timer (ex.: após adicionar, editar ou excluir).
+
+        A consulta roda numa thread de trabalho; select_question_id é selecionada quando
+        o resultado chegar, se estiver na primeira página.
+        """
+        self._start_filter_query(select_question_id)
+
+    def _start_filter_query(self, select_question_id: Optional[int] = None):
+        """Busca a primeira página com os filtros atuais em uma thread de trabalho."""
+        self.filter_timer.stop()
+        self._filter_generation += 1
+        generation = self._filter_generation
+        filters = self._current_filters()
+        # Mesmo canal para todas as primeiras páginas: só o resultado da última requisição é entregue
+        self._submit_page_query(
+            filters, None, self.questions_model.PAGE_SIZE, self.FILTER_CHANNEL,
+            on_result=lambda questions: self._on_filter_result(generation, filters, questions, select_question_id),
+            on_error=self._on_load_error)
+
+    def _on_filter_result(self, generation: int, filters, questions: List[Question],
+                          select_question_id: Optional[int] = None):
+        if generation != self._filter_generation:
+            return # Resultado de uma digitação anterior
+        self._apply_questions(filters, questions, select_question_id)
+
+    def _on_load_error(self, message: str):
+        QMessageBox.critical(self, "Erro", f"Falha ao carregar as perguntas: {message}")
+
+    def is_loading(self) -> bool:
+        """True enquanto a primeira página ou uma página seguinte está sendo buscada."""
+        return (self.filter_timer.isActive() or self.db_runner.is_busy(self.FILTER_CHANNEL)
+                or self.questions_model.is_fetching())
+
+    def _select_question(self, question_id: Optional[int]):
+        """Seleciona a pergunta informada, se ela estiver entre as linhas já carregadas."""
+        if question_id is None:
+            return
+        row = self.questions_model.row_for_question_id(question_id)
+        if row >= 0:
+            self.questions_table.selectRow(row)
+            self.questions_table.scrollTo(self.questions_model.index(row, 0))
+
     def _on_question_selected(self):
-        selected_items = self.questions_table.selectedItems()
-        if not selected_items:
+        selected_rows = self.questions_table.selectionModel().selectedRows()
+        if not selected_rows:
             self.current_selected_question_id = None
         else:
-            first_item_in_row = selected_items[0]
-            question_id_data = first_item_in_row.data(Qt.ItemDataRole.UserRole)
-            if question_id_data is not None:
-                self.current_selected_question_id = int(question_id_data)
-            else:
-                self.current_selected_question_id = None
+            self.current_selected_question_id = self.questions_model.question_id_at(selected_rows[0].row())
         self._update_action_buttons_state()
 
     def _update_action_buttons_state(self):
@@ -148,8 +217,16 @@ class QuestionsView(QWidget):
             self._load_questions()
             return
 
+        confirm_message = f"Tem certeza que deseja excluir a pergunta: '{question.text[:80]}...'?"
+        quiz_configs = self.db_manager.get_quiz_configs_for_question(question.id)
+        if quiz_configs:
+            quiz_names = ", ".join(config.name or f"ID: {config.id}" for config in quiz_configs[:5])
+            if len(quiz_configs) > 5:
+                quiz_names += ", ..."
+            confirm_message += f"\n\nEla será removida de {len(quiz_configs)} quiz(zes): {quiz_names}"
+
         reply = QMessageBox.question(self, "Confirmar Exclusão",
-                                     f"Tem certeza que deseja excluir a pergunta: '{question.text[:80]}...'?",
+                                     confirm_message,
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                      QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
@@ -167,13 +244,8 @@ class QuestionsView(QWidget):
                 new_question = self.db_manager.add_question(question_data)
                 if new_question and new_question.id:
                     QMessageBox.information(self, "Sucesso", f"Pergunta '{new_question.text[:50]}...' adicionada.")
-                    self._load_questions()
-                    # Tentar selecionar a pergunta recém-adicionada
-                    for row in range(self.questions_table.rowCount()):
-                        item = self.questions_table.item(row, 0) # Item do texto (coluna 0)
-                        if item and item.data(Qt.ItemDataRole.UserRole) == new_question.id:
-                            self.questions_table.selectRow(row)
-                            break
+                    # Seleciona a pergunta recém-adicionada quando a recarga terminar
+                    self._load_questions(select_question_id=new_question.id)
                 else:
                     QMessageBox.critical(self, "Erro", "Falha ao adicionar a pergunta no banco de dados.")
 
@@ -194,13 +266,8 @@ class QuestionsView(QWidget):
             if question_data:
                 if self.db_manager.update_question(question_data):
                     QMessageBox.information(self, "Sucesso", f"Pergunta '{question_data.text[:50]}...' atualizada.")
-                    self._load_questions()
-                    # Tentar re-selecionar a pergunta editada
-                    for row in range(self.questions_table.rowCount()):
-                        item = self.questions_table.item(row, 0)
-                        if item and item.data(Qt.ItemDataRole.UserRole) == question_data.id:
-                            self.questions_table.selectRow(row)
-                            break
+                    # Re-seleciona a pergunta editada quando a recarga terminar
+                    self._load_questions(select_question_id=question_data.id)
                 else:
                     QMessageBox.critical(self, "Erro", "Falha ao atualizar a pergunta no banco de dados.")
 
@@ -11,13 +11,18 @@ from typing import Optional, List, Set
 
 from src.core.database_manager import DatabaseManager
 from src.core.models import Question, QuizConfig
+from src.ui.db_worker import AsyncDbRunner, BusyIndicator
 
 class QuizConfigView(QWidget):
     start_quiz_signal = pyqtSignal(QuizConfig) # Sinal para iniciar o quiz
+    # Canal das consultas da tabela no AsyncDbRunner
+    LOAD_CHANNEL = "quiz_config_view.load"
 
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    def __init__(self, db_manager: DatabaseManager, db_runner: Optional[AsyncDbRunner] = None, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        # As consultas da tabela rodam fora da thread da GUI
+        self.db_runner = db_runner or AsyncDbRunner(db_manager.db_path, parent=self)
         self.selected_question_ids_for_quiz: Set[int] = set()
 
         main_layout = QVBoxLayout(self)
@@ -51,6 +56,9 @@ class QuizConfigView(QWidget):
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         left_layout.addWidget(self.available_questions_table)
+
+        self.busy_indicator = BusyIndicator(self.db_runner, [self.LOAD_CHANNEL])
+        left_layout.addWidget(self.busy_indicator)
         
         splitter.addWidget(left_panel)
 
@@ -95,9 +103,16 @@ class QuizConfigView(QWidget):
         self._load_available_questions()
 
     def _load_available_questions(self):
-        self.available_questions_table.setRowCount(0)
-        questions = self.db_manager.get_all_questions() # Poderia ter filtros aqui
+        """Busca as perguntas disponíveis em segundo plano; a tabela é preenchida ao chegar o resultado."""
+        self.db_runner.submit("get_all_questions", channel=self.LOAD_CHANNEL, # Poderia ter filtros aqui
+                              on_result=self._populate_available_questions,
+                              on_error=self._on_load_error)
 
+    def _on_load_error(self, message: str):
+        QMessageBox.critical(self, "Erro", f"Falha ao carregar as perguntas: {message}")
+
+    def _populate_available_questions(self, questions: List[Question]):
+        self.available_questions_table.setRowCount(0)
         for q in questions:
             row_pos = self.available_questions_table.rowCount()
             self.available_questions_table.insertRow(row_pos)
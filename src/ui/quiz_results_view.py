@@ -1,4 +1,5 @@
 import sys
+import logging
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QScrollArea, QFrame, QMessageBox, QApplication
@@ -10,9 +11,12 @@ from src.core.database_manager import DatabaseManager
 from src.core.models import QuizAttempt, Question # Question é necessário para buscar detalhes das perguntas
 from typing import Dict, Optional
 
+logger = logging.getLogger("agenda.ui")
+
 class QuestionReviewWidget(QFrame):
     """Widget para exibir a revisão de uma única pergunta."""
-    def __init__(self, question_text: str, user_answer: str, correct_answer: str, is_correct: bool, parent=None):
+    def __init__(self, question_text: str, user_answer: str, correct_answer: str, is_correct: bool,
+                 answer_stats: Optional[Dict[str, int]] = None, parent=None):
         super().__init__(parent)
         self.setFrameShape(QFrame.Shape.StyledPanel) # Adiciona uma borda
         
@@ -45,6 +49,13 @@ class QuestionReviewWidget(QFrame):
         self.setPalette(palette)
         layout.addWidget(feedback_label)
 
+        # Desempenho geral nesta pergunta (todas as tentativas registradas)
+        if answer_stats and answer_stats['answered'] > 0:
+            correct_rate = answer_stats['correct'] / answer_stats['answered'] * 100
+            stats_label = QLabel(f"Acertos nesta pergunta: {correct_rate:.0f}% de {answer_stats['answered']} resposta(s)")
+            stats_label.setStyleSheet("color: gray;")
+            layout.addWidget(stats_label)
+
 class QuizResultsView(QWidget):
     back_to_config_signal = pyqtSignal()
 
@@ -55,6 +66,7 @@ class QuizResultsView(QWidget):
         
         self.attempt: Optional[QuizAttempt] = None
         self.questions: Dict[int, Question] = {} # question_id -> Question object
+        self.answer_stats: Dict[int, Dict[str, int]] = {} # question_id -> {'answered', 'correct'}
 
         self._setup_ui()
         self._load_data()
@@ -105,12 +117,13 @@ class QuizResultsView(QWidget):
             return
 
         # Carregar os objetos Question para todas as perguntas na tentativa
-        for question_id in self.attempt.user_answers.keys():
-            question = self.db_manager.get_question_by_id(question_id)
-            if question and question.id is not None: # Checa se question.id não é None
+        questions, missing_ids = self.db_manager.get_questions_by_ids(self.attempt.user_answers.keys())
+        for question in questions:
+            if question.id is not None: # Checa se question.id não é None
                 self.questions[question.id] = question
-            else:
-                print(f"Aviso: Pergunta com ID {question_id} não encontrada no banco de dados.")
+        for question_id in missing_ids:
+            logger.warning(f"Aviso: Pergunta com ID {question_id} não encontrada no banco de dados.")
+        self.answer_stats = self.db_manager.get_question_answer_stats(self.attempt.user_answers.keys())
         
         self._populate_results()
 
@@ -139,7 +152,8 @@ class QuizResultsView(QWidget):
                 correct_ans = question_obj.answer
                 is_correct = (user_ans == correct_ans)
                 
-                review_item_widget = QuestionReviewWidget(q_text, user_ans, correct_ans, is_correct)
+                review_item_widget = QuestionReviewWidget(q_text, user_ans, correct_ans, is_correct,
+                                                          answer_stats=self.answer_stats.get(q_id))
                 self.review_layout.addWidget(review_item_widget)
             else:
                 # Caso a pergunta não tenha sido encontrada (menos provável se o DB estiver consistente)
@@ -178,12 +192,6 @@ if __name__ == '__main__':
 
     results_view = QuizResultsView(db_man, attempt_id=example_attempt_id)
     
-    def on_back():
-        print("Sinal back_to_config_signal recebido!")
-        # app.quit() # Comentado para manter a janela aberta
-
-    results_view.back_to_config_signal.connect(on_back)
-    
     results_view.setWindowTitle("Teste de Resultados do Quiz")
     results_view.setGeometry(100, 100, 700, 500)
     results_view.show()
@@ -9,16 +9,18 @@ from src.core.models import QuizConfig
 from src.ui.quiz_config_view import QuizConfigView
 from src.ui.quiz_taking_view import QuizTakingView
 from src.ui.quiz_results_view import QuizResultsView # Importado QuizResultsView
+from src.ui.db_worker import AsyncDbRunner
+from typing import Optional
 
 class QuizSectionWidget(QWidget):
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    def __init__(self, db_manager: DatabaseManager, db_runner: Optional[AsyncDbRunner] = None, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
 
         self.stacked_widget = QStackedWidget()
 
         # View de Configuração do Quiz (índice 0)
-        self.quiz_config_view = QuizConfigView(self.db_manager)
+        self.quiz_config_view = QuizConfigView(self.db_manager, db_runner=db_runner)
         self.quiz_config_view.start_quiz_signal.connect(self.start_quiz) # Conectar novo sinal
         self.stacked_widget.addWidget(self.quiz_config_view)
 
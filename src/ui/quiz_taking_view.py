@@ -1,4 +1,5 @@
 import sys
+import logging
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QRadioButton, QGroupBox, QMessageBox, QScrollArea, QApplication
@@ -10,6 +11,8 @@ from typing import Dict, List, Optional
 from src.core.database_manager import DatabaseManager
 from src.core.models import QuizConfig, Question, QuizAttempt
 
+logger = logging.getLogger("agenda.ui")
+
 class QuizTakingView(QWidget):
     quiz_finished_signal = pyqtSignal(int) # Emite o ID da tentativa de quiz ao finalizar
 
@@ -36,13 +39,12 @@ class QuizTakingView(QWidget):
         """Carrega os objetos Question para o quiz atual."""
         if not self.quiz_config or not self.quiz_config.question_ids:
             return
-        for q_id in self.quiz_config.question_ids:
-            question = self.db_manager.get_question_by_id(q_id)
-            if question:
-                self.questions.append(question)
-        
+        self.questions, missing_ids = self.db_manager.get_questions_by_ids(self.quiz_config.question_ids)
+        if missing_ids:
+            logger.warning(f"Aviso: Perguntas com IDs {missing_ids} não encontradas para QuizConfig ID {self.quiz_config.id}")
+
         if not self.questions:
-            print(f"Aviso: Nenhum objeto Question carregado para QuizConfig ID {self.quiz_config.id} com question_ids {self.quiz_config.question_ids}")
+            logger.warning(f"Aviso: Nenhum objeto Question carregado para QuizConfig ID {self.quiz_config.id} com question_ids {self.quiz_config.question_ids}")
 
 
     def _setup_ui(self):
@@ -209,14 +211,6 @@ if __name__ == '__main__':
 
     quiz_view = QuizTakingView(db_man, test_quiz_config)
     
-    def show_results(attempt_id):
-        print(f"Sinal quiz_finished_signal recebido! ID da Tentativa: {attempt_id}")
-        # Aqui, você poderia abrir uma nova janela/view para mostrar os resultados detalhados.
-        # Por agora, apenas fechamos a aplicação de teste.
-        # app.quit() # Comentado para manter a janela aberta após o quiz para inspeção
-    
-    quiz_view.quiz_finished_signal.connect(show_results)
-    
     quiz_view.setWindowTitle("Teste de Realização de Quiz")
     quiz_view.setGeometry(100, 100, 600, 400)
     quiz_view.show()
@@ -1,7 +1,8 @@
 import sys
+import logging
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLineEdit,
-    QPushButton, QLabel, QMessageBox, QComboBox 
+    QPushButton, QLabel, QMessageBox, QComboBox, QGroupBox, QFileDialog
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
@@ -9,6 +10,9 @@ from PyQt6.QtWidgets import QApplication # Adicionado QApplication
 
 from src.core.database_manager import DatabaseManager
 from src.ui.theme_manager import ThemeManager # Adicionado ThemeManager
+from src.core.slow_query_log import installed_slow_query_log
+
+logger = logging.getLogger("agenda.ui")
 
 class SettingsView(QWidget):
     def __init__(self, db_manager: DatabaseManager, parent=None):
@@ -44,6 +48,18 @@ class SettingsView(QWidget):
         form_layout.addRow("Tema da Aplicação:", self.theme_combo)
 
         main_layout.addLayout(form_layout)
+
+        # Diagnóstico: exportar as consultas lentas registradas nesta sessão
+        diagnostics_group = QGroupBox("Diagnóstico")
+        diagnostics_layout = QHBoxLayout(diagnostics_group)
+        self.slow_queries_label = QLabel()
+        diagnostics_layout.addWidget(self.slow_queries_label, 1)
+        self.export_slow_queries_button = QPushButton("Exportar Consultas Lentas...")
+        self.export_slow_queries_button.clicked.connect(self._export_slow_queries)
+        diagnostics_layout.addWidget(self.export_slow_queries_button)
+        main_layout.addWidget(diagnostics_group)
+        self._update_slow_queries_label()
+
         main_layout.addStretch() 
 
         # Botão Salvar
@@ -74,7 +90,7 @@ class SettingsView(QWidget):
                 self.theme_combo.setCurrentIndex(i)
                 break
         
-        print("Configurações carregadas.")
+        logger.debug("Configurações carregadas.")
 
     def _save_settings(self):
         """Salva as configurações atuais no banco de dados."""
@@ -91,11 +107,41 @@ class SettingsView(QWidget):
             if app_instance: # Garante que QApplication.instance() não é None
                 ThemeManager.apply_theme(app_instance, selected_theme_value)
             else:
-                print("ERRO: QApplication.instance() retornou None. Não foi possível aplicar o tema dinamicamente.")
+                logger.warning("Aviso: QApplication.instance() retornou None. Não foi possível aplicar o tema dinamicamente.")
 
         QMessageBox.information(self, "Configurações Salvas", 
                                 "Suas configurações foram salvas e o tema foi aplicado!")
-        print("Configurações salvas e tema aplicado.")
+        logger.debug("Configurações salvas e tema aplicado.")
+
+    def _update_slow_queries_label(self):
+        slow_query_log = installed_slow_query_log()
+        if slow_query_log is None:
+            self.slow_queries_label.setText("Registro de consultas lentas desligado (defina AGENDA_SLOW_QUERY_MS para ligar).")
+            self.export_slow_queries_button.setEnabled(False)
+            return
+        self.slow_queries_label.setText(
+            f"{len(slow_query_log.entries())} consulta(s) acima de {slow_query_log.threshold_ms:g} ms nesta sessão.")
+        self.export_slow_queries_button.setEnabled(True)
+
+    def _export_slow_queries(self):
+        """Grava as consultas lentas registradas em um arquivo JSON escolhido pelo usuário."""
+        slow_query_log = installed_slow_query_log()
+        if slow_query_log is None:
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar Consultas Lentas",
+                                              "consultas_lentas.json", "JSON (*.json)")
+        if not path:
+            return
+        if slow_query_log.dump_json(path):
+            QMessageBox.information(self, "Consultas Lentas",
+                                    f"{len(slow_query_log.entries())} consulta(s) exportada(s) para:\n{path}")
+        else:
+            QMessageBox.warning(self, "Consultas Lentas", f"Não foi possível gravar o arquivo:\n{path}")
+        self._update_slow_queries_label()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_slow_queries_label()
 
 # Bloco para teste independente
 if __name__ == '__main__':
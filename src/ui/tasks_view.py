@@ -12,11 +12,17 @@ from typing import Optional, List
 from src.core.database_manager import DatabaseManager
 from src.core.models import Task
 from src.ui.task_dialog import TaskDialog # Importado TaskDialog
+from src.ui.db_worker import AsyncDbRunner, BusyIndicator
 
 class TasksView(QWidget):
-    def __init__(self, db_manager: DatabaseManager, parent=None):
+    # Canal das consultas da lista no AsyncDbRunner
+    LOAD_CHANNEL = "tasks_view.load"
+
+    def __init__(self, db_manager: DatabaseManager, db_runner: Optional[AsyncDbRunner] = None, parent=None):
         super().__init__(parent)
         self.db_manager = db_manager
+        # As consultas da lista rodam fora da thread da GUI
+        self.db_runner = db_runner or AsyncDbRunner(db_manager.db_path, parent=self)
         self.current_selected_task_id: Optional[int] = None
 
         main_layout = QVBoxLayout(self)
@@ -33,13 +39,16 @@ class TasksView(QWidget):
         filter_layout.addWidget(QLabel("Status:"))
         self.status_filter_combo = QComboBox()
         self.status_filter_combo.addItems(["Todas", "Open", "In Progress", "Completed"])
-        self.status_filter_combo.currentIndexChanged.connect(self._load_tasks)
+        self.status_filter_combo.currentIndexChanged.connect(lambda: self._load_tasks())
         filter_layout.addWidget(self.status_filter_combo)
         
         # Adicionar mais filtros (ex: Prioridade) aqui no futuro, se necessário
         filter_layout.addStretch() # Empurra os filtros para a esquerda
         main_layout.addLayout(filter_layout)
 
+        self.busy_indicator = BusyIndicator(self.db_runner, [self.LOAD_CHANNEL])
+        main_layout.addWidget(self.busy_indicator)
+
         # Tabela de Tarefas
         self.tasks_table = QTableWidget()
         self.tasks_table.setColumnCount(4) # Título, Prioridade, Data de Vencimento, Status
@@ -84,18 +93,25 @@ class TasksView(QWidget):
         # Carregar tarefas inicialmente
         self._load_tasks()
 
-    def _load_tasks(self):
-        self.tasks_table.setRowCount(0) # Limpar tabela
-        self.current_selected_task_id = None # Resetar seleção
-        self._update_action_buttons_state() # Desabilitar botões de ação
-
+    def _load_tasks(self, select_task_id: Optional[int] = None):
+        """Recarrega a tabela em segundo plano; select_task_id é selecionada ao chegar o resultado."""
         status_filter = self.status_filter_combo.currentText()
         if status_filter == "Todas":
             status_filter = None
         
         # Adicionar filtro de prioridade aqui se implementado
         
-        tasks = self.db_manager.get_all_tasks(status=status_filter)
+        self.db_runner.submit("get_all_tasks", status=status_filter, channel=self.LOAD_CHANNEL,
+                              on_result=lambda tasks: self._populate_tasks(tasks, select_task_id),
+                              on_error=self._on_load_error)
+
+    def _on_load_error(self, message: str):
+        QMessageBox.critical(self, "Erro", f"Falha ao carregar as tarefas: {message}")
+
+    def _populate_tasks(self, tasks: List[Task], select_task_id: Optional[int] = None):
+        self.tasks_table.setRowCount(0) # Limpar tabela
+        self.current_selected_task_id = None # Resetar seleção
+        self._update_action_buttons_state() # Desabilitar botões de ação
 
         for task in tasks:
             row_position = self.tasks_table.rowCount()
@@ -121,8 +137,15 @@ class TasksView(QWidget):
             self.tasks_table.setItem(row_position, 2, due_date_item)
             self.tasks_table.setItem(row_position, 3, status_item)
         
-        if self.tasks_table.rowCount() > 0:
-            self.tasks_table.selectRow(0) # Seleciona a primeira linha por padrão, se houver tarefas
+        if self.tasks_table.rowCount() == 0:
+            return
+        if select_task_id is not None:
+            for row in range(self.tasks_table.rowCount()):
+                item = self.tasks_table.item(row, 0) # Item do título onde o ID está
+                if item and item.data(Qt.ItemDataRole.UserRole) == select_task_id:
+                    self.tasks_table.selectRow(row)
+                    return
+        self.tasks_table.selectRow(0) # Seleciona a primeira linha por padrão, se houver tarefas
 
     def _on_task_selected(self):
         selected_items = self.tasks_table.selectedItems()
@@ -146,9 +169,11 @@ class TasksView(QWidget):
         self.toggle_status_button.setEnabled(has_selection)
 
         if has_selection:
-            task = self.db_manager.get_task_by_id(self.current_selected_task_id)
-            if task:
-                if task.status == "Completed":
+            # O status vem da própria tabela, sem consultar o banco na thread da GUI
+            selected_items = self.tasks_table.selectedItems()
+            status_item = self.tasks_table.item(selected_items[0].row(), 3) if selected_items else None
+            if status_item:
+                if status_item.text() == "Completed":
                     self.toggle_status_button.setText("Marcar como Aberta")
                 else: # Open ou In Progress
                     self.toggle_status_button.setText("Marcar como Concluída")
@@ -167,13 +192,7 @@ class TasksView(QWidget):
                 new_task = self.db_manager.add_task(task_data)
                 if new_task and new_task.id:
                     QMessageBox.information(self, "Sucesso", f"Tarefa '{new_task.title}' adicionada com ID: {new_task.id}.")
-                    self._load_tasks()
-                    # Tentar selecionar a tarefa recém-adicionada
-                    for row in range(self.tasks_table.rowCount()):
-                        item = self.tasks_table.item(row, 0) # Item do título (coluna 0)
-                        if item and item.data(Qt.ItemDataRole.UserRole) == new_task.id:
-                            self.tasks_table.selectRow(row)
-                            break
+                    self._load_tasks(select_task_id=new_task.id) # Seleciona a tarefa recém-adicionada
                 else:
                     QMessageBox.critical(self, "Erro", "Falha ao adicionar a tarefa no banco de dados.")
 
@@ -194,13 +213,7 @@ class TasksView(QWidget):
             if task_data:
                 if self.db_manager.update_task(task_data):
                     QMessageBox.information(self, "Sucesso", f"Tarefa '{task_data.title}' atualizada.")
-                    self._load_tasks()
-                    # Tentar re-selecionar a tarefa editada
-                    for row in range(self.tasks_table.rowCount()):
-                        item = self.tasks_table.item(row, 0)
-                        if item and item.data(Qt.ItemDataRole.UserRole) == task_data.id:
-                            self.tasks_table.selectRow(row)
-                            break
+                    self._load_tasks(select_task_id=task_data.id) # Re-seleciona a tarefa editada
                 else:
                     QMessageBox.critical(self, "Erro", "Falha ao atualizar a tarefa no banco de dados.")
 
@@ -244,13 +257,8 @@ class TasksView(QWidget):
         
         if self.db_manager.update_task(task):
             QMessageBox.information(self, "Sucesso", f"Status da tarefa '{task.title}' atualizado para {task.status}.")
-            self._load_tasks() # Recarrega para mostrar a mudança e atualizar o botão
-            # Tentar re-selecionar a tarefa que foi alterada
-            for row in range(self.tasks_table.rowCount()):
-                item = self.tasks_table.item(row, 0) # Item do título onde o ID está
-                if item and item.data(Qt.ItemDataRole.UserRole) == self.current_selected_task_id:
-                    self.tasks_table.selectRow(row)
-                    break
+            # Recarrega para mostrar a mudança e atualizar o botão, re-selecionando a tarefa alterada
+            self._load_tasks(select_task_id=task.id)
         else:
             QMessageBox.critical(self, "Erro", "Falha ao atualizar o status da tarefa.")
 
@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.database_manager import DatabaseManager
+from src.core.models import Question, Task
+
+
+class ObjectCacheCopiesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(db_path=os.path.join(self.temp_dir, 'agenda.db'))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_unsaved_changes_do_not_leak_into_the_cache(self):
+        task = self.db.add_task(Task(title="Estudar", status="Open"))
+        cached = self.db.get_task_by_id(task.id)
+        cached.status = "Completed" # Alterado sem update_task
+
+        self.assertEqual(self.db.get_task_by_id(task.id).status, "Open")
+        self.assertGreater(self.db.cache_stats()['tasks']['hits'], 0)
+
+    def test_nested_lists_are_copied(self):
+        question = self.db.add_question(Question(text="2 + 2", answer="4", options=["3", "4"]))
+        self.db.get_question_by_id(question.id).options.append("5")
+
+        self.assertEqual(self.db.get_question_by_id(question.id).options, ["3", "4"])
+
+    def test_update_replaces_cached_object(self):
+        task = self.db.add_task(Task(title="Estudar", status="Open"))
+        cached = self.db.get_task_by_id(task.id)
+        cached.status = "Completed"
+
+        self.assertTrue(self.db.update_task(cached))
+        self.assertEqual(self.db.get_task_by_id(task.id).status, "Completed")
+
+
+if __name__ == '__main__':
+    unittest.main()
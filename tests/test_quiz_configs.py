@@ -0,0 +1,50 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.database_manager import DatabaseManager
+from src.core.models import Question, QuizConfig
+
+
+class QuizConfigQuestionsTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(db_path=os.path.join(self.temp_dir, 'agenda.db'))
+        self.questions = [
+            self.db.add_question(Question(text=f"Pergunta {i}", subject="Matemática", difficulty="Fácil",
+                                          options=["A", "B"], answer="A"))
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _legacy_question_ids(self, config_id):
+        row = self.db.conn.execute("SELECT question_ids FROM QuizConfigs WHERE id = ?", (config_id,)).fetchone()
+        return json.loads(row['question_ids'])
+
+    def test_delete_question_keeps_legacy_json_in_sync(self):
+        ids = [question.id for question in self.questions]
+        quiz_config = self.db.add_quiz_config(QuizConfig(name="Quiz", question_ids=ids))
+
+        self.assertTrue(self.db.delete_question(ids[1]))
+
+        expected = [ids[0], ids[2]]
+        self.assertEqual(self.db.get_quiz_config_by_id(quiz_config.id).question_ids, expected)
+        self.assertEqual(self._legacy_question_ids(quiz_config.id), expected)
+
+    def test_add_quiz_config_rejects_unknown_question_ids(self):
+        ids = [self.questions[0].id, 9999]
+
+        with self.assertLogs('agenda.db', level='ERROR'):
+            self.assertIsNone(self.db.add_quiz_config(QuizConfig(name="Quiz", question_ids=ids)))
+
+        count = self.db.conn.execute("SELECT COUNT(*) FROM QuizConfigs").fetchone()[0]
+        self.assertEqual(count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()